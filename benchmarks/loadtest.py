@@ -0,0 +1,268 @@
+"""API load test: replay recorded request traces at increasing concurrency.
+
+Record real traffic with `API_TRACE_PATH` (see market_data.api.recording), then replay the
+GET requests against a local instance. Every concurrency step is a closed loop: N clients
+send the trace's requests in recorded order (looping over the trace) until `--duration` or
+`--requests` is reached. Reports throughput and latency percentiles of successful responses
+overall, per route and per query shape; rejected (4xx, including admission 429s) and failed
+requests are counted separately. A query shape is the route plus its parameter names, with
+the values that change the cost: timeframe, resample and direction as given, `limit` and
+series counts bucketed to powers of ten.
+
+Results go to benchmarks/results/loadtest-<timestamp>.json; `--compare` diffs a previous one.
+
+Usage:
+    API_TRACE_PATH=/tmp/trace.jsonl market-data-api        # record, then stop the API
+    python benchmarks/loadtest.py /tmp/trace.jsonl --concurrency 1,4,16,64 --duration 30
+    python benchmarks/loadtest.py /tmp/trace.jsonl --only /candles --requests 20000 \\
+        --label "api_workers=4" --compare benchmarks/results/loadtest-<previous>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import httpx
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+# Streams never complete, admin and metrics are operator endpoints.
+EXCLUDED_PREFIXES = ("/stream", "/admin", "/metrics")
+SHAPE_VALUES = {"timeframe", "resample", "direction"}
+SHAPE_COUNTS = {"series", "symbols", "timeframes"}
+
+
+def load_trace(path: str, only: list[str] | None = None) -> list[dict]:
+    """Replayable entries of a trace file: matched GET routes, optionally limited to path prefixes."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            route = entry.get("route", "unmatched")
+            if entry.get("method") != "GET" or route == "unmatched" or route.startswith(EXCLUDED_PREFIXES):
+                continue
+            if only and not any(entry["path"].startswith(prefix) for prefix in only):
+                continue
+            entries.append(entry)
+    entries.sort(key=lambda e: e.get("t", 0))
+    return entries
+
+
+def _bucket(value: int) -> str:
+    return f"<={10 ** max(0, math.ceil(math.log10(max(value, 1))))}"
+
+
+def query_shape(route: str, query: str) -> str:
+    """Route plus parameter names, keeping only the values that change the cost of a query."""
+    params: dict[str, list[str]] = defaultdict(list)
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        params[name].append(value)
+    parts = []
+    for name in sorted(params):
+        values = params[name]
+        if name in SHAPE_VALUES:
+            parts.append(f"{name}={values[-1]}")
+        elif name == "limit" and values[-1].isdigit():
+            parts.append(f"limit{_bucket(int(values[-1]))}")
+        elif name in SHAPE_COUNTS:
+            count = sum(len([v for v in value.split(",") if v]) for value in values)
+            parts.append(f"{name}{_bucket(count)}")
+        else:
+            parts.append(name)
+    return f"{route}?{'&'.join(parts)}" if parts else route
+
+
+async def replay(
+    base_url: str,
+    entries: list[dict],
+    concurrency: int,
+    duration: float | None,
+    requests: int | None,
+    warmup: int = 0,
+    timeout: float = 30.0,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> tuple[list[tuple[str, str, int, float]], float]:
+    """Run one closed-loop step; returns (route, shape, status, seconds) samples and elapsed seconds.
+
+    Status 0 means the request failed without a response (timeout, connection error).
+    """
+    samples: list[tuple[str, str, int, float]] = []
+    position = 0
+    issued = 0
+    deadline = math.inf
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout, transport=transport) as client:
+
+        async def worker(record: bool) -> None:
+            nonlocal position, issued
+            while True:
+                if record and (time.perf_counter() >= deadline or (requests is not None and issued >= requests)):
+                    return
+                if not record and issued >= warmup:
+                    return
+                entry = entries[position % len(entries)]
+                position += 1
+                issued += 1
+                url = f"{entry['path']}?{entry['query']}" if entry.get("query") else entry["path"]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 0
+                if record:
+                    samples.append((entry["route"], entry["shape"], status, time.perf_counter() - started))
+
+        if warmup:
+            await asyncio.gather(*(worker(record=False) for _ in range(concurrency)))
+            issued = 0
+        started = time.perf_counter()
+        if duration is not None:
+            deadline = started + duration
+        await asyncio.gather(*(worker(record=True) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def summarize(samples: list[tuple[str, str, int, float]], elapsed: float) -> dict:
+    """Counts, throughput and latency percentiles in ms of the successful responses.
+
+    Rejected requests (4xx, including admission 429s) and errors (5xx or no response) are
+    counted separately and kept out of throughput and latency: a fast 429 is not served work.
+    """
+    ok = [s for s in samples if 0 < s[2] < 400]
+    summary = {
+        "count": len(samples),
+        "ok": len(ok),
+        "rejected": sum(1 for s in samples if 400 <= s[2] < 500),
+        "errors": sum(1 for s in samples if s[2] == 0 or s[2] >= 500),
+    }
+    if not ok:
+        return summary | {"rps": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    latencies = np.array([s[3] for s in ok]) * 1000
+    p50, p90, p99 = np.percentile(latencies, (50, 90, 99))
+    return summary | {
+        "rps": round(len(ok) / elapsed, 1),
+        "p50_ms": round(float(p50), 2),
+        "p90_ms": round(float(p90), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(latencies.max()), 2),
+    }
+
+
+def _grouped(samples: list[tuple[str, str, int, float]], elapsed: float, index: int) -> dict[str, dict]:
+    groups: dict[str, list] = defaultdict(list)
+    for sample in samples:
+        groups[sample[index]].append(sample)
+    return {key: summarize(group, elapsed) for key, group in sorted(groups.items(), key=lambda kv: -len(kv[1]))}
+
+
+def _print_table(title: str, rows: dict[str, dict], top: int | None = None) -> None:
+    print(f"\n{title:<60}{'count':>8}{'rej':>6}{'err':>6}{'req/s':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    for key, r in list(rows.items())[:top]:
+        print(f"{key[:59]:<60}{r['count']:>8}{r['rejected']:>6}{r['errors']:>6}{r['rps']:>10,.1f}{r['p50_ms']:>9.1f}"
+              f"{r['p90_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+
+def compare(steps: list[dict], previous: dict) -> None:
+    """Print throughput and p99 changes against a previous run, per concurrency and route."""
+    before = {step["concurrency"]: step for step in previous["steps"]}
+    print(f"\nvs {previous['timestamp']} ({previous.get('label') or 'no label'}):")
+    for step in steps:
+        base = before.get(step["concurrency"])
+        if base is None:
+            continue
+        rows = [("overall", step["overall"], base["overall"])]
+        rows += [(route, r, base["routes"][route]) for route, r in step["routes"].items() if route in base["routes"]]
+        for name, now, then in rows:
+            rps = (now["rps"] / then["rps"] - 1) * 100 if then["rps"] else 0.0
+            p99 = (now["p99_ms"] / then["p99_ms"] - 1) * 100 if then["p99_ms"] else 0.0
+            print(f"  c={step['concurrency']:<4} {name[:40]:<40} req/s {rps:+6.1f}%  p99 {p99:+6.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="Trace file written by the API (API_TRACE_PATH)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8100", help="API under test (default API_PORT)")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Client counts to step through, comma-separated")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    parser.add_argument("--requests", type=int, help="Requests per step (instead of --duration)")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests before each step")
+    parser.add_argument("--only", help="Path prefixes to replay, comma-separated (e.g. /candles)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--top", type=int, default=15, help="Query shapes shown per step")
+    parser.add_argument("--label", default="", help="Stored with the results, e.g. the settings under test")
+    parser.add_argument("--compare", help="Previous loadtest result to diff against")
+    args = parser.parse_args()
+
+    only = [p.strip() for p in args.only.split(",") if p.strip()] if args.only else None
+    entries = load_trace(args.trace, only)
+    if not entries:
+        print(f"No replayable requests in {args.trace}", file=sys.stderr)
+        return 1
+    for entry in entries:
+        entry["shape"] = query_shape(entry["route"], entry.get("query", ""))
+    print(f"Replaying {len(entries)} recorded requests "
+          f"({len({e['route'] for e in entries})} routes, {len({e['shape'] for e in entries})} shapes) "
+          f"against {args.base_url}")
+
+    steps = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        samples, elapsed = asyncio.run(replay(
+            args.base_url,
+            entries,
+            concurrency,
+            None if args.requests else args.duration,
+            args.requests,
+            warmup=args.warmup,
+            timeout=args.timeout,
+        ))
+        step = {
+            "concurrency": concurrency,
+            "seconds": round(elapsed, 2),
+            "overall": summarize(samples, elapsed),
+            "routes": _grouped(samples, elapsed, 0),
+            "shapes": _grouped(samples, elapsed, 1),
+        }
+        steps.append(step)
+        _print_table(f"concurrency {concurrency}, {elapsed:.1f}s: routes", {"overall": step["overall"]} | step["routes"])
+        _print_table("query shapes", step["shapes"], args.top)
+
+    print(f"\n{'clients':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'rejected':>10}{'errors':>8}")
+    for step in steps:
+        o = step["overall"]
+        print(f"{step['concurrency']:>8}{o['rps']:>10,.1f}{o['p50_ms']:>9.1f}{o['p99_ms']:>9.1f}"
+              f"{o['rejected']:>10}{o['errors']:>8}")
+
+    run = {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "label": args.label,
+        "base_url": args.base_url,
+        "trace": args.trace,
+        "trace_requests": len(entries),
+        "steps": steps,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"loadtest-{run['timestamp'].replace(':', '')}.json"
+    path.write_text(json.dumps(run, indent=2))
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(steps, json.loads(Path(args.compare).read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Benchmark /candles response serialisation: Candle + to_dict + JSONResponse vs direct row rendering.
+
+Usage: python benchmarks/serialization.py [rows] [repeats]
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+from market_data.api.serialization import candles_response
+from market_data.storage.postgres import _row_to_candle
+
+
+def make_rows(n: int) -> list[tuple]:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    rows = []
+    for i in range(n):
+        open_time = start + timedelta(minutes=i)
+        price = Decimal(42000 + i % 500).quantize(Decimal("0.00000001"))
+        rows.append((
+            "bitfinex", "BTCUSD", "1m", open_time, open_time + timedelta(minutes=1),
+            price, price + 5, price - 5, price + 1, Decimal("12.34567890"),
+        ))
+    return rows
+
+
+def payload(count: int) -> dict:
+    return {
+        "exchange": "bitfinex",
+        "symbol": "BTCUSD",
+        "timeframe": "1m",
+        "count": count,
+        "candles": None,
+        "has_more": True,
+        "next_cursor": "eyJ2IjoxfQ",
+        "prev_cursor": "eyJ2IjoxfQ",
+    }
+
+
+def before(rows: list[tuple]) -> bytes:
+    candles = [_row_to_candle(row) for row in rows]
+    return JSONResponse({**payload(len(candles)), "candles": [c.to_dict() for c in candles]}).body
+
+
+def after(rows: list[tuple]) -> bytes:
+    return candles_response(payload(len(rows)), rows).body
+
+
+def timeit(fn, rows: list[tuple], repeats: int) -> list[float]:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(rows)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    rows = make_rows(n)
+    assert before(rows) == after(rows), "serialisers disagree"
+
+    results = {name: timeit(fn, rows, repeats) for name, fn in (("before", before), ("after", after))}
+    for name, samples in results.items():
+        print(f"{name:>6}: median {statistics.median(samples):7.2f} ms  min {min(samples):7.2f} ms  ({n} rows)")
+    speedup = statistics.median(results["before"]) / statistics.median(results["after"])
+    print(f"speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
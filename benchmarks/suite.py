@@ -0,0 +1,236 @@
+"""Micro-benchmarks of the ingest, storage and API hot paths, with stored baselines.
+
+Covers `parse_ws_candle`, `BitfinexAdapter._parse_candle`, `Candle.to_dict` (CPU only) and
+`save_candles` (new and unchanged rows) and `get_candles` against a throwaway Postgres (see
+throwaway_pg.py), on synthetic 1m candles at several scales. Each benchmark reports
+throughput and per-operation latency percentiles.
+
+Every run is written to benchmarks/results/<timestamp>.json and compared with
+benchmarks/results/baseline.json when there is one; `--save-baseline` makes this run the
+baseline. Baselines are machine-specific and not committed.
+
+Usage:
+    python benchmarks/suite.py                       # all benchmarks, default scales
+    python benchmarks/suite.py --quick               # smaller scales
+    python benchmarks/suite.py --only parse,to_dict  # CPU-only, no database needed
+    python benchmarks/suite.py --database-url postgresql://localhost/postgres --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from throwaway_pg import PostgresUnavailable, throwaway_database
+
+from market_data.exchanges.bitfinex import BitfinexAdapter
+from market_data.exchanges.bitfinex_ws import parse_ws_candle
+from market_data.storage.postgres import PostgresStorage
+from market_data.types import Candle
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINE = RESULTS_DIR / "baseline.json"
+START = datetime(2024, 1, 1, tzinfo=UTC)
+MINUTE_MS = 60_000
+SAVE_BATCH = 200  # ws_save_batch_size default
+QUERY_LIMIT = 1000
+CPU_WARMUP = 1000
+CPU_BENCHMARKS = ("parse_ws_candle", "parse_rest_candle", "to_dict")
+DB_BENCHMARKS = ("save_candles_new", "save_candles_unchanged", "get_candles")
+
+
+def raw_candles(count: int, seed: int = 1) -> list[list[float]]:
+    """Bitfinex-style [MTS, OPEN, CLOSE, HIGH, LOW, VOLUME] rows: a 1m random walk."""
+    rng = np.random.default_rng(seed)
+    closes = 40_000 * np.exp(np.cumsum(rng.normal(0, 0.0008, count)))
+    opens = np.concatenate(([40_000.0], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, count)) * closes
+    highs = np.maximum(opens, closes) + spread
+    lows = np.minimum(opens, closes) - spread
+    volumes = rng.lognormal(0, 1, count)
+    start_ms = int(START.timestamp() * 1000)
+    return [
+        [start_ms + i * MINUTE_MS, round(o, 1), round(c, 1), round(h, 1), round(low, 1), round(v, 8)]
+        for i, (o, c, h, low, v) in enumerate(zip(opens, closes, highs, lows, volumes, strict=True))
+    ]
+
+
+def measure(
+    name: str,
+    scale: int,
+    fn: Callable[[Any], Any],
+    items: list[Any],
+    ops_per_item: int = 1,
+    warmup: int = 0,
+) -> dict:
+    """Time `fn(item)` per item; latency percentiles are per item, throughput in ops/s."""
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    values = np.array(samples) * 1e6
+    p50, p90, p99 = np.percentile(values, (50, 90, 99))
+    return {
+        "name": name,
+        "scale": scale,
+        "ops": len(samples) * ops_per_item,
+        "ops_per_sec": round(len(samples) * ops_per_item / elapsed, 1),
+        "p50_us": round(float(p50), 2),
+        "p90_us": round(float(p90), 2),
+        "p99_us": round(float(p99), 2),
+        "max_us": round(float(values.max()), 2),
+    }
+
+
+def run_cpu(scale: int, only: set[str]) -> list[dict]:
+    raws = raw_candles(scale)
+    adapter = BitfinexAdapter()
+    candles = [parse_ws_candle(raw, "tBTCUSD", "1m") for raw in raws]
+    results = []
+    if "parse_ws_candle" in only:
+        results.append(measure(
+            "parse_ws_candle", scale, lambda raw: parse_ws_candle(raw, "tBTCUSD", "1m"), raws, warmup=CPU_WARMUP
+        ))
+    if "parse_rest_candle" in only:
+        parse = adapter._parse_candle
+        results.append(measure(
+            "parse_rest_candle", scale, lambda raw: parse(raw, "bitfinex", "BTCUSD", "1m"), raws, warmup=CPU_WARMUP
+        ))
+    if "to_dict" in only:
+        results.append(measure("to_dict", scale, Candle.to_dict, candles, warmup=CPU_WARMUP))
+    return results
+
+
+def run_db(database_url: str, scale: int, only: set[str], queries: int) -> list[dict]:
+    storage = PostgresStorage(database_url)
+    symbol = f"BENCH{scale}"
+    candles = [parse_ws_candle(raw, symbol, "1m") for raw in raw_candles(scale, seed=scale)]
+    batches = [candles[i : i + SAVE_BATCH] for i in range(0, len(candles), SAVE_BATCH)]
+    results = []
+    try:
+        # Loading is the "new rows" benchmark; the other benchmarks need the rows either way.
+        result = measure("save_candles_new", scale, storage.save_candles, batches, SAVE_BATCH)
+        if "save_candles_new" in only:
+            results.append(result)
+        if "save_candles_unchanged" in only:
+            results.append(measure("save_candles_unchanged", scale, storage.save_candles, batches, SAVE_BATCH))
+        if "get_candles" in only:
+            rng = random.Random(scale)
+            span = max(1, scale - QUERY_LIMIT)
+            starts = [START + timedelta(minutes=rng.randrange(span)) for _ in range(queries)]
+            results.append(measure(
+                "get_candles",
+                scale,
+                lambda start: storage.get_candles("bitfinex", symbol, "1m", start=start, limit=QUERY_LIMIT),
+                starts,
+                warmup=10,
+            ))
+    finally:
+        storage.engine.dispose()
+    return results
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Print changes against the baseline; return the regressions beyond `threshold` percent."""
+    previous = {(r["name"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nvs baseline {baseline['timestamp']} ({baseline.get('git', '?')}):")
+    for r in results:
+        base = previous.get((r["name"], r["scale"]))
+        if base is None:
+            continue
+        throughput = (r["ops_per_sec"] / base["ops_per_sec"] - 1) * 100
+        p50 = (r["p50_us"] / base["p50_us"] - 1) * 100 if base["p50_us"] else 0.0
+        p99 = (r["p99_us"] / base["p99_us"] - 1) * 100 if base["p99_us"] else 0.0
+        flag = ""
+        if throughput < -threshold or p50 > threshold:
+            flag = "  REGRESSION"
+            regressions.append(f"{r['name']}@{r['scale']}")
+        print(f"  {r['name']:<24}{r['scale']:>9}  ops/s {throughput:+6.1f}%  p50 {p50:+6.1f}%  p99 {p99:+6.1f}%{flag}")
+    return regressions
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1000,10000,100000", help="Candle counts, comma-separated")
+    parser.add_argument("--quick", action="store_true", help="Use scales 1000,10000")
+    parser.add_argument("--only", help=f"Benchmarks to run ({', '.join(CPU_BENCHMARKS + DB_BENCHMARKS)}; "
+                        "prefixes allowed, e.g. parse,save)")
+    parser.add_argument("--queries", type=int, default=500, help="get_candles queries per scale")
+    parser.add_argument("--database-url", help="Server to create the throwaway database on (or BENCH_DATABASE_URL)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 on regressions vs baseline")
+    args = parser.parse_args()
+
+    scales = [1000, 10000] if args.quick else [int(s) for s in args.scales.split(",")]
+    names = CPU_BENCHMARKS + DB_BENCHMARKS
+    if args.only:
+        prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+        names = tuple(n for n in names if any(n.startswith(p) for p in prefixes))
+    only = set(names)
+
+    results: list[dict] = []
+    for scale in scales:
+        results.extend(run_cpu(scale, only))
+    if only & set(DB_BENCHMARKS):
+        try:
+            with throwaway_database(args.database_url) as url:
+                PostgresStorage(url).init_schema()
+                for scale in scales:
+                    results.extend(run_db(url, scale, only, args.queries))
+        except PostgresUnavailable as e:
+            print(f"Skipping storage benchmarks: {e}", file=sys.stderr)
+
+    print(f"{'benchmark':<24}{'scale':>9}{'ops/s':>14}{'p50 µs':>11}{'p90 µs':>11}{'p99 µs':>11}")
+    for r in results:
+        print(f"{r['name']:<24}{r['scale']:>9}{r['ops_per_sec']:>14,.0f}{r['p50_us']:>11.1f}"
+              f"{r['p90_us']:>11.1f}{r['p99_us']:>11.1f}")
+
+    run = {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{run['timestamp'].replace(':', '')}.json"
+    path.write_text(json.dumps(run, indent=2))
+    print(f"\nSaved {path}")
+
+    regressions: list[str] = []
+    if BASELINE.exists() and not args.save_baseline:
+        regressions = compare(results, json.loads(BASELINE.read_text()), args.threshold)
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(run, indent=2))
+        print(f"Baseline saved to {BASELINE}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Throwaway PostgreSQL for benchmarks and load tests.
+
+`throwaway_database()` yields the URL of an empty database that is removed afterwards:
+
+- with a server URL (argument or `BENCH_DATABASE_URL`): a `market_data_bench_*` database is
+  created on that server and dropped at the end (needs CREATEDB);
+- otherwise, if the PostgreSQL server binaries are installed (`initdb`, `pg_ctl` on PATH or
+  under /usr/lib/postgresql/*/bin), a temporary cluster is initialised in a temp directory,
+  started on a Unix socket and deleted at the end.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+
+class PostgresUnavailable(RuntimeError):
+    pass
+
+
+def _find_binary(name: str) -> str | None:
+    found = shutil.which(name)
+    if found:
+        return found
+    candidates = sorted(glob.glob(f"/usr/lib/postgresql/*/bin/{name}") + glob.glob(f"/usr/local/opt/postgresql*/bin/{name}"))
+    return candidates[-1] if candidates else None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _database_on_server(server_url: str) -> Iterator[str]:
+    name = f"market_data_bench_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(server_url, isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            conn.execute(text(f'CREATE DATABASE "{name}"'))
+        try:
+            yield make_url(server_url).set(database=name).render_as_string(hide_password=False)
+        finally:
+            with admin.connect() as conn:
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    finally:
+        admin.dispose()
+
+
+@contextmanager
+def _temporary_cluster() -> Iterator[str]:
+    initdb, pg_ctl = _find_binary("initdb"), _find_binary("pg_ctl")
+    if not initdb or not pg_ctl:
+        raise PostgresUnavailable(
+            "No PostgreSQL available: pass --database-url / set BENCH_DATABASE_URL, or install the server binaries"
+        )
+    root = tempfile.mkdtemp(prefix="market-data-pg-")
+    data, port = os.path.join(root, "data"), _free_port()
+    try:
+        subprocess.run(
+            [initdb, "-D", data, "-U", "postgres", "--auth=trust", "--encoding=UTF8", "--no-sync"],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [pg_ctl, "-D", data, "-l", os.path.join(root, "postgres.log"), "-w", "start",
+             "-o", f"-p {port} -k {root} -c listen_addresses=''"],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            yield f"postgresql://postgres@/postgres?host={root}&port={port}"
+        finally:
+            subprocess.run([pg_ctl, "-D", data, "-m", "immediate", "stop"], capture_output=True)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+@contextmanager
+def throwaway_database(server_url: str | None = None) -> Iterator[str]:
+    """Yield the URL of an empty database that only lives for the duration of the block."""
+    server_url = server_url or os.environ.get("BENCH_DATABASE_URL")
+    if server_url:
+        with _database_on_server(server_url) as url:
+            yield url
+    else:
+        with _temporary_cluster() as url:
+            yield url
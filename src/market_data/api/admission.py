@@ -0,0 +1,269 @@
+"""Query cost admission control for database-backed API requests.
+
+Every request that reaches the database gets a cost estimate (1 + estimated rows / 1000, or
+a fixed cost for full-table summaries). Requests are admitted while both the global and the
+per-client concurrency and in-flight cost budgets allow it; otherwise they queue for up to
+`queue_seconds` and are then rejected with 429 and `Retry-After`. This keeps a single huge
+range query or a burst of `/status` calls from taking every connection of the API pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from market_data.config import settings
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.services.indicators import seed_limit
+from market_data.timeframes import choose_base_timeframe, parse_timeframe
+
+ROWS_PER_COST_UNIT = 1000
+# GROUP BY over the whole candles table (/status, /candles/symbols).
+FULL_SCAN_COST = 50.0
+# COUNT(*) over one series.
+SERIES_SCAN_COST = 5.0
+
+# Paths that never touch the database (or hold a connection for their whole lifetime).
+_EXEMPT_PREFIXES = ("/health", "/stats", "/metrics", "/ingest", "/admin", "/stream", "/snapshot", "/docs", "/redoc", "/openapi.json")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Over query budget, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _int(params: Mapping[str, str], name: str, default: int) -> int:
+    try:
+        return int(params.get(name, default))
+    except ValueError:
+        return default
+
+
+def _time(params: Mapping[str, str], name: str) -> datetime | None:
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _series_rows(params: Mapping[str, str], limit: int) -> float:
+    """Rows one series read may touch: the limit, or fewer if the window is shorter."""
+    delta = TIMEFRAMES.get(params.get("timeframe", "1h"), (None, None))[1]
+    start, end = _time(params, "start"), _time(params, "end")
+    if delta is None or start is None or end is None:
+        return limit
+    try:
+        return max(0.0, min(limit, (end - start) / delta))
+    except TypeError:  # naive vs aware
+        return limit
+
+
+def _resampled_rows(resample: str, limit: int) -> float:
+    try:
+        bucket = parse_timeframe(resample)
+    except ValueError:
+        return 0.0
+    base = choose_base_timeframe(bucket, settings.bitfinex_timeframes_list)
+    if base is None:
+        return 0.0
+    return limit * (bucket / TIMEFRAMES[base][1])
+
+
+def estimate_cost(path: str, params: Mapping[str, str], series_count: int = 1) -> float | None:
+    """Estimated cost of a request, or None if it is not subject to admission control."""
+    path = path.rstrip("/") or "/"
+    if path.startswith(_EXEMPT_PREFIXES) or path == "/":
+        return None
+
+    if path in ("/status", "/candles/symbols"):
+        return FULL_SCAN_COST
+    if path == "/candles/count":
+        return SERIES_SCAN_COST
+    if path == "/candles":
+        limit = _int(params, "limit", 1000)
+        if params.get("resample"):
+            return 1 + _resampled_rows(params["resample"], limit) / ROWS_PER_COST_UNIT
+        return 1 + _series_rows(params, limit) / ROWS_PER_COST_UNIT
+    if path == "/candles/latest":
+        return 1 + _int(params, "limit", 100) / ROWS_PER_COST_UNIT
+    if path == "/candles/changes":
+        return 1 + _int(params, "limit", 1000) / ROWS_PER_COST_UNIT
+    if path == "/candles/batch":
+        return 1 + series_count * _int(params, "limit", 100) / ROWS_PER_COST_UNIT
+    if path == "/indicators":
+        # Worst case: every series is cold and seeded from storage.
+        return 1 + _indicator_seed_rows(params) / ROWS_PER_COST_UNIT
+    return 1.0
+
+
+def _indicator_seed_rows(params: Any) -> int:
+    """Rows seeding every series of an /indicators request reads (see IndicatorService)."""
+    def values(name: str) -> list[str]:
+        return [v.strip() for value in params.getlist(name) for v in value.split(",") if v.strip()]
+
+    now = datetime.now(UTC)
+    timeframes = [item.partition(":")[2] for item in values("series")]
+    timeframes += values("timeframes") * len(values("symbols"))
+    return sum(seed_limit(timeframe, now) for timeframe in timeframes)
+
+
+def _series_count(params: Any) -> int:
+    """Number of series a batch-style request names (series=..., symbols x timeframes)."""
+    def count(name: str) -> int:
+        return sum(len([v for v in value.split(",") if v.strip()]) for value in params.getlist(name))
+
+    return max(1, count("series") + count("symbols") * count("timeframes"))
+
+
+class AdmissionController:
+    """Global and per-client concurrency/cost budgets with a bounded wait queue.
+
+    Costs larger than a budget are clamped to it, so an expensive request is still admitted
+    once it can run alone. Must be used from a single event loop (one per API process).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_cost: float,
+        client_max_concurrency: int,
+        client_max_cost: float,
+        queue_seconds: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_cost = max_cost
+        self.client_max_concurrency = client_max_concurrency
+        self.client_max_cost = client_max_cost
+        self.queue_seconds = queue_seconds
+        self._cond: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._in_flight = 0
+        self._cost = 0.0
+        self._clients: dict[str, list[float]] = {}  # client -> [in_flight, cost]
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+
+    @asynccontextmanager
+    async def admit(self, client: str, cost: float) -> AsyncIterator[None]:
+        """Hold budget for one request; raises AdmissionRejected if it cannot start in time."""
+        cost = min(cost, self.max_cost, self.client_max_cost)
+        cond = self._condition()
+        async with cond:
+            if not self._fits(client, cost):
+                self._queued += 1
+                try:
+                    await asyncio.wait_for(cond.wait_for(lambda: self._fits(client, cost)), self.queue_seconds)
+                except TimeoutError:
+                    self._rejected += 1
+                    raise AdmissionRejected(max(1, math.ceil(self.queue_seconds))) from None
+            self._in_flight += 1
+            self._cost += cost
+            usage = self._clients.setdefault(client, [0, 0.0])
+            usage[0] += 1
+            usage[1] += cost
+            self._admitted += 1
+
+        try:
+            yield
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                self._cost -= cost
+                usage = self._clients[client]
+                usage[0] -= 1
+                usage[1] -= cost
+                if usage[0] == 0:
+                    del self._clients[client]
+                cond.notify_all()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "in_flight_cost": round(self._cost, 3),
+            "clients": len(self._clients),
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected": self._rejected,
+        }
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives are bound to one loop; follow the loop serving the app.
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+        return self._cond
+
+    def _fits(self, client: str, cost: float) -> bool:
+        in_flight, client_cost = self._clients.get(client, (0, 0.0))
+        return (
+            self._in_flight < self.max_concurrency
+            and self._cost + cost <= self.max_cost
+            and in_flight < self.client_max_concurrency
+            and client_cost + cost <= self.client_max_cost
+        )
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the process admission controller to HTTP requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        cost = estimate_cost(request.url.path, request.query_params, _series_count(request.query_params))
+        if cost is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = request.client.host if request.client else "unknown"
+        try:
+            async with get_admission_controller().admit(client, cost):
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                {"detail": str(e)},
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+
+
+# Global instance for easy access
+_admission_controller: AdmissionController | None = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller for API database reads."""
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(
+                    max_concurrency=settings.api_admission_max_concurrency,
+                    max_cost=settings.api_admission_max_cost,
+                    client_max_concurrency=settings.api_admission_client_max_concurrency,
+                    client_max_cost=settings.api_admission_client_max_cost,
+                    queue_seconds=settings.api_admission_queue_seconds,
+                )
+    return _admission_controller
@@ -0,0 +1,79 @@
+"""HTTP validators (ETag / Last-Modified) and cache policy for candle responses."""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Response
+
+from market_data.config import settings
+from market_data.exchanges.bitfinex import TIMEFRAMES
+
+# Revalidate on every use: the range may still include the open (mutable) candle.
+LIVE_CACHE_CONTROL = "no-cache"
+
+
+def closed_cache_control() -> str:
+    return f"public, max-age={settings.api_closed_range_cache_seconds}"
+
+
+def is_closed_range(timeframe: str, upper: datetime | None, now: datetime | None = None) -> bool:
+    """Whether every candle with open_time < `upper` has already closed.
+
+    A candle opening at or before `now - timeframe` has a close_time <= now, so any range
+    bounded by that point can no longer change through realtime updates.
+    """
+    if upper is None or timeframe not in TIMEFRAMES:
+        return False
+    now = now or datetime.now(UTC)
+    if upper.tzinfo is None:
+        upper = upper.replace(tzinfo=UTC)
+    return upper <= now - TIMEFRAMES[timeframe][1]
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from the values that fully determine a representation."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: datetime | None,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> bool:
+    """Evaluate conditional request headers (RFC 9110: If-None-Match takes precedence)."""
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=UTC)
+        # HTTP dates have one-second resolution.
+        return last_modified - timedelta(microseconds=last_modified.microsecond) <= since
+
+    return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
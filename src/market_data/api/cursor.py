@@ -0,0 +1,117 @@
+"""Opaque keyset pagination cursors for candle series and their change feeds."""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+from fastapi import HTTPException
+
+Direction = Literal["forward", "backward"]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_US = timedelta(microseconds=1)
+_CURSOR_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a series: rows strictly after (forward) or before (backward) `open_time`."""
+
+    series: str
+    open_time: datetime
+    direction: Direction
+
+
+@dataclass(frozen=True)
+class ChangeCursor:
+    """Position in a series change feed: rows modified after (`change_xid`, `open_time`)."""
+
+    series: str
+    change_xid: int
+    open_time: datetime
+
+
+def series_key(exchange: str, symbol: str, timeframe: str) -> str:
+    return f"{exchange}:{symbol}:{timeframe}"
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Encode a cursor as a URL-safe token."""
+    return _encode({
+        "v": _CURSOR_VERSION,
+        "k": cursor.series,
+        "t": _micros(cursor.open_time),
+        "d": "f" if cursor.direction == "forward" else "b",
+    })
+
+
+def decode_cursor(token: str, expected_series: str) -> Cursor:
+    """Decode and validate a cursor token. Raises HTTP 400 if invalid or issued for another series."""
+    try:
+        payload = _decode(token)
+        if payload["d"] not in ("f", "b"):
+            raise ValueError("unsupported cursor")
+        cursor = Cursor(
+            series=str(payload["k"]),
+            open_time=_EPOCH + int(payload["t"]) * _ONE_US,
+            direction="forward" if payload["d"] == "f" else "backward",
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    if cursor.series != expected_series:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different series")
+    return cursor
+
+
+def encode_change_cursor(cursor: ChangeCursor) -> str:
+    """Encode a change-feed position as a URL-safe token."""
+    return _encode({
+        "v": _CURSOR_VERSION,
+        "k": cursor.series,
+        "x": cursor.change_xid,
+        "t": _micros(cursor.open_time),
+        "d": "c",
+    })
+
+
+def decode_change_cursor(token: str, expected_series: str) -> ChangeCursor:
+    """Decode and validate a change-feed token. Raises HTTP 400 if invalid or issued for another series."""
+    try:
+        payload = _decode(token)
+        if payload["d"] != "c":
+            raise ValueError("not a change cursor")
+        cursor = ChangeCursor(
+            series=str(payload["k"]),
+            change_xid=int(payload["x"]),
+            open_time=_EPOCH + int(payload["t"]) * _ONE_US,
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+    if cursor.series != expected_series:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different series")
+    return cursor
+
+
+def _micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return (value - _EPOCH) // _ONE_US
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if payload["v"] != _CURSOR_VERSION:
+        raise ValueError("unsupported cursor")
+    return payload
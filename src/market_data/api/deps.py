@@ -0,0 +1,148 @@
+"""Shared API dependencies."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+
+from market_data.api.singleflight import get_singleflight
+from market_data.config import settings
+from market_data.services.change_feed import ChangeFeedRelay
+from market_data.services.indicators import IndicatorService
+from market_data.services.realtime import get_candle_hub
+from market_data.services.snapshot import SnapshotTable
+from market_data.storage.notify import ChangeListener
+from market_data.storage.postgres import PostgresStorage
+from market_data.storage.tiered import TieredStorage
+
+T = TypeVar("T")
+
+_storage: PostgresStorage | None = None
+_indicator_service: IndicatorService | None = None
+_snapshot_table: SnapshotTable | None = None
+_change_listener: ChangeListener | None = None
+_change_relay: ChangeFeedRelay | None = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> PostgresStorage:
+    """Get the API-wide storage instance (one engine/connection pool per process)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                # Old months live in the Parquet archive when it is enabled.
+                _storage = TieredStorage() if settings.archive_enabled else PostgresStorage()
+    return _storage
+
+
+def get_indicator_service() -> IndicatorService:
+    """Get the API-wide indicator cache, fed by the process candle hub."""
+    global _indicator_service
+    if _indicator_service is None:
+        storage = get_storage()
+        with _storage_lock:
+            if _indicator_service is None:
+                _indicator_service = IndicatorService(storage, get_candle_hub())
+    return _indicator_service
+
+
+def get_snapshot_table() -> SnapshotTable:
+    """Get the API-wide in-memory snapshot table, fed by the process candle hub."""
+    global _snapshot_table
+    if _snapshot_table is None:
+        storage = get_storage()
+        with _storage_lock:
+            if _snapshot_table is None:
+                _snapshot_table = SnapshotTable(
+                    storage, get_candle_hub(), refresh_seconds=settings.api_snapshot_refresh_seconds
+                )
+    return _snapshot_table
+
+
+def get_change_listener() -> ChangeListener:
+    """Get the API-wide change listener, relaying other processes' writes into local caches."""
+    global _change_listener, _change_relay
+    if _change_listener is None:
+        storage = get_storage()
+        indicators = get_indicator_service()
+        snapshot = get_snapshot_table()
+        with _storage_lock:
+            if _change_listener is None:
+                _change_relay = ChangeFeedRelay(
+                    storage,
+                    get_candle_hub(),
+                    invalidators=[indicators.invalidate, snapshot.invalidate],
+                    replay_max=settings.api_change_feed_replay_max,
+                )
+                listener = ChangeListener()
+                listener.add_callback(_change_relay)
+                _change_listener = listener
+    return _change_listener
+
+
+def get_change_feed_stats() -> dict[str, Any] | None:
+    """Change feed stats, or None when the feed was never started in this process."""
+    if _change_listener is None or _change_relay is None:
+        return None
+    return {**_change_listener.get_stats(), **_change_relay.get_stats()}
+
+
+def parse_series(
+    series: list[str] | None = None,
+    symbols: list[str] | None = None,
+    timeframes: list[str] | None = None,
+    max_series: int | None = None,
+) -> list[tuple[str, str]]:
+    """Parse series query params into unique (symbol, timeframe) pairs.
+
+    Accepts explicit `SYMBOL:TIMEFRAME` entries (repeated or comma-separated) and/or the
+    cross product of `symbols` x `timeframes`. Raises HTTP 400 on malformed input.
+    """
+    pairs: list[tuple[str, str]] = []
+
+    for value in split_csv(series):
+        symbol, sep, timeframe = value.partition(":")
+        if not sep or not symbol or not timeframe:
+            raise HTTPException(status_code=400, detail=f"Invalid series '{value}', expected SYMBOL:TIMEFRAME")
+        pairs.append((symbol, timeframe))
+
+    symbol_list = split_csv(symbols)
+    timeframe_list = split_csv(timeframes)
+    if bool(symbol_list) != bool(timeframe_list):
+        raise HTTPException(status_code=400, detail="'symbols' and 'timeframes' must be given together")
+    pairs.extend((symbol, timeframe) for symbol in symbol_list for timeframe in timeframe_list)
+
+    unique = list(dict.fromkeys(pairs))
+    if not unique:
+        raise HTTPException(status_code=400, detail="No series requested")
+    if max_series is not None and len(unique) > max_series:
+        raise HTTPException(status_code=400, detail=f"Too many series: {len(unique)} > {max_series}")
+    return unique
+
+
+def split_csv(values: list[str] | None) -> list[str]:
+    """Split repeated and/or comma-separated query values into a flat list of non-empty items."""
+    if not values:
+        return []
+    return [item.strip() for value in values for item in value.split(",") if item.strip()]
+
+
+def coalesced(fn: Callable[..., T], **kwargs: Any) -> T:
+    """Run a storage read through the API single-flight group.
+
+    Identical concurrent reads (same method and keyword arguments) share one query.
+    """
+    key = (getattr(fn, "__qualname__", repr(fn)), _freeze(kwargs))
+    return get_singleflight().do(key, fn, **kwargs)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    return value
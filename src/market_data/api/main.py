@@ -8,24 +8,64 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from market_data.api.admission import AdmissionMiddleware
+from market_data.api.deps import (
+    get_change_listener,
+    get_indicator_service,
+    get_snapshot_table,
+    get_storage,
+)
+from market_data.api.metrics import RequestMetricsMiddleware
+from market_data.api.recording import TraceRecordingMiddleware
+from market_data.api.routes.admin import router as admin_router
 from market_data.api.routes.candles import router as candles_router
+from market_data.api.routes.indicators import router as indicators_router
+from market_data.api.routes.ingest import router as ingest_router
+from market_data.api.routes.snapshot import router as snapshot_router
 from market_data.api.routes.status import router as status_router
+from market_data.api.routes.stream import router as stream_router
 from market_data.config import settings
+from market_data.profiling import register_loop
 from market_data.storage.postgres import PostgresStorage
 
 logger = logging.getLogger(__name__)
 
 storage: PostgresStorage | None = None
 
+# True when the API is served from a thread inside the daemon (see run_api), where the daemon
+# publishes candles to the in-process hub directly and the change feed is redundant.
+_embedded = False
+
+
+def _change_feed_enabled() -> bool:
+    if settings.api_change_feed_enabled is not None:
+        return settings.api_change_feed_enabled
+    return not _embedded
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown."""
     global storage
-    storage = PostgresStorage()
+    storage = get_storage()
+    register_loop("api")
+    # Register the indicator cache with the candle hub before any updates arrive.
+    get_indicator_service()
+    snapshot = get_snapshot_table()
+    try:
+        snapshot.seed()
+    except Exception as e:
+        logger.warning(f"Snapshot seeding failed, will retry in the background: {e}")
+    snapshot.start()
+    change_feed = _change_feed_enabled()
+    if change_feed:
+        get_change_listener().start()
     logger.info("Market Data API starting up")
     yield
     logger.info("Market Data API shutting down")
+    if change_feed:
+        get_change_listener().stop()
+    snapshot.stop()
 
 
 def create_app() -> FastAPI:
@@ -37,6 +77,12 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    # Middleware added last runs outermost.
+
+    # Query cost admission control (inside CORS, so 429s still get CORS headers)
+    if settings.api_admission_enabled:
+        app.add_middleware(AdmissionMiddleware)
+
     # CORS
     app.add_middleware(
         CORSMiddleware,
@@ -46,9 +92,26 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Per-route latency (outermost, so admission queueing and 429s are included)
+    if settings.api_metrics_enabled:
+        app.add_middleware(RequestMetricsMiddleware)
+
+    # Request traces for load-test replay (outermost, so timings match what clients saw)
+    if settings.api_trace_path:
+        app.add_middleware(
+            TraceRecordingMiddleware,
+            path=settings.api_trace_path,
+            sample_rate=settings.api_trace_sample_rate,
+        )
+
     # Routes
     app.include_router(status_router, tags=["status"])
     app.include_router(candles_router, prefix="/candles", tags=["candles"])
+    app.include_router(stream_router, prefix="/stream", tags=["stream"])
+    app.include_router(indicators_router, prefix="/indicators", tags=["indicators"])
+    app.include_router(snapshot_router, prefix="/snapshot", tags=["snapshot"])
+    app.include_router(ingest_router, prefix="/ingest", tags=["ingest"])
+    app.include_router(admin_router, prefix="/admin", tags=["admin"], include_in_schema=False)
 
     return app
 
@@ -57,12 +120,40 @@ app = create_app()
 
 
 def run_api():
-    """Run the API server."""
+    """Run the API server in-process (used by the daemon's API thread)."""
     import uvicorn
 
+    global _embedded
+    _embedded = True
     uvicorn.run(
         "market_data.api.main:app",
         host=settings.api_host,
         port=settings.api_port,
         reload=False,
     )
+
+
+def main():
+    """Entry point: run the API as `api_workers` processes, separate from the ingestion daemon.
+
+    Each worker has its own connection pool and caches, kept current through the Postgres
+    change feed. Run the daemon with `DAEMON_API_ENABLED=false` next to it.
+    """
+    import uvicorn
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logger.info(f"Starting API on {settings.api_host}:{settings.api_port} with {settings.api_workers} worker(s)")
+    uvicorn.run(
+        "market_data.api.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        workers=settings.api_workers,
+        reload=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
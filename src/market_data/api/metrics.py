@@ -0,0 +1,42 @@
+"""Per-route API latency recording for `/metrics`."""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from market_data.metrics import API_REQUEST_SECONDS
+
+
+class RequestMetricsMiddleware:
+    """Observe each HTTP request's latency, labelled by route template (not raw path).
+
+    Streaming responses are observed when the stream ends. Unmatched paths share one
+    `unmatched` label so probes for random URLs cannot grow the label set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope.
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            API_REQUEST_SECONDS.labels(scope["method"], path, status).observe(time.perf_counter() - started)
@@ -0,0 +1,114 @@
+"""Request trace recording for load-test replay (benchmarks/loadtest.py)."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Not recorded: operator endpoints, and nothing a replay should hit.
+_SKIPPED_PREFIXES = ("/admin", "/metrics")
+
+
+class TraceWriter:
+    """Append JSON lines to a file in batches.
+
+    Each batch goes out in one O_APPEND write, so several API worker processes can record
+    into the same file without interleaving lines.
+    """
+
+    def __init__(self, path: str, flush_lines: int = 256, flush_seconds: float = 1.0):
+        self.path = path
+        self.flush_lines = flush_lines
+        self.flush_seconds = flush_seconds
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._pending: list[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fd < 0:
+                return
+            self._pending.append(line)
+            if len(self._pending) >= self.flush_lines or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd < 0:
+                return
+            self._flush_locked()
+            os.close(self._fd)
+            self._fd = -1
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending or self._fd < 0:
+            return
+        data = memoryview("".join(self._pending).encode())
+        self._pending.clear()
+        while data:
+            data = data[os.write(self._fd, data):]
+
+
+class TraceRecordingMiddleware:
+    """Record each HTTP request as one JSON line: route template, query string, status, timing.
+
+    Lines look like `{"t": 1718000000.123, "method": "GET", "route": "/candles",
+    "query": "symbol=BTCUSD&timeframe=1m&limit=500", "status": 200, "ms": 3.42, "bytes": 51234}`;
+    `t` is the request start (epoch seconds). `sample_rate` < 1 records a random share of requests.
+    """
+
+    def __init__(self, app: ASGIApp, path: str, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.writer = TraceWriter(path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(_SKIPPED_PREFIXES)
+            or (self.sample_rate < 1 and random.random() >= self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.writer.write({
+                "t": round(started_at, 3),
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or "unmatched",
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "status": status,
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+                "bytes": size,
+            })
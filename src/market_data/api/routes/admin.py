@@ -0,0 +1,94 @@
+"""Authenticated admin routes for profiling the live process."""
+
+from __future__ import annotations
+
+import secrets
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from market_data.config import settings
+from market_data.profiling import ProfilerBusy, collapsed, dump_tasks, get_memory_profiler, sample_stacks
+
+
+def require_admin(
+    authorization: Annotated[str | None, Header()] = None,
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    """Accept `Authorization: Bearer <ADMIN_TOKEN>` or `X-Admin-Token`; hidden without a token set."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = x_admin_token
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    if not token or not secrets.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile/cpu", response_class=PlainTextResponse)
+def profile_cpu(
+    seconds: Annotated[float, Query(gt=0, description="Sampling duration")] = 10.0,
+    interval_ms: Annotated[float, Query(ge=1, le=1000, description="Sampling interval")] = 10.0,
+    idle: Annotated[bool, Query(description="Include threads parked in waits/selects")] = False,
+):
+    """Sample every thread's stack for `seconds`; returns collapsed stacks for a flamegraph.
+
+    Feed the output to flamegraph.pl or open it in speedscope. Blocks this request (one worker
+    thread) for the duration; only one CPU profile runs at a time.
+    """
+    if seconds > settings.admin_profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {settings.admin_profile_max_seconds}")
+    try:
+        stacks, samples = sample_stacks(seconds, interval_ms / 1000, include_idle=idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return PlainTextResponse(collapsed(stacks), headers={"X-Profile-Samples": str(samples)})
+
+
+@router.post("/profile/memory/start")
+def start_memory_profile(
+    frames: Annotated[int, Query(ge=1, le=100, description="Stack frames kept per allocation")] = 10,
+):
+    """Start `tracemalloc` (slows allocations and uses memory until stopped)."""
+    profiler = get_memory_profiler()
+    profiler.start(frames)
+    return {"tracing": profiler.tracing, "frames": frames}
+
+
+@router.get("/profile/memory")
+def memory_snapshot(
+    limit: Annotated[int, Query(ge=1, le=500)] = 25,
+    group_by: Annotated[str, Query(pattern="^(lineno|filename|traceback)$")] = "lineno",
+    diff: Annotated[bool, Query(description="Diff against the previous snapshot when there is one")] = True,
+):
+    """Take a heap snapshot: top allocation sites, or growth since the previous snapshot."""
+    try:
+        snapshot = get_memory_profiler().snapshot(limit=limit, group_by=group_by, diff=diff)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return {"timestamp": datetime.now(UTC).isoformat(), **snapshot}
+
+
+@router.post("/profile/memory/stop")
+def stop_memory_profile():
+    """Stop `tracemalloc` and drop the stored snapshot."""
+    profiler = get_memory_profiler()
+    profiler.stop()
+    return {"tracing": profiler.tracing}
+
+
+@router.get("/tasks")
+def get_tasks(
+    frames: Annotated[int, Query(ge=1, le=200, description="Stack frames per task")] = 20,
+):
+    """Dump the asyncio tasks and their stacks of the daemon and API event loops."""
+    loops = dump_tasks(max_frames=frames)
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "loops": {name: {"count": len(tasks), "tasks": tasks} for name, tasks in loops.items()},
+    }
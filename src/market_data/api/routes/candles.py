@@ -2,15 +2,40 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
-from market_data.storage.postgres import PostgresStorage
+from market_data.api.caching import (
+    LIVE_CACHE_CONTROL,
+    body_etag,
+    closed_cache_control,
+    http_date,
+    is_closed_range,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from market_data.api.cursor import (
+    ChangeCursor,
+    Cursor,
+    Direction,
+    decode_change_cursor,
+    decode_cursor,
+    encode_change_cursor,
+    encode_cursor,
+    series_key,
+)
+from market_data.api.deps import coalesced, get_storage, parse_series
+from market_data.api.serialization import candle_row, candles_response
+from market_data.config import settings
+from market_data.timeframes import choose_base_timeframe, parse_timeframe
 
 router = APIRouter()
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
 
 @router.get("")
 def get_candles(
@@ -20,26 +45,214 @@ def get_candles(
     start: Annotated[datetime | None, Query(description="Start time (ISO 8601)")] = None,
     end: Annotated[datetime | None, Query(description="End time (ISO 8601)")] = None,
     limit: Annotated[int, Query(description="Max candles to return", ge=1, le=10000)] = 1000,
+    cursor: Annotated[str | None, Query(description="Opaque cursor from a previous page")] = None,
+    direction: Annotated[
+        Direction, Query(description="First page: 'backward' = newest candles, 'forward' = oldest candles")
+    ] = "backward",
+    resample: Annotated[
+        str | None,
+        Query(description="Aggregate into an arbitrary timeframe, e.g. 2h, 12h, 3d (built from stored candles)"),
+    ] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
 ):
-    """Get candles for a symbol/timeframe."""
-    storage = PostgresStorage()
-    
-    candles = storage.get_candles(
+    """Get candles for a symbol/timeframe.
+
+    Pages are keyset-paginated on open_time: follow `prev_cursor` for older candles and
+    `next_cursor` for newer ones. `has_more` tells whether the walk direction has more rows.
+
+    Responses carry an ETag. Pages that end before the current open candle are validated
+    from a cheap range summary (a matching If-None-Match skips the row fetch entirely) and
+    are marked cacheable by shared caches.
+
+    With `resample`, stored candles of the coarsest timeframe that divides the requested one
+    are aggregated server-side into epoch-aligned buckets (newest `limit` buckets).
+    """
+    if resample:
+        if cursor or direction != "backward":
+            raise HTTPException(status_code=400, detail="'resample' cannot be combined with cursor pagination")
+        return _resampled_candles(exchange, symbol, resample, start, end, limit, if_none_match, if_modified_since)
+
+    storage = get_storage()
+    key = series_key(exchange, symbol, timeframe)
+
+    position = decode_cursor(cursor, key) if cursor else None
+    if position:
+        direction = position.direction
+
+    # Effective [lower, upper) window of this page.
+    lower, upper = start, end
+    if position and position.direction == "forward":
+        after = position.open_time + timedelta(microseconds=1)
+        lower = max(lower, after) if lower else after
+    elif position:
+        upper = min(upper, position.open_time) if upper else position.open_time
+
+    closed = is_closed_range(timeframe, upper)
+    headers: dict[str, str] = {}
+    if closed:
+        headers, unchanged = _closed_range_validators(
+            exchange, symbol, timeframe, lower, upper, (direction, limit), if_none_match, if_modified_since
+        )
+        if unchanged:
+            return not_modified_response(headers)
+
+    # Fetch one extra row to learn whether the walk direction has more data.
+    if direction == "forward":
+        rows = coalesced(
+            storage.get_candle_rows_after,
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=timeframe,
+            after=position.open_time if position else None,
+            start=start,
+            end=end,
+            limit=limit + 1,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    else:
+        rows = coalesced(
+            storage.get_candle_rows_before,
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=timeframe,
+            before=position.open_time if position else None,
+            start=start,
+            end=end,
+            limit=limit + 1,
+        )
+        has_more = len(rows) > limit
+        rows = rows[-limit:]
+
+    # An empty page keeps the caller's position so tailing a series can resume from it.
+    if rows:
+        next_cursor = encode_cursor(Cursor(key, rows[-1][3], "forward"))
+        prev_cursor = encode_cursor(Cursor(key, rows[0][3], "backward"))
+    else:
+        next_cursor = cursor if direction == "forward" else None
+        prev_cursor = cursor if direction == "backward" else None
+
+    response = candles_response({
+        "exchange": exchange,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "count": len(rows),
+        "candles": None,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }, rows)
+
+    return _with_validators(response, closed, headers, if_none_match)
+
+
+def _resampled_candles(
+    exchange: str,
+    symbol: str,
+    resample: str,
+    start: datetime | None,
+    end: datetime | None,
+    limit: int,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> Response:
+    """Aggregate the coarsest stored base timeframe that divides `resample` into aligned buckets."""
+    try:
+        bucket = parse_timeframe(resample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    base = choose_base_timeframe(bucket, settings.bitfinex_timeframes_list)
+    if base is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No stored timeframe divides '{resample}' (stored: {settings.bitfinex_timeframes})",
+        )
+
+    # Bound the base-row read to the requested buckets; align so the first bucket is complete.
+    lower = start or (end or datetime.now(UTC)) - limit * bucket
+    if lower.tzinfo is None:
+        lower = lower.replace(tzinfo=UTC)
+    lower = _EPOCH + ((lower - _EPOCH) // bucket) * bucket
+
+    closed = is_closed_range(base, end)
+    headers: dict[str, str] = {}
+    if closed:
+        headers, unchanged = _closed_range_validators(
+            exchange, symbol, base, lower, end, ("resample", resample, limit), if_none_match, if_modified_since
+        )
+        if unchanged:
+            return not_modified_response(headers)
+
+    storage = get_storage()
+    candles = coalesced(
+        storage.get_resampled_candles,
         exchange=exchange,
         symbol=symbol,
-        timeframe=timeframe,
-        start=start,
+        base_timeframe=base,
+        bucket=bucket,
+        timeframe_label=resample,
+        start=lower,
         end=end,
         limit=limit,
     )
 
-    return {
+    response = candles_response({
         "exchange": exchange,
         "symbol": symbol,
-        "timeframe": timeframe,
+        "timeframe": resample,
+        "base_timeframe": base,
         "count": len(candles),
-        "candles": [candle.to_dict() for candle in candles],
-    }
+        "candles": None,
+    }, [candle_row(candle) for candle in candles])
+    return _with_validators(response, closed, headers, if_none_match)
+
+
+def _closed_range_validators(
+    exchange: str,
+    symbol: str,
+    timeframe: str,
+    lower: datetime | None,
+    upper: datetime | None,
+    variant: tuple,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> tuple[dict[str, str], bool]:
+    """Validators for a closed window from its range summary; also whether the client copy is current."""
+    storage = get_storage()
+    summary = coalesced(
+        storage.get_range_summary,
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        start=lower,
+        end=upper,
+    )
+    etag = make_etag(
+        series_key(exchange, symbol, timeframe), lower, upper, *variant,
+        summary["count"], summary["oldest"], summary["newest"], summary["last_modified"],
+    )
+    headers = {"ETag": etag, "Cache-Control": closed_cache_control()}
+    if summary["last_modified"]:
+        headers["Last-Modified"] = http_date(summary["last_modified"])
+    return headers, is_not_modified(etag, summary["last_modified"], if_none_match, if_modified_since)
+
+
+def _with_validators(
+    response: Response,
+    closed: bool,
+    headers: dict[str, str],
+    if_none_match: str | None,
+) -> Response:
+    if not closed:
+        # The open candle can still change: validate on the rendered body and always revalidate.
+        etag = body_etag(response.body)
+        headers = {"ETag": etag, "Cache-Control": LIVE_CACHE_CONTROL}
+        if is_not_modified(etag, None, if_none_match, None):
+            return not_modified_response(headers)
+
+    response.headers.update(headers)
+    return response
 
 
 @router.get("/latest")
@@ -50,21 +263,121 @@ def get_latest_candles(
     limit: Annotated[int, Query(description="Number of candles", ge=1, le=1000)] = 100,
 ):
     """Get the N most recent candles."""
-    storage = PostgresStorage()
+    storage = get_storage()
     
-    candles = storage.get_candles(
+    rows = coalesced(
+        storage.get_candle_rows_before,
         exchange=exchange,
         symbol=symbol,
         timeframe=timeframe,
         limit=limit,
     )
 
+    return candles_response({
+        "exchange": exchange,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "count": len(rows),
+        "candles": None,
+    }, rows)
+
+
+@router.get("/changes")
+def get_candle_changes(
+    exchange: Annotated[str, Query(description="Exchange name")] = "bitfinex",
+    symbol: Annotated[str, Query(description="Trading pair symbol")] = "BTCUSD",
+    timeframe: Annotated[str, Query(description="Candle timeframe")] = "1h",
+    since: Annotated[
+        str | None, Query(description="`next_since` token from a previous call, or an ISO 8601 time")
+    ] = None,
+    limit: Annotated[int, Query(description="Max candles to return", ge=1, le=10000)] = 1000,
+):
+    """Get candles inserted or modified since a position in the series change feed.
+
+    Start without `since` for a full sync, then keep passing the returned `next_since`; follow
+    it immediately while `has_more` is true. Each call returns only rows that changed, so
+    keeping a local copy current costs traffic proportional to changes, not window size.
+    """
+    key = series_key(exchange, symbol, timeframe)
+    position: ChangeCursor | None = None
+    since_time: datetime | None = None
+    if since:
+        try:
+            since_time = datetime.fromisoformat(since)
+        except ValueError:
+            position = decode_change_cursor(since, key)
+        else:
+            if since_time.tzinfo is None:
+                since_time = since_time.replace(tzinfo=UTC)
+
+    storage = get_storage()
+    changes = coalesced(
+        storage.get_candle_changes,
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        since=since_time,
+        after_xid=position.change_xid if position else None,
+        after_open_time=position.open_time if position else None,
+        limit=limit + 1,
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if changes:
+        change_xid, _, last = changes[-1]
+        next_since = encode_change_cursor(ChangeCursor(key, change_xid, last.open_time))
+    else:
+        next_since = since
+
     return {
         "exchange": exchange,
         "symbol": symbol,
         "timeframe": timeframe,
-        "count": len(candles),
-        "candles": [candle.to_dict() for candle in candles],
+        "count": len(changes),
+        "candles": [{**candle.to_dict(), "updated_at": updated_at.isoformat()} for _, updated_at, candle in changes],
+        "has_more": has_more,
+        "next_since": next_since,
+    }
+
+
+@router.get("/batch")
+def get_candles_batch(
+    exchange: Annotated[str, Query(description="Exchange name")] = "bitfinex",
+    series: Annotated[
+        list[str] | None, Query(description="Series as SYMBOL:TIMEFRAME (repeat or comma-separate)")
+    ] = None,
+    symbols: Annotated[list[str] | None, Query(description="Symbols, combined with every timeframe")] = None,
+    timeframes: Annotated[list[str] | None, Query(description="Timeframes, combined with every symbol")] = None,
+    start: Annotated[datetime | None, Query(description="Start time (ISO 8601)")] = None,
+    end: Annotated[datetime | None, Query(description="End time (ISO 8601)")] = None,
+    limit: Annotated[int, Query(description="Max candles per series", ge=1, le=1000)] = 100,
+):
+    """Get candles for many series over a shared window in a single query."""
+    pairs = parse_series(series, symbols, timeframes, max_series=settings.api_batch_max_series)
+    storage = get_storage()
+
+    grouped = coalesced(
+        storage.get_candles_batch,
+        exchange=exchange,
+        series=pairs,
+        start=start,
+        end=end,
+        limit=limit,
+    )
+
+    return {
+        "exchange": exchange,
+        "count": len(grouped),
+        "series": [
+            {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "count": len(candles),
+                "candles": [candle.to_dict() for candle in candles],
+            }
+            for (symbol, timeframe), candles in grouped.items()
+        ],
     }
 
 
@@ -75,9 +388,10 @@ def get_candle_count(
     timeframe: Annotated[str, Query(description="Candle timeframe")] = "1h",
 ):
     """Get total candle count for a symbol/timeframe."""
-    storage = PostgresStorage()
+    storage = get_storage()
     
-    count = storage.get_candle_count(
+    count = coalesced(
+        storage.get_candle_count,
         exchange=exchange,
         symbol=symbol,
         timeframe=timeframe,
@@ -94,8 +408,8 @@ def get_candle_count(
 @router.get("/symbols")
 def list_symbols():
     """List all symbols with data."""
-    storage = PostgresStorage()
-    status = storage.get_ingestion_status()
+    storage = get_storage()
+    status = coalesced(storage.get_ingestion_status)
     
     # Extract unique symbols
     symbols = list(set(s["symbol"] for s in status.get("symbols", [])))
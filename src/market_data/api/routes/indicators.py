@@ -0,0 +1,43 @@
+"""Technical indicator routes."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+
+from market_data.api.deps import get_indicator_service, parse_series
+from market_data.config import settings
+from market_data.exchanges.bitfinex import TIMEFRAMES
+
+router = APIRouter()
+
+
+@router.get("")
+def get_indicators(
+    exchange: Annotated[str, Query(description="Exchange name")] = "bitfinex",
+    series: Annotated[
+        list[str] | None, Query(description="Series as SYMBOL:TIMEFRAME (repeat or comma-separate)")
+    ] = None,
+    symbols: Annotated[list[str] | None, Query(description="Symbols, combined with every timeframe")] = None,
+    timeframes: Annotated[list[str] | None, Query(description="Timeframes, combined with every symbol")] = None,
+):
+    """Get the latest RSI(14), MACD(12,26,9), ATR(14), Bollinger(20,2) and daily VWAP per series.
+
+    Values include the current open candle provisionally (`closed: false`).
+    """
+    pairs = parse_series(series, symbols, timeframes, max_series=settings.api_batch_max_series)
+    unsupported = sorted({timeframe for _, timeframe in pairs if timeframe not in TIMEFRAMES})
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported timeframe(s): {', '.join(unsupported)}")
+
+    values = get_indicator_service().latest(exchange, pairs)
+
+    return {
+        "exchange": exchange,
+        "count": len(values),
+        "series": [
+            {"symbol": symbol, "timeframe": timeframe, "indicators": indicators}
+            for (symbol, timeframe), indicators in values.items()
+        ],
+    }
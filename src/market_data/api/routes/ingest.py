@@ -0,0 +1,42 @@
+"""Realtime ingest latency routes."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from market_data.api.deps import split_csv
+from market_data.config import settings
+from market_data.services.ingest_latency import get_ingest_latency_tracker
+
+router = APIRouter()
+
+
+@router.get("/latency")
+def get_ingest_latency(
+    symbols: Annotated[list[str] | None, Query(description="Only these symbols (repeat or comma-separate)")] = None,
+    timeframe: Annotated[str | None, Query(description="Only this timeframe")] = None,
+    breached: Annotated[bool, Query(description="Only series currently breaching an SLO")] = False,
+):
+    """Get per-series WS receive-to-commit latency percentiles by stage, freshness and SLO status.
+
+    Populated in the process running WS ingestion (the daemon with its embedded API); separate
+    API workers return no series. Percentiles cover the last `ingest_latency_window` updates.
+    """
+    symbol_filter = set(split_csv(symbols))
+    series = [
+        row
+        for row in get_ingest_latency_tracker().get_latency()
+        if (not symbol_filter or row["symbol"] in symbol_filter)
+        and (timeframe is None or row["timeframe"] == timeframe)
+        and (not breached or row["slo"]["breached"])
+    ]
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "ws_save_batch_size": settings.ws_save_batch_size,
+        "ws_save_flush_seconds": settings.ws_save_flush_seconds,
+        "count": len(series),
+        "series": series,
+    }
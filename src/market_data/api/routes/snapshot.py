@@ -0,0 +1,34 @@
+"""Cross-symbol market snapshot routes."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from market_data.api.deps import get_snapshot_table, split_csv
+from market_data.services.snapshot import snapshot_row
+
+router = APIRouter()
+
+
+@router.get("")
+def get_snapshot(
+    exchange: Annotated[str, Query(description="Exchange name")] = "bitfinex",
+    timeframe: Annotated[str, Query(description="Candle timeframe")] = "1h",
+    symbols: Annotated[list[str] | None, Query(description="Only these symbols (repeat or comma-separate)")] = None,
+):
+    """Get the newest candle (close, volume, change from open) of every symbol at one timeframe.
+
+    Served from an in-memory table kept current by the realtime stream; no database query.
+    """
+    candles = get_snapshot_table().snapshot(exchange, timeframe, split_csv(symbols) or None)
+
+    return {
+        "exchange": exchange,
+        "timeframe": timeframe,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "count": len(candles),
+        "symbols": [snapshot_row(candle) for candle in candles],
+    }
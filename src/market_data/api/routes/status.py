@@ -4,9 +4,23 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 
-from market_data.storage.postgres import PostgresStorage
+from market_data.api.admission import get_admission_controller
+from market_data.api.deps import (
+    coalesced,
+    get_change_feed_stats,
+    get_indicator_service,
+    get_snapshot_table,
+    get_storage,
+)
+from market_data.api.singleflight import get_singleflight
+from market_data.config import settings
+from market_data.executors import get_executor_stats
+from market_data.metrics import CONTENT_TYPE, render_metrics
+from market_data.scheduler import get_rest_scheduler
+from market_data.services.realtime import get_candle_hub
 
 router = APIRouter()
 
@@ -23,8 +37,8 @@ def health_check():
 @router.get("/status")
 def get_status():
     """Get ingestion status summary."""
-    storage = PostgresStorage()
-    status = storage.get_ingestion_status()
+    storage = get_storage()
+    status = coalesced(storage.get_ingestion_status)
     
     return {
         "status": "ok",
@@ -33,11 +47,35 @@ def get_status():
     }
 
 
+@router.get("/stats")
+def get_api_stats():
+    """Get in-process API runtime statistics (request coalescing, push streams)."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "singleflight": get_singleflight().get_stats(),
+        "admission": get_admission_controller().get_stats(),
+        "stream": get_candle_hub().get_stats(),
+        "indicators": get_indicator_service().get_stats(),
+        "snapshot": get_snapshot_table().get_stats(),
+        "change_feed": get_change_feed_stats(),
+        "rest_scheduler": get_rest_scheduler().get_stats(),
+        "executors": get_executor_stats(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics of this process (scrape every API worker and the daemon)."""
+    if not settings.api_metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 @router.get("/jobs")
 def get_recent_jobs(limit: int = 20):
     """Get recent ingestion jobs."""
-    storage = PostgresStorage()
-    jobs = storage.get_recent_jobs(limit=limit)
+    storage = get_storage()
+    jobs = coalesced(storage.get_recent_jobs, limit=limit)
     
     return {
         "jobs": [
@@ -61,8 +99,8 @@ def get_recent_jobs(limit: int = 20):
 @router.get("/gaps")
 def get_gaps():
     """Get unrepaired gaps."""
-    storage = PostgresStorage()
-    gaps = storage.get_unrepaired_gaps()
+    storage = get_storage()
+    gaps = coalesced(storage.get_unrepaired_gaps)
     
     return {
         "gaps": [
@@ -0,0 +1,132 @@
+"""Realtime candle push routes (WebSocket and Server-Sent Events)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from market_data.api.deps import parse_series
+from market_data.config import settings
+from market_data.services.realtime import SeriesKey, get_candle_hub
+
+router = APIRouter()
+
+
+def _series_keys(exchange: str, series: list[str] | None) -> list[SeriesKey]:
+    pairs = parse_series(series, max_series=settings.api_stream_max_series)
+    return [(exchange, symbol, timeframe) for symbol, timeframe in pairs]
+
+
+@router.get("/sse")
+async def stream_sse(
+    request: Request,
+    series: Annotated[list[str], Query(description="Series as SYMBOL:TIMEFRAME (repeat or comma-separate)")],
+    exchange: Annotated[str, Query(description="Exchange name")] = "bitfinex",
+    closed_only: Annotated[bool, Query(description="Only push candles once they have closed")] = False,
+):
+    """Stream candle updates as Server-Sent Events (`event: candle`, JSON `data`)."""
+    keys = _series_keys(exchange, series)
+    sub = get_candle_hub().subscribe(keys, closed_only=closed_only)
+    heartbeat = max(1.0, settings.api_stream_heartbeat_seconds)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    batch = await asyncio.wait_for(sub.get(), timeout=heartbeat)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in batch:
+                    yield f"event: candle\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        finally:
+            sub.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_ws(
+    websocket: WebSocket,
+    exchange: str = "bitfinex",
+    closed_only: bool = False,
+):
+    """Stream candle updates over a WebSocket.
+
+    Client messages (JSON):
+      {"op": "subscribe", "series": ["BTCUSD:1h", ...], "exchange": "bitfinex"}
+      {"op": "unsubscribe", "series": ["BTCUSD:1h", ...], "exchange": "bitfinex"}
+
+    Server messages: {"type": "candles", "data": [{"closed": bool, "candle": {...}}, ...]},
+    {"type": "subscribed", "series": [...]} and {"type": "error", "detail": "..."}.
+    Initial series may also be passed as `series` query params.
+    """
+    await websocket.accept()
+    sub = get_candle_hub().subscribe(closed_only=closed_only)
+    heartbeat = max(1.0, settings.api_stream_heartbeat_seconds)
+
+    async def apply(op: str, exchange_name: str, series: list[str]) -> None:
+        keys = _series_keys(exchange_name, series)
+        if op == "subscribe":
+            if len(sub.series | set(keys)) > settings.api_stream_max_series:
+                raise HTTPException(status_code=400, detail="Too many series for one connection")
+            sub.add_series(keys)
+        else:
+            sub.remove_series(keys)
+        await websocket.send_json({"type": "subscribed", "series": [f"{e}:{s}:{t}" for e, s, t in sorted(sub.series)]})
+
+    async def reader() -> None:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):  # malformed JSON, or a binary frame
+                await websocket.send_json({"type": "error", "detail": "Expected a JSON text message"})
+                continue
+            try:
+                op = message.get("op") if isinstance(message, dict) else None
+                if op not in ("subscribe", "unsubscribe"):
+                    raise HTTPException(status_code=400, detail="Expected op 'subscribe' or 'unsubscribe'")
+                await apply(op, str(message.get("exchange") or exchange), list(message.get("series") or []))
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "detail": e.detail})
+
+    async def writer() -> None:
+        while True:
+            try:
+                batch = await asyncio.wait_for(sub.get(), timeout=heartbeat)
+            except TimeoutError:
+                await websocket.send_json({"type": "heartbeat"})
+                continue
+            await websocket.send_json({"type": "candles", "data": batch})
+
+    initial = websocket.query_params.getlist("series")
+    tasks: list[asyncio.Task] = []
+    try:
+        if initial:
+            await apply("subscribe", exchange, initial)
+        tasks = [asyncio.create_task(reader()), asyncio.create_task(writer())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1008)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sub.close()
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
@@ -0,0 +1,81 @@
+"""Direct row-to-bytes JSON serialisation for candle responses.
+
+Produces exactly the bytes Starlette's JSONResponse would render for the same payload built
+from `Candle.to_dict()`, without creating Candle objects, per-row dicts or walking them with
+the generic encoder: each row is a single f-string of pre-formatted fragments.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import Response
+
+from market_data.types import Candle
+
+
+def _dumps(value: Any) -> str:
+    # Same settings as starlette.responses.JSONResponse.render
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+@lru_cache(maxsize=1024)
+def _row_prefix(exchange: str, symbol: str, timeframe: str) -> str:
+    return (
+        f'{{"exchange":{_dumps(exchange)},"symbol":{_dumps(symbol)},"timeframe":{_dumps(timeframe)},"open_time":"'
+    )
+
+
+def candle_rows_json(rows: Iterable[Sequence]) -> str:
+    """JSON array of candle rows (exchange, symbol, timeframe, open_time, close_time, o, h, l, c, v)."""
+    # In a contiguous series each close_time is the next row's open_time: format every
+    # distinct timestamp once (isoformat dominates the per-row cost).
+    # Keyed with the tzinfo as equal instants in different offsets render differently.
+    iso: dict[tuple[datetime, Any], str] = {}
+    parts = []
+    for exchange, symbol, timeframe, open_time, close_time, open_, high, low, close, volume in rows:
+        opened = iso.get((open_time, open_time.tzinfo))
+        if opened is None:
+            opened = iso[(open_time, open_time.tzinfo)] = open_time.isoformat()
+        closed = iso.get((close_time, close_time.tzinfo))
+        if closed is None:
+            closed = iso[(close_time, close_time.tzinfo)] = close_time.isoformat()
+        parts.append(
+            f'{_row_prefix(exchange, symbol, timeframe)}{opened}","close_time":"{closed}",'
+            f'"open":"{open_}","high":"{high}","low":"{low}","close":"{close}","volume":"{volume}"}}'
+        )
+    return "[" + ",".join(parts) + "]"
+
+
+def candle_row(candle: Candle) -> tuple:
+    """Row form of a Candle, for serialising candles that did not come from the database."""
+    return (
+        candle.exchange,
+        candle.symbol,
+        candle.timeframe,
+        candle.open_time,
+        candle.close_time,
+        candle.open,
+        candle.high,
+        candle.low,
+        candle.close,
+        candle.volume,
+    )
+
+
+def render_candles(payload: dict[str, Any], rows: Iterable[Sequence], rows_key: str = "candles") -> bytes:
+    """Render `payload` with the candle rows spliced in at `rows_key` (keeps key order)."""
+    parts = []
+    for key, value in payload.items():
+        rendered = candle_rows_json(rows) if key == rows_key else _dumps(value)
+        parts.append(f"{_dumps(key)}:{rendered}")
+    return ("{" + ",".join(parts) + "}").encode("utf-8")
+
+
+def candles_response(payload: dict[str, Any], rows: Iterable[Sequence], rows_key: str = "candles") -> Response:
+    """Raw JSON response for a candle payload; `payload[rows_key]` is a placeholder for the rows."""
+    return Response(content=render_candles(payload, rows, rows_key), media_type="application/json")
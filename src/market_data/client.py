@@ -0,0 +1,139 @@
+"""Python client helpers for the market data API."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+
+class SeriesMirror:
+    """Local copy of one candle series, kept current from `/candles/changes` deltas.
+
+    The mirror persists its candles and change-feed position to `cache_path` (JSON), so a
+    restarted consumer resumes from where it stopped and only downloads what changed in
+    the meantime. Candles removed by server-side retention are not reported as changes.
+
+        mirror = SeriesMirror("http://localhost:8100", "BTCUSD", "1h", "btcusd-1h.json")
+        mirror.sync()
+        candles = mirror.candles()
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        symbol: str,
+        timeframe: str,
+        cache_path: str | Path,
+        exchange: str = "bitfinex",
+        page_size: int = 5000,
+        client: httpx.Client | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.cache_path = Path(cache_path)
+        self.page_size = page_size
+        self._client = client or httpx.Client(timeout=30.0)
+        self._since: str | None = None
+        self._rows: dict[str, dict] = {}
+        self._load()
+
+    def sync(self) -> int:
+        """Fetch all changes since the last sync and persist them. Returns the number of changed candles."""
+        changed = 0
+        while True:
+            params = {
+                "exchange": self.exchange,
+                "symbol": self.symbol,
+                "timeframe": self.timeframe,
+                "limit": self.page_size,
+            }
+            if self._since:
+                params["since"] = self._since
+
+            response = self._client.get(f"{self.base_url}/candles/changes", params=params)
+            response.raise_for_status()
+            page = response.json()
+
+            for row in page["candles"]:
+                self._rows[row["open_time"]] = row
+            changed += page["count"]
+            self._since = page["next_since"]
+
+            if not page["has_more"]:
+                break
+
+        if changed:
+            self._save()
+            logger.debug(f"Mirror {self.symbol}/{self.timeframe}: applied {changed} changed candles")
+        return changed
+
+    def candles(self, start: datetime | None = None, end: datetime | None = None) -> list[Candle]:
+        """Mirrored candles in chronological order, optionally limited to [start, end)."""
+        result = [_candle_from_dict(row) for row in self._rows.values()]
+        result.sort(key=lambda c: c.open_time)
+        if start:
+            result = [c for c in result if c.open_time >= start]
+        if end:
+            result = [c for c in result if c.open_time < end]
+        return result
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _load(self) -> None:
+        if not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable mirror cache {self.cache_path}: {e}")
+            return
+        if (data.get("exchange"), data.get("symbol"), data.get("timeframe")) != (
+            self.exchange,
+            self.symbol,
+            self.timeframe,
+        ):
+            logger.warning(f"Mirror cache {self.cache_path} belongs to another series, starting over")
+            return
+        self._since = data.get("since")
+        self._rows = {row["open_time"]: row for row in data.get("candles", [])}
+
+    def _save(self) -> None:
+        data = {
+            "exchange": self.exchange,
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "since": self._since,
+            "candles": sorted(self._rows.values(), key=lambda row: row["open_time"]),
+        }
+        # Write-then-rename so a crash never leaves a truncated cache behind.
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_path, self.cache_path)
+
+
+def _candle_from_dict(row: dict) -> Candle:
+    return Candle(
+        exchange=row["exchange"],
+        symbol=row["symbol"],
+        timeframe=row["timeframe"],
+        open_time=datetime.fromisoformat(row["open_time"]),
+        close_time=datetime.fromisoformat(row["close_time"]),
+        open=Decimal(row["open"]),
+        high=Decimal(row["high"]),
+        low=Decimal(row["low"]),
+        close=Decimal(row["close"]),
+        volume=Decimal(row["volume"]),
+    )
@@ -0,0 +1,147 @@
+"""Postgres-coordinated ownership of series between several daemons (cluster mode).
+
+The (exchange, symbol, timeframe) universe is hashed into a fixed number of partitions.
+Every node heartbeats into `cluster_nodes`; the live node set assigns each partition to one
+node by rendezvous (highest random weight) hashing, so a join or leave moves only the
+partitions of that node. A node ingests a partition only while it holds the partition's
+lease row in `cluster_leases`; leases expire when a node stops renewing them, which is how a
+dead node's partitions are handed off. One extra lease, `leader`, elects the node that runs
+cluster-wide maintenance (gap detection, retention cleanup, archiving).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any
+
+from market_data.config import settings
+from market_data.storage.postgres import PostgresStorage
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "leader"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def series_partition(exchange: str, symbol: str, timeframe: str, partitions: int) -> int:
+    """Stable partition of a series (same on every node and Python process)."""
+    return _hash(f"{exchange}:{symbol}:{timeframe}") % partitions
+
+
+def partition_owner(partition: int, nodes: list[str]) -> str | None:
+    """Rendezvous hashing: the live node with the highest weight for this partition."""
+    if not nodes:
+        return None
+    return max(nodes, key=lambda node: (_hash(f"{node}:{partition}"), node))
+
+
+def partition_lease(partition: int) -> str:
+    return f"partition:{partition}"
+
+
+class ClusterCoordinator:
+    """Heartbeats this node and keeps its partition (and possibly leader) leases in sync.
+
+    Call `tick()` periodically (every `tick_seconds`). Ownership is only trusted until the
+    lease lifetime has passed since the last successful renewal, so a node cut off from the
+    database stops ingesting before another node can take over its partitions.
+    """
+
+    def __init__(
+        self,
+        storage: PostgresStorage,
+        node_id: str | None = None,
+        partitions: int | None = None,
+        lease_seconds: float | None = None,
+    ):
+        self.storage = storage
+        self.host = socket.gethostname()
+        self.node_id = node_id or settings.cluster_node_id or f"{self.host}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.partitions = partitions or settings.cluster_partitions
+        self.lease_seconds = lease_seconds or settings.cluster_lease_seconds
+        self.tick_seconds = self.lease_seconds / 3
+        self._lock = threading.Lock()
+        self._owned: frozenset[int] = frozenset()
+        self._leader = False
+        self._valid_until = 0.0
+        self._nodes: list[str] = []
+        self._handoffs = 0
+
+    def tick(self) -> tuple[set[int], set[int]]:
+        """Heartbeat and rebalance once. Returns (partitions gained, partitions lost)."""
+        started = time.monotonic()
+        nodes = self.storage.heartbeat_cluster_node(self.node_id, self.host, self.lease_seconds)
+        if self.node_id not in nodes:  # expired between heartbeat and read: count ourselves in
+            nodes = sorted([*nodes, self.node_id])
+
+        desired = {p for p in range(self.partitions) if partition_owner(p, nodes) == self.node_id}
+        with self._lock:
+            previous = set(self._owned) if time.monotonic() < self._valid_until else set()
+
+        # Release first, so the new owner can take them on its next tick.
+        self.storage.release_leases([partition_lease(p) for p in sorted(previous - desired)], self.node_id)
+        held = self.storage.acquire_leases(
+            [partition_lease(p) for p in sorted(desired)] + [LEADER_LEASE], self.node_id, self.lease_seconds
+        )
+        owned = frozenset(p for p in desired if partition_lease(p) in held)
+
+        with self._lock:
+            self._owned = owned
+            self._leader = LEADER_LEASE in held
+            self._valid_until = started + self.lease_seconds
+            self._nodes = nodes
+
+        gained, lost = set(owned - previous), previous - set(owned)
+        if gained or lost:
+            self._handoffs += 1
+            logger.info(
+                f"Cluster node {self.node_id}: {len(owned)}/{self.partitions} partitions "
+                f"(+{len(gained)} -{len(lost)}), {len(nodes)} live nodes, leader={self._leader}"
+            )
+        return gained, lost
+
+    def leave(self) -> None:
+        """Drop all leases and deregister, handing partitions off without waiting for expiry."""
+        with self._lock:
+            self._owned = frozenset()
+            self._leader = False
+            self._valid_until = 0.0
+        self.storage.remove_cluster_node(self.node_id)
+
+    @property
+    def valid_until(self) -> float:
+        """`time.monotonic()` deadline after which owned partitions are no longer trusted."""
+        with self._lock:
+            return self._valid_until
+
+    @property
+    def is_leader(self) -> bool:
+        with self._lock:
+            return self._leader and time.monotonic() < self._valid_until
+
+    def owned_partitions(self) -> frozenset[int]:
+        with self._lock:
+            return self._owned if time.monotonic() < self._valid_until else frozenset()
+
+    def owns(self, exchange: str, symbol: str, timeframe: str) -> bool:
+        return series_partition(exchange, symbol, timeframe, self.partitions) in self.owned_partitions()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "node_id": self.node_id,
+                "nodes": list(self._nodes),
+                "partitions": len(self._owned),
+                "partitions_total": self.partitions,
+                "leader": self._leader,
+                "handoffs": self._handoffs,
+            }
@@ -13,9 +13,92 @@ class Settings(BaseSettings):
         description="PostgreSQL connection URL",
     )
 
+    db_pool_size: int = Field(default=5, description="SQLAlchemy connection pool size per process")
+    db_max_overflow: int = Field(default=10, description="Extra connections allowed beyond the pool size")
+
     # API
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8100, description="API port")
+    api_workers: int = Field(
+        default=2,
+        description="Number of worker processes started by the standalone market-data-api entry point",
+    )
+    api_batch_max_series: int = Field(
+        default=200,
+        description="Maximum number of (symbol, timeframe) series per /candles/batch request",
+    )
+    api_closed_range_cache_seconds: int = Field(
+        default=86400,
+        description="Cache-Control max-age for /candles ranges that end before the current open candle",
+    )
+    api_stream_max_series: int = Field(
+        default=500,
+        description="Maximum number of series a single push (WebSocket/SSE) client may subscribe to",
+    )
+    api_stream_heartbeat_seconds: float = Field(
+        default=15.0,
+        description="Idle interval after which push streams send a heartbeat",
+    )
+    api_snapshot_refresh_seconds: float = Field(
+        default=60.0,
+        description="Interval at which the in-memory /snapshot table is re-seeded from the database in the background",
+    )
+
+    # API observability and admin
+    api_metrics_enabled: bool = Field(
+        default=True,
+        description="Serve Prometheus metrics at /metrics and record per-route API latency",
+    )
+    admin_token: str = Field(
+        default="",
+        description="Bearer token for the /admin profiling endpoints (empty = endpoints disabled)",
+    )
+    admin_profile_max_seconds: float = Field(default=120.0, description="Longest allowed CPU profile")
+    api_trace_path: str = Field(
+        default="",
+        description="Append one JSON line per API request (route, params, status, timing) to this file "
+        "for load-test replay (empty = off)",
+    )
+    api_trace_sample_rate: float = Field(default=1.0, description="Share of API requests recorded to api_trace_path")
+
+    # API admission control (per API process; the daemon's ingestion writes use their own pool)
+    api_admission_enabled: bool = Field(default=True, description="Apply query cost admission control to the API")
+    api_admission_max_concurrency: int = Field(
+        default=8,
+        description="Max concurrent database-backed requests per API process (keep below DB_POOL_SIZE + DB_MAX_OVERFLOW)",
+    )
+    api_admission_max_cost: float = Field(
+        default=100.0,
+        description="Max total estimated cost in flight per API process (1 unit = 1 query + 1000 rows)",
+    )
+    api_admission_client_max_concurrency: int = Field(
+        default=4,
+        description="Max concurrent database-backed requests per client address",
+    )
+    api_admission_client_max_cost: float = Field(
+        default=50.0,
+        description="Max total estimated cost in flight per client address",
+    )
+    api_admission_queue_seconds: float = Field(
+        default=2.0,
+        description="How long an over-budget request may wait for capacity before a 429",
+    )
+
+    # Change notifications (Postgres LISTEN/NOTIFY)
+    notify_enabled: bool = Field(
+        default=True,
+        description="Publish a notification per changed series when a candle write batch commits",
+    )
+    notify_channel: str = Field(default="candle_changes", description="LISTEN/NOTIFY channel for candle changes")
+    api_change_feed_enabled: bool | None = Field(
+        default=None,
+        description="Keep API caches and push streams current from change notifications "
+        "(default: on for market-data-api workers, off for the API thread inside the daemon)",
+    )
+    api_change_feed_replay_max: int = Field(
+        default=50,
+        description="Changes spanning more candles than this invalidate caches instead of being replayed",
+    )
 
     # Bitfinex
     bitfinex_symbols: str = Field(
@@ -26,8 +109,44 @@ class Settings(BaseSettings):
         default="1h,1d",
         description="Timeframes to ingest (comma-separated)",
     )
+    bitfinex_rest_url: str = Field(
+        default="https://api-pub.bitfinex.com/v2",
+        description="Bitfinex public REST base URL (point at market-data-simulator for offline load tests)",
+    )
+    bitfinex_ws_url: str = Field(
+        default="wss://api-pub.bitfinex.com/ws/2",
+        description="Bitfinex public WebSocket URL",
+    )
+
+    # Cluster mode (several daemons sharing the series universe)
+    cluster_enabled: bool = Field(
+        default=False,
+        description="Coordinate with other daemons through Postgres: each ingests only the series it leases",
+    )
+    cluster_node_id: str = Field(default="", description="Stable node id (default: host-pid-random)")
+    cluster_partitions: int = Field(default=64, description="Number of series partitions leased between nodes")
+    cluster_lease_seconds: float = Field(
+        default=30.0,
+        description="Lease/heartbeat lifetime; a dead node's series move after at most this long",
+    )
+
+    # Daemon executors (threads per workload class; queue = calls allowed to wait for a thread)
+    executor_realtime_workers: int = Field(default=2, description="Threads for WS persistence and heartbeats")
+    executor_realtime_queue: int = Field(default=8, description="Queued realtime calls before callers wait")
+    executor_rest_workers: int = Field(default=4, description="Threads for backfill, catch-up, updates, gap repair")
+    executor_rest_queue: int = Field(default=16, description="Queued REST calls before callers wait")
+    executor_maintenance_workers: int = Field(default=2, description="Threads for cleanup, detection, archiving")
+    executor_maintenance_queue: int = Field(default=4, description="Queued maintenance calls before callers wait")
 
     # Daemon
+    daemon_api_enabled: bool = Field(
+        default=True,
+        description="Serve the API from a thread inside the daemon; disable when running market-data-api",
+    )
+    daemon_metrics_port: int = Field(
+        default=0,
+        description="Serve /metrics on this port from a headless daemon (0 = off; the embedded API serves it)",
+    )
     backfill_on_startup: bool = Field(
         default=True,
         description="Run backfill on daemon startup",
@@ -103,6 +222,25 @@ class Settings(BaseSettings):
         ),
     )
 
+    # Realtime ingest latency tracing and SLOs
+    ingest_latency_window: int = Field(
+        default=1024,
+        description="Recent updates per series kept for latency percentiles and SLO checks",
+    )
+    ingest_slo_latency_ms: float = Field(
+        default=5000.0,
+        description="Default SLO for p99 receive-to-commit latency per series in ms (0 = off)",
+    )
+    ingest_slo_freshness_factor: float = Field(
+        default=2.0,
+        description="Default freshness SLO: now minus newest open_time, in timeframe periods (0 = off)",
+    )
+    ingest_slo_overrides: str = Field(
+        default="",
+        description="Per-series SLOs as SYMBOL:TF=LATENCY_MS/FRESHNESS_S, comma-separated (empty side = default)",
+    )
+    ingest_slo_check_seconds: float = Field(default=30.0, description="Interval between ingest SLO checks")
+
     # Rate limiting (Bitfinex: 10-90 req/min depending on endpoint; candles can be low)
     rate_limit_delay: float = Field(
         default=6.0,
@@ -124,6 +262,14 @@ class Settings(BaseSettings):
         default=120.0,
         description="Maximum backoff seconds",
     )
+    rest_scheduler_aging_seconds: float = Field(
+        default=300.0,
+        description="Queue time that makes REST work one priority level more urgent (starvation guard)",
+    )
+    rest_scheduler_recent_minutes: int = Field(
+        default=1440,
+        description="REST pages ending within this many minutes of now run at top priority",
+    )
 
     # Data retention (days per timeframe)
     retention_1m: int = Field(default=30, description="Days to keep 1m candles")
@@ -131,6 +277,17 @@ class Settings(BaseSettings):
     retention_4h: int = Field(default=730, description="Days to keep 4h candles")
     retention_1d: int = Field(default=1825, description="Days to keep 1d candles")
 
+    # Archive tier (Parquet files queried with DuckDB; needs the `archive` extra)
+    archive_enabled: bool = Field(
+        default=False,
+        description="Compact closed months out of Postgres into Parquet and serve old reads from there",
+    )
+    archive_path: str = Field(default="data/archive", description="Root directory of the Parquet archive")
+    archive_after_days: int = Field(
+        default=45,
+        description="Archive whole months older than this; kept above the 30-day gap detection window",
+    )
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -143,6 +300,11 @@ class Settings(BaseSettings):
     def bitfinex_timeframes_list(self) -> list[str]:
         return [t.strip() for t in self.bitfinex_timeframes.split(",")]
 
+    @property
+    def series_list(self) -> list[tuple[str, str]]:
+        """Configured (symbol, timeframe) pairs."""
+        return [(s, t) for s in self.bitfinex_symbols_list for t in self.bitfinex_timeframes_list]
+
     @property
     def retention_days(self) -> dict[str, int]:
         """Get retention days per timeframe."""
@@ -3,18 +3,28 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import signal
 import sys
 import threading
+import time
 from collections.abc import Iterable
 from datetime import datetime, timezone
 
 from market_data.api.main import run_api
+from market_data.cluster import ClusterCoordinator, series_partition
 from market_data.config import settings
 from market_data.exchanges.bitfinex_ws import BitfinexCandleWSClient, CandleSubscription
+from market_data.executors import MAINTENANCE, REALTIME, REST, get_executors
+from market_data.metrics import PERSIST_BATCH_SIZE, WS_DROPPED, WS_QUEUE_DEPTH, start_metrics_server
+from market_data.profiling import register_loop
+from market_data.scheduler import get_rest_scheduler
+from market_data.services.archive import ArchiveCompactor
 from market_data.services.backfill import BackfillService
 from market_data.services.gap_repair import GapRepairService
+from market_data.services.ingest_latency import get_ingest_latency_tracker
+from market_data.services.realtime import get_candle_hub
 from market_data.storage.postgres import PostgresStorage
 from market_data.types import Candle
 
@@ -32,12 +42,36 @@ class MarketDataDaemon:
 
     def __init__(self):
         self.storage = PostgresStorage()
-        self.backfill_service = BackfillService(self.storage)
-        self.gap_repair_service = GapRepairService(self.storage)
+        # One scheduler orders all REST work (catch-up and fresh gaps ahead of deep backfill).
+        self.rest_scheduler = get_rest_scheduler()
+        self.backfill_service = BackfillService(self.storage, scheduler=self.rest_scheduler)
+        self.gap_repair_service = GapRepairService(self.storage, scheduler=self.rest_scheduler)
         self._running = False
         self._api_thread: threading.Thread | None = None
         self._ws_clients: list[BitfinexCandleWSClient] = []
-        self._ws_queue: asyncio.Queue[Candle] | None = None
+        self._ws_queue: asyncio.Queue[tuple[Candle, float]] | None = None  # (candle, enqueued_at)
+        self._ingest_latency = get_ingest_latency_tracker()
+        self._candle_hub = get_candle_hub()
+        # Separate pools so long backfills or DELETEs never delay realtime persistence.
+        executors = get_executors()
+        self._realtime = executors[REALTIME]
+        self._rest = executors[REST]
+        self._maintenance = executors[MAINTENANCE]
+        # Cluster mode: this node only ingests the series whose partitions it leases.
+        self.cluster = ClusterCoordinator(self.storage) if settings.cluster_enabled else None
+        self._ownership_changed = asyncio.Event()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def _owned_series(self) -> list[tuple[str, str]]:
+        """Configured (symbol, timeframe) pairs this node ingests (all of them outside cluster mode)."""
+        if self.cluster is None:
+            return settings.series_list
+        return [(s, t) for s, t in settings.series_list if self.cluster.owns("bitfinex", s, t)]
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this node runs cluster-wide maintenance (always, outside cluster mode)."""
+        return self.cluster is None or self.cluster.is_leader
 
     def init_database(self) -> None:
         """Initialize database schema."""
@@ -59,12 +93,11 @@ class MarketDataDaemon:
 
         logger.info(f"Starting backfill for {settings.backfill_days} days...")
         
-        # Run in thread pool to not block
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            None,
+        # Run in the REST pool to not block
+        results = await self._rest.run(
             self.backfill_service.backfill_all,
             settings.backfill_days,
+            self._owned_series(),
         )
         
         total = sum(v for v in results.values() if v > 0)
@@ -78,21 +111,16 @@ class MarketDataDaemon:
             return
 
         logger.info(f"Startup catch-up: last {settings.ws_catchup_lookback_minutes} minutes (REST)")
-        loop = asyncio.get_running_loop()
-        results = await loop.run_in_executor(
-            None,
+        results = await self._rest.run(
             self.backfill_service.catchup_recent,
             settings.ws_catchup_lookback_minutes,
+            self._owned_series(),
         )
         total = sum(v for v in results.values() if v > 0)
         logger.info(f"Startup catch-up complete: {total} candles")
 
     def _ws_subscriptions(self) -> list[CandleSubscription]:
-        subs: list[CandleSubscription] = []
-        for symbol in settings.bitfinex_symbols_list:
-            for timeframe in settings.bitfinex_timeframes_list:
-                subs.append(CandleSubscription(symbol=symbol, timeframe=timeframe))
-        return subs
+        return [CandleSubscription(symbol=symbol, timeframe=timeframe) for symbol, timeframe in self._owned_series()]
 
     async def run_ws_ingestion(self) -> None:
         """Stream realtime candles from Bitfinex WS and persist them."""
@@ -100,12 +128,12 @@ class MarketDataDaemon:
             logger.info("WebSocket ingestion disabled")
             return
 
-        subs = self._ws_subscriptions()
-        if not subs:
+        if self.cluster is None and not self._ws_subscriptions():
             logger.info("No WS subscriptions configured")
             return
 
         self._ws_queue = asyncio.Queue(maxsize=10000)
+        WS_QUEUE_DEPTH.set_function(lambda: self._ws_queue.qsize() if self._ws_queue else 0)
 
         dropped = 0
 
@@ -113,14 +141,43 @@ class MarketDataDaemon:
             nonlocal dropped
             if not self._ws_queue:
                 return
+            # Push subscribers get updates straight from the stream, ahead of persistence.
+            self._candle_hub.publish(candles)
+            enqueued_at = time.time()
             for candle in candles:
                 try:
-                    self._ws_queue.put_nowait(candle)
+                    self._ws_queue.put_nowait((candle, enqueued_at))
                 except asyncio.QueueFull:
+                    WS_DROPPED.inc()
                     dropped += 1
                     if dropped % 1000 == 0:
                         logger.warning(f"WS queue full: dropped {dropped} candles")
 
+        persist_task = asyncio.create_task(self._run_ws_persist_loop())
+        try:
+            # Rebuilt whenever cluster ownership changes; runs once outside cluster mode.
+            while self._running:
+                self._ownership_changed.clear()
+                self._ingest_latency.retain(self._owned_series())
+                streams = asyncio.ensure_future(self._run_ws_clients(self._ws_subscriptions(), on_candles))
+                changed = asyncio.ensure_future(self._ownership_changed.wait())
+                await asyncio.wait({streams, changed}, return_when=asyncio.FIRST_COMPLETED)
+                if not changed.done():
+                    changed.cancel()
+                    await streams
+                    break
+                streams.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await streams
+                logger.info("Series ownership changed: restarting WS ingestion")
+        finally:
+            persist_task.cancel()
+
+    async def _run_ws_clients(self, subs: list[CandleSubscription], on_candles) -> None:
+        if not subs:
+            # Nothing leased (yet): idle until ownership changes.
+            await asyncio.Event().wait()
+
         max_per_conn = max(1, int(settings.ws_max_subscriptions_per_connection))
         chunks: list[list[CandleSubscription]] = [
             subs[i : i + max_per_conn] for i in range(0, len(subs), max_per_conn)
@@ -141,34 +198,29 @@ class MarketDataDaemon:
             f"(max_per_conn={max_per_conn})"
         )
 
-        persist_task = asyncio.create_task(self._run_ws_persist_loop())
-        try:
-            await asyncio.gather(*(client.run() for client in self._ws_clients))
-        finally:
-            persist_task.cancel()
+        await asyncio.gather(*(client.run() for client in self._ws_clients))
 
     async def _run_ws_persist_loop(self) -> None:
         if not self._ws_queue:
             return
 
-        batch: list[Candle] = []
+        batch: list[tuple[Candle, float]] = []
         batch_size = max(1, settings.ws_save_batch_size)
         flush_seconds = max(0.2, settings.ws_save_flush_seconds)
-        loop = asyncio.get_running_loop()
 
         while self._running:
             try:
-                candle = await asyncio.wait_for(self._ws_queue.get(), timeout=flush_seconds)
-                batch.append(candle)
+                item = await asyncio.wait_for(self._ws_queue.get(), timeout=flush_seconds)
+                batch.append(item)
                 if len(batch) >= batch_size:
                     to_save = batch
                     batch = []
-                    await loop.run_in_executor(None, self.storage.save_candles, to_save)
+                    await self._persist_batch(to_save)
             except TimeoutError:
                 if batch:
                     to_save = batch
                     batch = []
-                    await loop.run_in_executor(None, self.storage.save_candles, to_save)
+                    await self._persist_batch(to_save)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -176,10 +228,28 @@ class MarketDataDaemon:
 
         if batch:
             try:
-                await loop.run_in_executor(None, self.storage.save_candles, batch)
+                await self._persist_batch(batch)
             except Exception as e:
                 logger.error(f"Final WS persist flush failed: {e}")
 
+    async def _persist_batch(self, batch: list[tuple[Candle, float]]) -> None:
+        PERSIST_BATCH_SIZE.observe(len(batch))
+        flush_started = time.time()
+        await self._realtime.run(self.storage.save_candles, [candle for candle, _ in batch])
+        self._ingest_latency.record_batch(batch, flush_started, time.time())
+
+    async def run_slo_loop(self) -> None:
+        """Periodic ingest latency and freshness SLO checks (breaches are logged and exported)."""
+        if not settings.ws_ingestion_enabled:
+            return
+        interval = max(1.0, settings.ingest_slo_check_seconds)
+        while self._running:
+            await asyncio.sleep(interval)
+            try:
+                self._ingest_latency.check_slos()
+            except Exception as e:
+                logger.error(f"Ingest SLO check error: {e}")
+
     async def run_gap_repair_loop(self) -> None:
         """Periodic gap detection and repair."""
         interval = max(10, int(settings.gap_repair_interval_minutes * 60))
@@ -192,13 +262,12 @@ class MarketDataDaemon:
                 
                 loop = asyncio.get_event_loop()
                 now_ts = loop.time()
-                open_gaps = await loop.run_in_executor(
-                    None,
-                    self.storage.count_unrepaired_gaps,
-                )
+                open_gaps = await self._maintenance.run(self.storage.count_unrepaired_gaps)
 
                 new_gaps = 0
-                detection_due = last_detection_ts is None or (now_ts - last_detection_ts) >= detection_interval
+                detection_due = self.is_leader and (
+                    last_detection_ts is None or (now_ts - last_detection_ts) >= detection_interval
+                )
                 backlog_limit = int(settings.gap_detection_max_open_gaps)
                 if detection_due:
                     if backlog_limit > 0 and open_gaps >= backlog_limit:
@@ -207,16 +276,10 @@ class MarketDataDaemon:
                             f"open_gaps={open_gaps} >= limit={backlog_limit}"
                         )
                     else:
-                        new_gaps = await loop.run_in_executor(
-                            None,
-                            self.gap_repair_service.detect_and_save_gaps,
-                        )
+                        new_gaps = await self._maintenance.run(self.gap_repair_service.detect_and_save_gaps)
                         last_detection_ts = now_ts
 
-                repairs = await loop.run_in_executor(
-                    None,
-                    self.gap_repair_service.repair_all_gaps,
-                )
+                repairs = await self._rest.run(self.gap_repair_service.repair_all_gaps, self._owned_series())
                 result = {
                     "new_gaps_detected": new_gaps,
                     "gaps_repaired": len([v for v in repairs.values() if v >= 0]),
@@ -246,11 +309,7 @@ class MarketDataDaemon:
         
         while self._running:
             try:
-                loop = asyncio.get_event_loop()
-                results = await loop.run_in_executor(
-                    None,
-                    self.backfill_service.update_latest,
-                )
+                results = await self._rest.run(self.backfill_service.update_latest, self._owned_series())
                 
                 total = sum(v for v in results.values() if v > 0)
                 if total > 0:
@@ -261,21 +320,24 @@ class MarketDataDaemon:
 
             await asyncio.sleep(interval)
 
+    async def _wait_for_leadership(self) -> None:
+        """Return once this node leads the cluster, re-checking every cluster tick."""
+        while self._running and not self.is_leader:
+            await asyncio.sleep(self.cluster.tick_seconds)
+
     async def run_cleanup_loop(self) -> None:
         """Periodic cleanup of old candles based on retention policy."""
         # Run cleanup once per day (first run after 1 hour)
         await asyncio.sleep(3600)
         
         while self._running:
+            await self._wait_for_leadership()
+            if not self._running:
+                break
             try:
                 logger.info("Running data retention cleanup...")
                 
-                loop = asyncio.get_event_loop()
-                deleted = await loop.run_in_executor(
-                    None,
-                    self.storage.cleanup_old_candles,
-                    settings.retention_days,
-                )
+                deleted = await self._maintenance.run(self.storage.cleanup_old_candles, settings.retention_days)
                 
                 total = sum(deleted.values())
                 if total > 0:
@@ -289,9 +351,81 @@ class MarketDataDaemon:
             # Run once per day
             await asyncio.sleep(86400)
 
+    async def run_archive_loop(self) -> None:
+        """Periodic compaction of old months into the Parquet archive."""
+        if not settings.archive_enabled:
+            return
+        compactor = ArchiveCompactor(self.storage)
+        # Run compaction once per day (first run after 1 hour)
+        await asyncio.sleep(3600)
+
+        while self._running:
+            await self._wait_for_leadership()
+            if not self._running:
+                break
+            try:
+                logger.info("Running archive compaction...")
+
+                result = await self._maintenance.run(compactor.run)
+                logger.info(
+                    f"Archive compaction complete: {result['deleted']} candles moved, "
+                    f"{result['dropped_files']} expired partitions removed"
+                )
+
+            except Exception as e:
+                logger.error(f"Archive compaction error: {e}")
+
+            # Run once per day
+            await asyncio.sleep(86400)
+
+    async def run_cluster_loop(self) -> None:
+        """Heartbeat cluster membership and pick up series handed over from other nodes."""
+        if self.cluster is None:
+            return
+
+        lapsed = False
+        while self._running:
+            await asyncio.sleep(self.cluster.tick_seconds)
+            try:
+                gained, lost = await self._realtime.run(self.cluster.tick)
+            except Exception as e:
+                logger.error(f"Cluster heartbeat error: {e}")
+                if not lapsed and time.monotonic() >= self.cluster.valid_until:
+                    # Our leases may already be held by other nodes: stop streaming their series.
+                    logger.warning("Cluster leases lapsed without renewal: stopping ingestion of owned series")
+                    lapsed = True
+                    self._ownership_changed.set()
+                continue
+            lapsed = False
+
+            if gained or lost:
+                self._ownership_changed.set()
+            if gained:
+                partitions = self.cluster.partitions
+                series = [
+                    (s, t) for s, t in self._owned_series()
+                    if series_partition("bitfinex", s, t, partitions) in gained
+                ]
+                task = asyncio.create_task(self._take_over(series))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+    async def _take_over(self, series: list[tuple[str, str]]) -> None:
+        """Catch up series gained from another node (it may have died mid-stream)."""
+        if not series:
+            return
+        try:
+            await self._rest.run(self.backfill_service.catchup_recent, settings.ws_catchup_lookback_minutes, series)
+            if settings.backfill_on_startup:
+                # Resumes from the newest stored candle: only does work for series never backfilled.
+                await self._rest.run(self.backfill_service.backfill_all, settings.backfill_days, series)
+        except Exception as e:
+            logger.error(f"Take-over catch-up failed: {e}")
+
     async def run(self) -> None:
         """Main daemon loop."""
         self._running = True
+        register_loop("daemon")
         
         logger.info("=" * 50)
         logger.info("Market Data Service Starting")
@@ -301,9 +435,19 @@ class MarketDataDaemon:
 
         # Initialize
         self.init_database()
+
+        if self.cluster is not None:
+            # Lease partitions before deciding what to ingest.
+            await self._realtime.run(self.cluster.tick)
+            logger.info(f"Cluster node {self.cluster.node_id}: {len(self._owned_series())} series owned")
         
-        # Start API server
-        self.start_api()
+        # Start API server (headless when the API runs as separate market-data-api workers)
+        if settings.daemon_api_enabled:
+            self.start_api()
+        else:
+            logger.info("In-process API disabled (headless daemon)")
+            if settings.daemon_metrics_port:
+                start_metrics_server(settings.daemon_metrics_port, settings.api_host)
 
         # Start realtime WS ingestion early (prevents new gaps).
         ws_task = asyncio.create_task(self.run_ws_ingestion())
@@ -322,6 +466,9 @@ class MarketDataDaemon:
             asyncio.create_task(self.run_gap_repair_loop()),
             asyncio.create_task(self.run_update_loop()),
             asyncio.create_task(self.run_cleanup_loop()),
+            asyncio.create_task(self.run_archive_loop()),
+            asyncio.create_task(self.run_cluster_loop()),
+            asyncio.create_task(self.run_slo_loop()),
         ]
         
         logger.info("Daemon running. Press Ctrl+C to stop.")
@@ -336,6 +483,14 @@ class MarketDataDaemon:
         self._running = False
         for client in self._ws_clients:
             client.stop()
+        self.rest_scheduler.stop()
+        for executor in get_executors().values():
+            executor.shutdown()
+        if self.cluster is not None:
+            try:
+                self.cluster.leave()
+            except Exception as e:
+                logger.error(f"Failed to leave cluster: {e}")
         logger.info("Stop signal received")
 
 
@@ -12,6 +12,9 @@ from market_data.types import Candle
 class ExchangeAdapter(ABC):
     """Protocol for exchange data sources."""
 
+    # Most candles one REST request returns.
+    page_size: int = 1000
+
     @abstractmethod
     def fetch_candles(
         self,
@@ -23,6 +26,16 @@ class ExchangeAdapter(ABC):
         """Fetch historical candles."""
         ...
 
+    def fetch_candle_page(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+    ) -> list[Candle]:
+        """Fetch candles in [start, end) with a single request (at most `page_size`)."""
+        return [c for c in self.fetch_candles(symbol, timeframe, start, end) if c.open_time < end]
+
     @abstractmethod
     def fetch_latest_candles(
         self,
@@ -11,6 +11,7 @@ from typing import Any, Callable
 import httpx
 
 from market_data.exchanges.base import ExchangeAdapter
+from market_data.metrics import REST_RATE_LIMITED, REST_REQUEST_SECONDS
 from market_data.types import Candle
 
 logger = logging.getLogger(__name__)
@@ -27,8 +28,6 @@ TIMEFRAMES = {
     "1w": ("1W", timedelta(weeks=1)),
 }
 
-BASE_URL = "https://api-pub.bitfinex.com/v2"
-
 
 class BitfinexAdapter(ExchangeAdapter):
     """Bitfinex REST API adapter for candle data.
@@ -41,6 +40,8 @@ class BitfinexAdapter(ExchangeAdapter):
     Uses GLOBAL rate limiter shared across all instances/threads.
     """
 
+    page_size = 10000
+
     def __init__(self):
         # Import here to avoid circular imports
         from market_data.config import settings
@@ -48,6 +49,7 @@ class BitfinexAdapter(ExchangeAdapter):
         
         self._rate_limiter = get_rate_limiter()
         self._client = httpx.Client(timeout=30.0)
+        self.base_url = settings.bitfinex_rest_url.rstrip("/")
         
         # Keep local copies for retry logic
         self.max_retries = settings.rate_limit_max_retries
@@ -70,11 +72,16 @@ class BitfinexAdapter(ExchangeAdapter):
             # Wait for rate limit slot (thread-safe, global)
             self._rate_limiter.wait_for_slot()
             
+            started = time.perf_counter()
             try:
                 response = self._client.get(url, params=params)
-                
+                REST_REQUEST_SECONDS.labels("bitfinex", response.status_code).observe(
+                    time.perf_counter() - started
+                )
+
                 if response.status_code == 429:
                     # Rate limited - record and back off
+                    REST_RATE_LIMITED.labels("bitfinex").inc()
                     backoff = self._rate_limiter.record_rate_limit()
                     stats = self._rate_limiter.get_stats()
                     logger.warning(
@@ -97,6 +104,7 @@ class BitfinexAdapter(ExchangeAdapter):
                 time.sleep(2.0)
 
             except httpx.RequestError as e:
+                REST_REQUEST_SECONDS.labels("bitfinex", "error").observe(time.perf_counter() - started)
                 if attempt == self.max_retries - 1:
                     raise
                 logger.warning(f"Request error: {e}, retry {attempt + 1}")
@@ -140,42 +148,54 @@ class BitfinexAdapter(ExchangeAdapter):
         end: datetime,
     ) -> list[Candle]:
         """Fetch historical candles between start and end."""
-        api_tf = self._api_timeframe(timeframe)
-        api_symbol = f"t{symbol}" if not symbol.startswith("t") else symbol
-
         # Bitfinex API returns max 10000 candles per request
         all_candles: list[Candle] = []
         current_start = start
 
         while current_start < end:
-            url = f"{BASE_URL}/candles/trade:{api_tf}:{api_symbol}/hist"
-            params = {
-                "start": int(current_start.timestamp() * 1000),
-                "end": int(end.timestamp() * 1000),
-                "limit": 10000,
-                "sort": 1,  # oldest first
-            }
+            page = self._fetch_page(symbol, timeframe, current_start, end)
 
-            data = self._request_with_retry(url, params)
-
-            if not data:
+            if not page:
                 break
 
-            for item in data:
-                candle = self._parse_candle(item, "bitfinex", symbol, timeframe)
-                all_candles.append(candle)
+            all_candles.extend(page)
 
             # Move start to after last candle
-            if all_candles:
-                current_start = all_candles[-1].close_time
-            else:
-                break
+            current_start = all_candles[-1].close_time
 
             # Small delay between paginated requests (in addition to base throttle)
             time.sleep(0.2)
 
         return all_candles
 
+    def fetch_candle_page(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+    ) -> list[Candle]:
+        """Fetch candles in [start, end) with a single request (at most `page_size`)."""
+        return [c for c in self._fetch_page(symbol, timeframe, start, end) if c.open_time < end]
+
+    def _fetch_page(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> list[Candle]:
+        """One `hist` request, oldest first, from `start` up to and including `end`."""
+        api_tf = self._api_timeframe(timeframe)
+        api_symbol = f"t{symbol}" if not symbol.startswith("t") else symbol
+
+        url = f"{self.base_url}/candles/trade:{api_tf}:{api_symbol}/hist"
+        params = {
+            "start": int(start.timestamp() * 1000),
+            "end": int(end.timestamp() * 1000),
+            "limit": self.page_size,
+            "sort": 1,  # oldest first
+        }
+
+        data = self._request_with_retry(url, params)
+        if not data:
+            return []
+        return [self._parse_candle(item, "bitfinex", symbol, timeframe) for item in data]
+
     def fetch_latest_candles(
         self,
         symbol: str,
@@ -186,7 +206,7 @@ class BitfinexAdapter(ExchangeAdapter):
         api_tf = self._api_timeframe(timeframe)
         api_symbol = f"t{symbol}" if not symbol.startswith("t") else symbol
 
-        url = f"{BASE_URL}/candles/trade:{api_tf}:{api_symbol}/hist"
+        url = f"{self.base_url}/candles/trade:{api_tf}:{api_symbol}/hist"
         params = {"limit": limit, "sort": -1}  # newest first
 
         data = self._request_with_retry(url, params)
@@ -214,6 +234,6 @@ class BitfinexAdapter(ExchangeAdapter):
 
     def get_symbols(self) -> list[str]:
         """List available trading pairs."""
-        url = f"{BASE_URL}/conf/pub:list:pair:exchange"
+        url = f"{self.base_url}/conf/pub:list:pair:exchange"
         data = self._request_with_retry(url)
         return data[0] if data else []
@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
@@ -13,13 +14,13 @@ from typing import Any
 
 import websockets
 
+from market_data.config import settings
 from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.metrics import WS_MESSAGES, WS_PARSE_SECONDS
 from market_data.types import Candle
 
 logger = logging.getLogger(__name__)
 
-WS_URL = "wss://api-pub.bitfinex.com/ws/2"
-
 
 def _api_symbol(symbol: str) -> str:
     return symbol if symbol.startswith("t") else f"t{symbol}"
@@ -81,8 +82,10 @@ class BitfinexCandleWSClient:
         on_candles: Callable[[list[Candle]], Awaitable[None]] | Callable[[list[Candle]], None],
         reconnect_initial_backoff: float = 1.0,
         reconnect_max_backoff: float = 60.0,
+        url: str | None = None,
     ):
         self._subscriptions = subscriptions
+        self._url = url or settings.bitfinex_ws_url
         self._on_candles = on_candles
         self._reconnect_initial_backoff = reconnect_initial_backoff
         self._reconnect_max_backoff = reconnect_max_backoff
@@ -115,7 +118,7 @@ class BitfinexCandleWSClient:
         logger.info(f"Connecting Bitfinex WS ({len(self._subscriptions)} candle subscriptions)")
 
         async with websockets.connect(
-            WS_URL,
+            self._url,
             ping_interval=20,
             ping_timeout=20,
             close_timeout=10,
@@ -128,10 +131,13 @@ class BitfinexCandleWSClient:
 
             while not self._stop_event.is_set():
                 raw = await ws.recv()
+                received_at = time.time()
+                started = time.perf_counter()
                 message = json.loads(raw)
 
                 # Event messages
                 if isinstance(message, dict):
+                    WS_MESSAGES.labels("event").inc()
                     event = message.get("event")
                     if event == "subscribed" and message.get("channel") == "candles":
                         chan_id = int(message["chanId"])
@@ -155,29 +161,40 @@ class BitfinexCandleWSClient:
 
                 # Data messages
                 if not isinstance(message, list) or len(message) < 2:
+                    WS_MESSAGES.labels("other").inc()
                     continue
 
                 chan_id = message[0]
                 payload = message[1]
 
                 if payload == "hb":
+                    WS_MESSAGES.labels("heartbeat").inc()
                     continue
 
                 sub = chan_id_to_sub.get(int(chan_id))
                 if not sub:
+                    WS_MESSAGES.labels("other").inc()
                     continue
 
                 # Snapshot: [chanId, [ [..], [..] ]]
                 if isinstance(payload, list) and payload and isinstance(payload[0], list):
                     latest_item = max(payload, key=lambda item: item[0])
                     candle = parse_ws_candle(latest_item, sub.symbol, sub.timeframe)
+                    candle.received_at = received_at
+                    WS_PARSE_SECONDS.observe(time.perf_counter() - started)
+                    WS_MESSAGES.labels("snapshot").inc()
                     await self._emit([candle])
                     continue
 
                 # Update: [chanId, [..]]
                 if isinstance(payload, list) and len(payload) == 6:
                     candle = parse_ws_candle(payload, sub.symbol, sub.timeframe)
+                    candle.received_at = received_at
+                    WS_PARSE_SECONDS.observe(time.perf_counter() - started)
+                    WS_MESSAGES.labels("update").inc()
                     await self._emit([candle])
+                else:
+                    WS_MESSAGES.labels("other").inc()
 
     async def _emit(self, candles: list[Candle]) -> None:
         if not candles:
@@ -0,0 +1,142 @@
+"""Named, bounded thread pools for the daemon's blocking work.
+
+Blocking calls are split by workload class so they cannot starve each other:
+
+- `realtime`: WS candle persistence and cluster heartbeats (short, latency-sensitive)
+- `rest`: backfill, catch-up, incremental updates and gap repair (long, exchange-bound)
+- `maintenance`: retention cleanup, gap detection, archive compaction (DB-heavy)
+
+Each pool has its own worker count and queue limit. Callers beyond the queue limit wait
+asynchronously (backpressure) rather than piling work into the pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from market_data.config import settings
+
+T = TypeVar("T")
+
+REALTIME = "realtime"
+REST = "rest"
+MAINTENANCE = "maintenance"
+
+
+class BoundedExecutor:
+    """Thread pool with at most `max_workers` running and `max_queue` waiting calls."""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiting = 0  # calls not started yet (blocked on a slot or queued in the pool)
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` on this pool from the event loop."""
+        loop = asyncio.get_running_loop()
+        submitted = time.monotonic()
+        pending = [True]  # still counted in _waiting
+        with self._lock:
+            self._waiting += 1
+
+        def call() -> T:
+            waited = time.monotonic() - submitted
+            with self._lock:
+                if pending[0]:
+                    pending[0] = False
+                    self._waiting -= 1
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                result = fn(*args)
+            except BaseException:
+                with self._lock:
+                    self._running -= 1
+                    self._failed += 1
+                raise
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+            return result
+
+        try:
+            async with self._semaphore(loop):
+                return await loop.run_in_executor(self._pool, call)
+        finally:
+            # Cancelled (or rejected) before a worker picked it up.
+            with self._lock:
+                if pending[0]:
+                    pending[0] = False
+                    self._waiting -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._waiting,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_seconds_avg": round(self._wait_total / started, 4) if started else 0.0,
+                "wait_seconds_max": round(self._wait_max, 4),
+            }
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one loop; follow the loop using the executor.
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._loop = loop
+        return self._slots
+
+
+# Global instances for easy access
+_executors: dict[str, BoundedExecutor] | None = None
+_executors_lock = threading.Lock()
+
+
+def get_executors() -> dict[str, BoundedExecutor]:
+    """Get the process-wide executors by workload class."""
+    global _executors
+    if _executors is None:
+        with _executors_lock:
+            if _executors is None:
+                _executors = {
+                    REALTIME: BoundedExecutor(
+                        REALTIME, settings.executor_realtime_workers, settings.executor_realtime_queue
+                    ),
+                    REST: BoundedExecutor(REST, settings.executor_rest_workers, settings.executor_rest_queue),
+                    MAINTENANCE: BoundedExecutor(
+                        MAINTENANCE, settings.executor_maintenance_workers, settings.executor_maintenance_queue
+                    ),
+                }
+    return _executors
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    return get_executors()[name]
+
+
+def get_executor_stats() -> dict[str, dict[str, Any]]:
+    """Stats of the executors created so far in this process (none unless the daemon runs)."""
+    return {name: executor.get_stats() for name, executor in (_executors or {}).items()}
@@ -0,0 +1,333 @@
+"""Technical indicators: NumPy-vectorised batch functions plus O(1) streaming state.
+
+The batch functions compute full indicator series over arrays (used to seed state from
+stored candles). `IndicatorState` carries the minimal running state of every indicator so
+each newly closed candle is folded in in constant time, and the open candle can be applied
+provisionally without committing it.
+
+Conventions (TA-Lib compatible):
+- EMA is seeded with the SMA of its first `period` inputs; Wilder smoothing is an EMA with
+  alpha = 1 / period (RSI, ATR).
+- Bollinger Bands use the population standard deviation.
+- VWAP is anchored to the UTC day and uses the typical price (high + low + close) / 3.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+from collections import deque
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+ATR_PERIOD = 14
+BB_PERIOD = 20
+BB_STDDEV = 2.0
+
+# Stored candles needed to seed the slowest indicator (MACD signal) with some margin so
+# the EMA seed has decayed away.
+SEED_CANDLES = 300
+
+_DAY_SECONDS = 86400
+_EMA_BLOCK = 128
+
+
+# ---------------------------------------------------------------------------
+# Vectorised batch functions
+# ---------------------------------------------------------------------------
+
+
+def _ema_from(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """EMA of `values` continuing from `seed`, vectorised in fixed-size blocks.
+
+    Within a block y_i = d^(i+1) * seed + alpha * sum_k d^(i-k) x_k with d = 1 - alpha, which
+    is a cumulative sum after rescaling. Blocks bound d^-i so it never overflows.
+    """
+    out = np.empty(len(values), dtype=np.float64)
+    decay = 1.0 - alpha
+    prev = seed
+    for begin in range(0, len(values), _EMA_BLOCK):
+        block = values[begin : begin + _EMA_BLOCK]
+        powers = decay ** np.arange(1, len(block) + 1)
+        if decay == 0.0:
+            out[begin : begin + len(block)] = block
+        else:
+            out[begin : begin + len(block)] = powers * (prev + alpha * np.cumsum(block / powers))
+        prev = out[begin + len(block) - 1]
+    return out
+
+
+def ema(values: np.ndarray, period: int, alpha: float | None = None) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first `period` values (NaN before)."""
+    values = np.asarray(values, dtype=np.float64)
+    alpha = 2.0 / (period + 1) if alpha is None else alpha
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seed = float(values[:period].mean())
+    out[period - 1] = seed
+    out[period:] = _ema_from(values[period:], alpha, seed)
+    return out
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (EMA with alpha = 1 / period)."""
+    return ema(values, period, alpha=1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    avg_gain = wilder(np.clip(delta, 0.0, None), period)
+    avg_loss = wilder(np.clip(-delta, 0.0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    value = np.where(avg_loss == 0.0, 100.0, value)
+    out[1:] = np.where(np.isnan(avg_gain), np.nan, value)
+    return out
+
+
+def macd(
+    close: np.ndarray,
+    fast: int = MACD_FAST,
+    slow: int = MACD_SLOW,
+    signal: int = MACD_SIGNAL,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    close = np.asarray(close, dtype=np.float64)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(len(close), np.nan)
+    valid = ~np.isnan(line)
+    if valid.any():
+        first = int(np.argmax(valid))
+        signal_line[first:] = ema(line[first:], signal)
+    return line, signal_line, line - signal_line
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    ranges = np.vstack((high - low, np.abs(high - prev_close), np.abs(low - prev_close)))
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = ATR_PERIOD) -> np.ndarray:
+    """Average true range (Wilder). The first bar has no previous close and is excluded."""
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) > 1:
+        out[1:] = wilder(tr[1:], period)
+    return out
+
+
+def bollinger(
+    close: np.ndarray,
+    period: int = BB_PERIOD,
+    num_std: float = BB_STDDEV,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger middle, upper and lower bands."""
+    close = np.asarray(close, dtype=np.float64)
+    mid = np.full(len(close), np.nan)
+    std = np.full(len(close), np.nan)
+    if len(close) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(close, period)
+        mid[period - 1 :] = windows.mean(axis=1)
+        std[period - 1 :] = windows.std(axis=1)
+    return mid, mid + num_std * std, mid - num_std * std
+
+
+def vwap(
+    open_time_s: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+) -> np.ndarray:
+    """Volume-weighted average price anchored to the UTC day of each candle."""
+    volume = np.asarray(volume, dtype=np.float64)
+    typical = (np.asarray(high, dtype=np.float64) + np.asarray(low, dtype=np.float64)
+               + np.asarray(close, dtype=np.float64)) / 3.0
+    day = np.asarray(open_time_s, dtype=np.int64) // _DAY_SECONDS
+    pv = np.cumsum(typical * volume)
+    vol = np.cumsum(volume)
+    # Subtract running totals at the start of each day to restart the accumulation.
+    starts = np.concatenate(([True], day[1:] != day[:-1]))
+    start_idx = np.maximum.accumulate(np.where(starts, np.arange(len(day)), 0))
+    pv_base = np.concatenate(([0.0], pv[:-1]))[start_idx]
+    vol_base = np.concatenate(([0.0], vol[:-1]))[start_idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (pv - pv_base) / (vol - vol_base)
+    return np.where(vol - vol_base > 0, out, np.nan)
+
+
+# ---------------------------------------------------------------------------
+# Streaming state
+# ---------------------------------------------------------------------------
+
+
+class _StreamingEMA:
+    """EMA that buffers its first `period` inputs for the SMA seed, then updates in O(1)."""
+
+    __slots__ = ("period", "alpha", "value", "warmup")
+
+    def __init__(self, period: int, alpha: float | None = None):
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+        self.value: float | None = None
+        self.warmup: list[float] = []
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, period: int, alpha: float | None = None) -> _StreamingEMA:
+        state = cls(period, alpha)
+        if len(values) >= period:
+            state.value = float(ema(values, period, state.alpha)[-1])
+        else:
+            state.warmup = [float(v) for v in values]
+        return state
+
+    def update(self, x: float) -> float | None:
+        if self.value is None:
+            self.warmup.append(x)
+            if len(self.warmup) == self.period:
+                self.value = sum(self.warmup) / self.period
+                self.warmup = []
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+def _finite(value: float | None) -> float | None:
+    if value is None or not math.isfinite(value):
+        return None
+    return value
+
+
+class IndicatorState:
+    """Running indicator state for one series over closed candles."""
+
+    def __init__(self) -> None:
+        self.last_open_time_s: int | None = None
+        self.last_close: float | None = None
+        self.gain = _StreamingEMA(RSI_PERIOD, 1.0 / RSI_PERIOD)
+        self.loss = _StreamingEMA(RSI_PERIOD, 1.0 / RSI_PERIOD)
+        self.fast = _StreamingEMA(MACD_FAST)
+        self.slow = _StreamingEMA(MACD_SLOW)
+        self.signal = _StreamingEMA(MACD_SIGNAL)
+        self.atr = _StreamingEMA(ATR_PERIOD, 1.0 / ATR_PERIOD)
+        self.closes: deque[float] = deque(maxlen=BB_PERIOD)
+        self.vwap_day: int | None = None
+        self.vwap_pv = 0.0
+        self.vwap_volume = 0.0
+
+    @classmethod
+    def from_arrays(
+        cls,
+        open_time_s: Sequence[int] | np.ndarray,
+        high: Sequence[float] | np.ndarray,
+        low: Sequence[float] | np.ndarray,
+        close: Sequence[float] | np.ndarray,
+        volume: Sequence[float] | np.ndarray,
+    ) -> IndicatorState:
+        """Seed state from chronologically ordered closed candles using the vectorised functions."""
+        state = cls()
+        open_time_s = np.asarray(open_time_s, dtype=np.int64)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        if len(close) == 0:
+            return state
+
+        state.last_open_time_s = int(open_time_s[-1])
+        state.last_close = float(close[-1])
+
+        delta = np.diff(close)
+        state.gain = _StreamingEMA.from_values(np.clip(delta, 0.0, None), RSI_PERIOD, 1.0 / RSI_PERIOD)
+        state.loss = _StreamingEMA.from_values(np.clip(-delta, 0.0, None), RSI_PERIOD, 1.0 / RSI_PERIOD)
+
+        state.fast = _StreamingEMA.from_values(close, MACD_FAST)
+        state.slow = _StreamingEMA.from_values(close, MACD_SLOW)
+        line = ema(close, MACD_FAST) - ema(close, MACD_SLOW)
+        state.signal = _StreamingEMA.from_values(line[~np.isnan(line)], MACD_SIGNAL)
+
+        state.atr = _StreamingEMA.from_values(true_range(high, low, close)[1:], ATR_PERIOD, 1.0 / ATR_PERIOD)
+        state.closes.extend(float(c) for c in close[-BB_PERIOD:])
+
+        day = open_time_s // _DAY_SECONDS
+        today = day == day[-1]
+        state.vwap_day = int(day[-1])
+        state.vwap_pv = float(((high + low + close) / 3.0 * volume)[today].sum())
+        state.vwap_volume = float(volume[today].sum())
+        return state
+
+    def update(self, open_time_s: int, high: float, low: float, close: float, volume: float) -> None:
+        """Fold one closed candle into the state in O(1)."""
+        if self.last_close is not None:
+            change = close - self.last_close
+            self.gain.update(max(change, 0.0))
+            self.loss.update(max(-change, 0.0))
+            self.atr.update(max(high - low, abs(high - self.last_close), abs(low - self.last_close)))
+
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is not None and slow is not None:
+            self.signal.update(fast - slow)
+
+        self.closes.append(close)
+
+        day = open_time_s // _DAY_SECONDS
+        if day != self.vwap_day:
+            self.vwap_day = day
+            self.vwap_pv = 0.0
+            self.vwap_volume = 0.0
+        self.vwap_pv += (high + low + close) / 3.0 * volume
+        self.vwap_volume += volume
+
+        self.last_open_time_s = open_time_s
+        self.last_close = close
+
+    def values(self) -> dict[str, Any]:
+        """Current indicator values (None while an indicator is still warming up)."""
+        rsi_value = None
+        if self.gain.value is not None and self.loss.value is not None:
+            rsi_value = 100.0 if self.loss.value == 0 else 100.0 - 100.0 / (1.0 + self.gain.value / self.loss.value)
+
+        macd_line = None
+        if self.fast.value is not None and self.slow.value is not None:
+            macd_line = self.fast.value - self.slow.value
+        signal = self.signal.value
+        histogram = macd_line - signal if macd_line is not None and signal is not None else None
+
+        mid = upper = lower = None
+        if len(self.closes) == BB_PERIOD:
+            window = np.fromiter(self.closes, dtype=np.float64, count=BB_PERIOD)
+            mid = float(window.mean())
+            std = float(window.std())
+            upper = mid + BB_STDDEV * std
+            lower = mid - BB_STDDEV * std
+
+        return {
+            "close": self.last_close,
+            "rsi": _finite(rsi_value),
+            "macd": {"macd": _finite(macd_line), "signal": _finite(signal), "histogram": _finite(histogram)},
+            "atr": _finite(self.atr.value),
+            "bollinger": {"middle": _finite(mid), "upper": _finite(upper), "lower": _finite(lower)},
+            "vwap": _finite(self.vwap_pv / self.vwap_volume) if self.vwap_volume > 0 else None,
+        }
+
+    def values_with(self, open_time_s: int, high: float, low: float, close: float, volume: float) -> dict[str, Any]:
+        """Indicator values with an open (not yet closed) candle applied provisionally."""
+        provisional = copy.deepcopy(self)
+        provisional.update(open_time_s, high, low, close, volume)
+        return provisional.values()
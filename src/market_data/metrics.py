@@ -0,0 +1,346 @@
+"""In-process metrics with Prometheus text exposition.
+
+A small, dependency-free subset of the Prometheus client model: counters, gauges (optionally
+computed at scrape time) and fixed-bucket histograms, each with optional labels. Recording is
+a dict lookup plus one uncontended lock per observation, cheap enough for the WS and persist
+hot paths. Values are per process: with several API workers each one exposes its own.
+
+The API serves the registry at `/metrics`; a daemon running without the embedded API can
+expose it on `daemon_metrics_port` instead.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond DB/parse work up to slow REST pages and gap scans.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+
+    def value(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    __slots__ = ("_function", "_lock", "_value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """Compute the value at scrape time (e.g. a queue's current size)."""
+        self._function = function
+
+    def value(self) -> float:
+        function = self._function
+        if function is None:
+            return self._value
+        try:
+            return float(function())
+        except Exception:
+            return math.nan
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_lock", "_sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child holding the value of one label combination."""
+        ...
+
+    def labels(self, *values: str):
+        """Child for one label combination (created once, then a dict lookup)."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> list[tuple[tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            yield f"{self.name}{_labels_text(self.labelnames, values)} {_format_value(child.value())}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_labels_text(self.labelnames, values, le)} {cumulative}"
+            labels = _labels_text(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Ordered set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Global instance for easy access
+REGISTRY = MetricsRegistry()
+
+# Realtime WebSocket ingestion
+WS_MESSAGES = REGISTRY.counter(
+    "market_data_ws_messages_total", "WebSocket messages received, by kind", ["kind"]
+)
+WS_PARSE_SECONDS = REGISTRY.histogram(
+    "market_data_ws_parse_seconds", "Time to decode a WebSocket message into candles", buckets=FAST_BUCKETS
+)
+WS_QUEUE_DEPTH = REGISTRY.gauge("market_data_ws_queue_depth", "Candles waiting in the WS persist queue")
+WS_DROPPED = REGISTRY.counter("market_data_ws_dropped_total", "Candles dropped because the WS queue was full")
+PERSIST_BATCH_SIZE = REGISTRY.histogram(
+    "market_data_persist_batch_size", "Candles per WS persist batch", buckets=SIZE_BUCKETS
+)
+SAVE_CANDLES_SECONDS = REGISTRY.histogram("market_data_save_candles_seconds", "save_candles latency")
+
+# Exchange REST
+REST_REQUEST_SECONDS = REGISTRY.histogram(
+    "market_data_rest_request_seconds", "Exchange REST request latency", ["exchange", "status"]
+)
+RATE_LIMITER_WAIT_SECONDS = REGISTRY.histogram(
+    "market_data_rate_limiter_wait_seconds", "Time spent waiting for a global rate limiter slot"
+)
+REST_RATE_LIMITED = REGISTRY.counter(
+    "market_data_rest_rate_limited_total", "Exchange REST responses with status 429", ["exchange"]
+)
+
+# Gap maintenance
+GAP_DETECTION_SECONDS = REGISTRY.histogram(
+    "market_data_gap_detection_seconds", "Gap detection duration per series"
+)
+GAP_REPAIR_SECONDS = REGISTRY.histogram(
+    "market_data_gap_repair_seconds", "Gap repair duration per gap", ["outcome"]
+)
+
+# Database pool
+DB_POOL_CHECKOUTS = REGISTRY.counter("market_data_db_pool_checkouts_total", "Connections checked out of the pool")
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("market_data_db_pool_checked_out", "Connections currently checked out")
+
+# API
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "market_data_api_request_seconds", "API request latency by route", ["method", "route", "status"]
+)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # scrapes are not worth a log line each
+        return
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve `/metrics` from a daemon thread (for processes without the API)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Metrics exposed on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,214 @@
+"""On-demand profiling of the live process: stack sampling, heap snapshots, asyncio tasks.
+
+Nothing here runs until asked: the sampler is a loop in the calling thread that lasts for
+the requested duration, and `tracemalloc` is only started (and its overhead paid) between
+an explicit start and stop.
+
+- `sample_stacks` reads every thread's current Python stack (`sys._current_frames`) at a fixed
+  interval and returns collapsed stacks (`thread;outer;...;inner count`), the input format of
+  flamegraph.pl, speedscope and most flamegraph viewers. This covers the event loop threads
+  and the executor pools alike.
+- `MemoryProfiler` wraps `tracemalloc` snapshots; each snapshot can be diffed against the
+  previous one to see what grew.
+- `dump_tasks` lists the asyncio tasks and their stacks of every registered event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any
+
+# Leaf frames of threads that are parked, not running (dropped unless idle stacks are asked for).
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("socketserver.py", "serve_forever"),
+    ("ssl.py", "read"),
+    ("socket.py", "readinto"),
+}
+
+_sampling_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Raised when another profile of the same kind is already running."""
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.01, include_idle: bool = False) -> tuple[Counter[str], int]:
+    """Sample all threads for `seconds`. Returns (collapsed stack -> count, samples taken)."""
+    if not _sampling_lock.acquire(blocking=False):
+        raise ProfilerBusy("A CPU profile is already running")
+    try:
+        me = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                leaf = frame.f_code
+                if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(interval)
+        return stacks, samples
+    finally:
+        _sampling_lock.release()
+
+
+def collapsed(stacks: Counter[str]) -> str:
+    """Render stacks in the collapsed (folded) flamegraph format, heaviest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class MemoryProfiler:
+    """`tracemalloc` control with snapshot-to-snapshot diffs."""
+
+    _FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started_here = False
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, frames))
+                self._started_here = True
+            self._baseline = None
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._started_here:
+                tracemalloc.stop()
+                self._started_here = False
+            self._baseline = None
+
+    def snapshot(self, limit: int = 25, group_by: str = "lineno", diff: bool = True) -> dict[str, Any]:
+        """Take a snapshot; return its top allocations, or the growth since the previous one."""
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise ValueError("group_by must be 'lineno', 'filename' or 'traceback'")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running; start it first")
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+            baseline, self._baseline = self._baseline, snapshot
+
+        result: dict[str, Any] = {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "traceback_limit": tracemalloc.get_traceback_limit(),
+        }
+        if diff and baseline is not None:
+            result["diff"] = [
+                {
+                    **self._location(stat.traceback, group_by),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(baseline, group_by)[:limit]
+            ]
+        else:
+            result["top"] = [
+                {**self._location(stat.traceback, group_by), "size_bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics(group_by)[:limit]
+            ]
+        return result
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback, group_by: str) -> dict[str, Any]:
+        frame = traceback[0]
+        location: dict[str, Any] = {"file": frame.filename}
+        if group_by != "filename":
+            location["line"] = frame.lineno
+            location["code"] = linecache.getline(frame.filename, frame.lineno).strip()
+        if group_by == "traceback":
+            location["traceback"] = [f"{f.filename}:{f.lineno}" for f in traceback]
+        return location
+
+
+# Event loops whose tasks can be dumped (the daemon's and the API's).
+_loops: dict[str, asyncio.AbstractEventLoop] = {}
+_loops_lock = threading.Lock()
+
+
+def register_loop(name: str, loop: asyncio.AbstractEventLoop | None = None) -> None:
+    """Make an event loop's tasks visible to `dump_tasks` (call from inside the loop)."""
+    with _loops_lock:
+        _loops[name] = loop or asyncio.get_running_loop()
+
+
+def dump_tasks(max_frames: int = 20) -> dict[str, list[dict[str, Any]]]:
+    """Tasks of every registered (still running) loop with their current await stacks.
+
+    Reads task state from another thread without going through the loop, so it works while
+    a loop is blocked; a stack may be a moment out of date.
+    """
+    with _loops_lock:
+        loops = {name: loop for name, loop in _loops.items() if not loop.is_closed()}
+
+    result: dict[str, list[dict[str, Any]]] = {}
+    for name, loop in loops.items():
+        tasks = []
+        for task in asyncio.all_tasks(loop):
+            coro = task.get_coro()
+            tasks.append({
+                "name": task.get_name(),
+                "coro": getattr(coro, "__qualname__", repr(coro)),
+                "done": task.done(),
+                "stack": [
+                    f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+                    for frame in task.get_stack(limit=max_frames)
+                ],
+            })
+        result[name] = sorted(tasks, key=lambda t: t["name"])
+    return result
+
+
+# Global instance for easy access
+_memory_profiler: MemoryProfiler | None = None
+_memory_profiler_lock = threading.Lock()
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    global _memory_profiler
+    if _memory_profiler is None:
+        with _memory_profiler_lock:
+            if _memory_profiler is None:
+                _memory_profiler = MemoryProfiler()
+    return _memory_profiler
@@ -15,6 +15,8 @@ import threading
 import time
 from typing import Any
 
+from market_data.metrics import RATE_LIMITER_WAIT_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,12 +69,14 @@ class GlobalRateLimiter:
         
         Thread-safe - only one thread can make a request at a time.
         """
+        started = time.perf_counter()
         with self._request_lock:
             elapsed = time.time() - self._last_request_time
             if elapsed < self.request_delay:
                 sleep_time = self.request_delay - elapsed
                 time.sleep(sleep_time)
             self._last_request_time = time.time()
+        RATE_LIMITER_WAIT_SECONDS.observe(time.perf_counter() - started)
     
     def record_success(self) -> None:
         """Record a successful request - gradually reduce backoff."""
@@ -0,0 +1,251 @@
+"""Priority-aware scheduler for exchange REST work.
+
+Backfill, startup catch-up, incremental updates and gap repair all share one exchange rate
+budget. Instead of calling the adapter directly they submit units of work (series, range,
+kind, priority, deadline); the scheduler splits each unit into page-sized requests and one
+dispatcher thread runs them through the global rate limiter in priority order.
+
+Ordering uses virtual time: a page becomes due at `queued_at + priority * aging_seconds`
+(or its unit's deadline, if earlier), and the earliest due page runs next. A lower priority
+therefore means "waits longer", never "waits forever": once a page has waited for
+`aging_seconds` per priority level it beats newer high-priority work. Only the next page of
+each unit is queued at a time, so a long backfill re-queues behind fresh work page by page.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from market_data.config import settings
+from market_data.exchanges.base import ExchangeAdapter
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+# Lower runs sooner.
+PRIORITY_RECENT = 0
+KIND_PRIORITIES = {
+    "catchup": 0,
+    "update": 1,
+    "gap_repair": 2,
+    "backfill": 3,
+}
+
+
+@dataclass
+class WorkUnit:
+    """REST work for one series: the range [start, end), or the newest `limit` candles."""
+
+    exchange: ExchangeAdapter
+    symbol: str
+    timeframe: str
+    kind: str
+    start: datetime | None = None
+    end: datetime | None = None
+    limit: int | None = None
+    priority: int | None = None
+    deadline: datetime | None = None
+
+    def __post_init__(self) -> None:
+        if self.priority is None:
+            self.priority = KIND_PRIORITIES.get(self.kind, max(KIND_PRIORITIES.values()))
+        if self.limit is None and (self.start is None or self.end is None):
+            raise ValueError("WorkUnit needs a start/end range or a limit")
+
+
+@dataclass
+class _Job:
+    unit: WorkUnit
+    future: Future
+    pages: list[tuple[datetime, datetime]]
+    candles: list[Candle] = field(default_factory=list)
+    queued_at: float = 0.0
+
+
+def split_pages(start: datetime, end: datetime, timeframe: str, page_size: int) -> list[tuple[datetime, datetime]]:
+    """Split [start, end) into consecutive ranges of at most `page_size` candles, oldest first."""
+    delta = TIMEFRAMES.get(timeframe, ("1h", timedelta(hours=1)))[1]
+    span = delta * max(1, page_size)
+    pages = []
+    while start < end:
+        pages.append((start, min(end, start + span)))
+        start += span
+    return pages
+
+
+class RestWorkScheduler:
+    """Runs submitted WorkUnits page by page on one dispatcher thread, earliest-due first."""
+
+    def __init__(
+        self,
+        aging_seconds: float | None = None,
+        recent_window: timedelta | None = None,
+    ):
+        self.aging_seconds = aging_seconds if aging_seconds is not None else settings.rest_scheduler_aging_seconds
+        # Pages ending within this window of now run at PRIORITY_RECENT whatever their kind.
+        self.recent_window = recent_window or timedelta(minutes=settings.rest_scheduler_recent_minutes)
+        self._queue: list[tuple[float, int, _Job]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._dispatched: dict[str, int] = {}
+        self._max_wait: dict[str, float] = {}
+        self._failed = 0
+
+    def submit(self, unit: WorkUnit) -> Future:
+        """Queue a unit; the future resolves to its candles in chronological order."""
+        future: Future = Future()
+        if unit.limit is not None:
+            pages: list[tuple[datetime, datetime]] = []
+        else:
+            pages = split_pages(unit.start, unit.end, unit.timeframe, unit.exchange.page_size)
+            if not pages:
+                future.set_result([])
+                return future
+
+        with self._cond:
+            self._ensure_started()
+            self._push(_Job(unit, future, pages))
+        return future
+
+    def fetch_range(
+        self,
+        exchange: ExchangeAdapter,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        kind: str,
+        priority: int | None = None,
+        deadline: datetime | None = None,
+    ) -> list[Candle]:
+        """Fetch [start, end) through the scheduler, blocking until every page has run."""
+        unit = WorkUnit(exchange, symbol, timeframe, kind, start, end, priority=priority, deadline=deadline)
+        return self.submit(unit).result()
+
+    def fetch_latest(
+        self,
+        exchange: ExchangeAdapter,
+        symbol: str,
+        timeframe: str,
+        limit: int,
+        kind: str,
+        priority: int | None = None,
+    ) -> list[Candle]:
+        """Fetch the newest `limit` candles through the scheduler (one request)."""
+        unit = WorkUnit(exchange, symbol, timeframe, kind, limit=limit, priority=priority)
+        return self.submit(unit).result()
+
+    def stop(self) -> None:
+        """Stop dispatching; queued units fail with RuntimeError."""
+        with self._cond:
+            self._running = False
+            pending, self._queue = self._queue, []
+            self._cond.notify_all()
+        for _, _, job in pending:
+            job.future.set_exception(RuntimeError("REST scheduler stopped"))
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._cond:
+            queued: dict[str, int] = {}
+            for _, _, job in self._queue:
+                queued[job.unit.kind] = queued.get(job.unit.kind, 0) + 1
+            return {
+                "queued": queued,
+                "dispatched": dict(self._dispatched),
+                "max_wait_seconds": {kind: round(wait, 3) for kind, wait in self._max_wait.items()},
+                "failed": self._failed,
+            }
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="rest-scheduler", daemon=True)
+            self._thread.start()
+
+    def _push(self, job: _Job) -> None:
+        """Queue the job's next page (caller holds the lock)."""
+        now = time.time()
+        priority = job.unit.priority
+        page_end = job.pages[0][1] if job.pages else None
+        if page_end is None or page_end >= datetime.now(UTC) - self.recent_window:
+            priority = min(priority, PRIORITY_RECENT)
+
+        due = now + priority * self.aging_seconds
+        if job.unit.deadline is not None:
+            due = min(due, job.unit.deadline.timestamp())
+        heapq.heappush(self._queue, (due, next(self._seq), job))
+        job.queued_at = now
+        self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                kind = job.unit.kind
+                wait = time.time() - job.queued_at
+                self._max_wait[kind] = max(self._max_wait.get(kind, 0.0), wait)
+                self._dispatched[kind] = self._dispatched.get(kind, 0) + 1
+
+            try:
+                self._run_page(job)
+            except Exception as e:
+                with self._cond:
+                    self._failed += 1
+                logger.error(f"REST {kind} request failed for {job.unit.symbol}/{job.unit.timeframe}: {e}")
+                job.future.set_exception(e)
+                continue
+
+            if job.pages:
+                with self._cond:
+                    if self._running:
+                        self._push(job)
+                        continue
+                job.future.set_exception(RuntimeError("REST scheduler stopped"))
+            else:
+                job.future.set_result(job.candles)
+
+    def _run_page(self, job: _Job) -> None:
+        unit = job.unit
+        if unit.limit is not None:
+            job.candles = unit.exchange.fetch_latest_candles(unit.symbol, unit.timeframe, limit=unit.limit)
+            return
+
+        start, end = job.pages.pop(0)
+        page = unit.exchange.fetch_candle_page(unit.symbol, unit.timeframe, start, end)
+        job.candles.extend(page)
+        if len(page) >= unit.exchange.page_size and page[-1].close_time < end:
+            # Truncated by the exchange's page limit: fetch the rest of the range next.
+            job.pages.insert(0, (page[-1].close_time, end))
+
+
+# Global instance for easy access
+_scheduler: RestWorkScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_rest_scheduler() -> RestWorkScheduler:
+    """Get the process-wide REST work scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RestWorkScheduler()
+    return _scheduler
@@ -0,0 +1,85 @@
+"""Compaction of closed months from Postgres into the Parquet archive."""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from datetime import UTC, date, datetime, timedelta
+
+from market_data.config import settings
+from market_data.services.gap_repair import GAP_DETECTION_WINDOW
+from market_data.storage.archive import ParquetArchive, month_bounds, month_start, next_month
+from market_data.storage.postgres import PostgresStorage
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveCompactor:
+    """Moves whole months older than `archive_after_days` from Postgres into the archive.
+
+    Each month is exported from one snapshot, merged into its Parquet partition, and only
+    then deleted from Postgres - excluding rows rewritten after the export, which stay in
+    Postgres (and win over the archive) until the next run picks them up.
+    """
+
+    def __init__(
+        self,
+        storage: PostgresStorage | None = None,
+        archive: ParquetArchive | None = None,
+        archive_after_days: int | None = None,
+        retention_days: dict[str, int] | None = None,
+    ):
+        self.storage = storage or PostgresStorage()
+        self.archive = archive or ParquetArchive(settings.archive_path)
+        after = timedelta(days=archive_after_days if archive_after_days is not None else settings.archive_after_days)
+        if after <= GAP_DETECTION_WINDOW:
+            logger.warning(
+                f"archive_after_days ({after.days}) must exceed the gap detection window; "
+                f"using {GAP_DETECTION_WINDOW.days + 1}"
+            )
+            after = GAP_DETECTION_WINDOW + timedelta(days=1)
+        self.archive_after = after
+        self.retention_days = retention_days if retention_days is not None else settings.retention_days
+
+    def run(self, now: datetime | None = None) -> dict[str, int]:
+        """Compact every stored series and apply retention to the archive."""
+        now = now or datetime.now(UTC)
+        cutoff = now - self.archive_after
+        result = {"archived": 0, "deleted": 0, "dropped_files": 0}
+
+        for row in self.storage.get_ingestion_status()["symbols"]:
+            exchange, symbol, timeframe = row["exchange"], row["symbol"], row["timeframe"]
+            if row["oldest"]:
+                oldest = datetime.fromisoformat(row["oldest"])
+                month = month_start(oldest)
+                while month_bounds(month)[1] <= cutoff:
+                    archived, deleted = self.compact_month(exchange, symbol, timeframe, month)
+                    result["archived"] += archived
+                    result["deleted"] += deleted
+                    month = next_month(month)
+
+            days = self.retention_days.get(timeframe)
+            if days is not None:
+                result["dropped_files"] += self.archive.drop_months_before(
+                    exchange, symbol, timeframe, now - timedelta(days=days)
+                )
+
+        return result
+
+    def compact_month(self, exchange: str, symbol: str, timeframe: str, month: date) -> tuple[int, int]:
+        """Archive one month of a series. Returns (rows in the partition, rows deleted from Postgres)."""
+        start, end = month_bounds(month)
+        fd, csv_path = tempfile.mkstemp(prefix="candles-", suffix=".csv")
+        os.close(fd)
+        try:
+            count, updated_at = self.storage.export_candles_csv(exchange, symbol, timeframe, start, end, csv_path)
+            if not count:
+                return 0, 0
+            archived = self.archive.write_month(exchange, symbol, timeframe, month, csv_path)
+        finally:
+            os.unlink(csv_path)
+
+        deleted = self.storage.delete_archived_candles(exchange, symbol, timeframe, start, end, updated_at)
+        logger.info(f"Archived {exchange}/{symbol}/{timeframe} {month:%Y-%m}: {count} rows ({deleted} deleted)")
+        return archived, deleted
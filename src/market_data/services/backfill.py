@@ -9,6 +9,7 @@ from math import ceil
 from market_data.config import settings
 from market_data.exchanges.base import ExchangeAdapter
 from market_data.exchanges.bitfinex import BitfinexAdapter, TIMEFRAMES
+from market_data.scheduler import RestWorkScheduler, get_rest_scheduler
 from market_data.storage.postgres import PostgresStorage
 from market_data.types import IngestionJob
 
@@ -22,9 +23,11 @@ class BackfillService:
         self,
         storage: PostgresStorage | None = None,
         exchange: ExchangeAdapter | None = None,
+        scheduler: RestWorkScheduler | None = None,
     ):
         self.storage = storage or PostgresStorage()
         self.exchange = exchange or BitfinexAdapter()
+        self.scheduler = scheduler or get_rest_scheduler()
 
     def backfill_symbol(
         self,
@@ -71,7 +74,7 @@ class BackfillService:
         try:
             logger.info(f"Backfilling {symbol}/{timeframe} from {start} to {end}")
             
-            candles = self.exchange.fetch_candles(symbol, timeframe, start, end)
+            candles = self.scheduler.fetch_range(self.exchange, symbol, timeframe, start, end, kind="backfill")
             
             if candles:
                 saved = self.storage.save_candles(candles)
@@ -104,78 +107,86 @@ class BackfillService:
             )
             raise
 
-    def backfill_all(self, days: int | None = None) -> dict[str, int]:
-        """Backfill all configured symbols/timeframes.
+    def backfill_all(
+        self,
+        days: int | None = None,
+        series: list[tuple[str, str]] | None = None,
+    ) -> dict[str, int]:
+        """Backfill all configured symbols/timeframes (or only the given `series`).
         
         Returns dict of symbol/timeframe -> candle count.
         """
         results = {}
         
-        for symbol in settings.bitfinex_symbols_list:
-            for timeframe in settings.bitfinex_timeframes_list:
-                key = f"{symbol}/{timeframe}"
-                try:
-                    count = self.backfill_symbol(symbol, timeframe, days=days)
-                    results[key] = count
-                except Exception as e:
-                    logger.error(f"Failed to backfill {key}: {e}")
-                    results[key] = -1
+        for symbol, timeframe in settings.series_list if series is None else series:
+            key = f"{symbol}/{timeframe}"
+            try:
+                count = self.backfill_symbol(symbol, timeframe, days=days)
+                results[key] = count
+            except Exception as e:
+                logger.error(f"Failed to backfill {key}: {e}")
+                results[key] = -1
 
         return results
 
-    def update_latest(self) -> dict[str, int]:
-        """Fetch latest candles for all symbols (incremental update).
+    def update_latest(self, series: list[tuple[str, str]] | None = None) -> dict[str, int]:
+        """Fetch latest candles for all symbols, or only the given `series` (incremental update).
         
         Returns dict of symbol/timeframe -> new candle count.
         """
         results = {}
 
-        for symbol in settings.bitfinex_symbols_list:
-            for timeframe in settings.bitfinex_timeframes_list:
-                key = f"{symbol}/{timeframe}"
-                try:
-                    # Get latest 10 candles to catch up
-                    candles = self.exchange.fetch_latest_candles(symbol, timeframe, limit=10)
-                    if candles:
-                        saved = self.storage.save_candles(candles)
-                        results[key] = saved
-                        logger.debug(f"Updated {saved} candles for {key}")
-                    else:
-                        results[key] = 0
-                except Exception as e:
-                    logger.error(f"Failed to update {key}: {e}")
-                    results[key] = -1
+        for symbol, timeframe in settings.series_list if series is None else series:
+            key = f"{symbol}/{timeframe}"
+            try:
+                # Get latest 10 candles to catch up
+                candles = self.scheduler.fetch_latest(self.exchange, symbol, timeframe, limit=10, kind="update")
+                if candles:
+                    saved = self.storage.save_candles(candles)
+                    results[key] = saved
+                    logger.debug(f"Updated {saved} candles for {key}")
+                else:
+                    results[key] = 0
+            except Exception as e:
+                logger.error(f"Failed to update {key}: {e}")
+                results[key] = -1
 
         return results
 
-    def catchup_recent(self, lookback_minutes: int) -> dict[str, int]:
+    def catchup_recent(
+        self,
+        lookback_minutes: int,
+        series: list[tuple[str, str]] | None = None,
+    ) -> dict[str, int]:
         """Catch up recent candles via REST.
 
         This is designed to be fast and prevent the system from falling behind on startup,
-        especially while longer backfills are still running.
+        especially while longer backfills are still running (or after taking over series
+        from another cluster node).
 
         Returns dict of symbol/timeframe -> saved candle count.
         """
         lookback_minutes = max(1, lookback_minutes)
         results: dict[str, int] = {}
 
-        for symbol in settings.bitfinex_symbols_list:
-            for timeframe in settings.bitfinex_timeframes_list:
-                key = f"{symbol}/{timeframe}"
-                try:
-                    delta = TIMEFRAMES.get(timeframe, ("1h", timedelta(hours=1)))[1]
-                    delta_seconds = max(1.0, delta.total_seconds())
-                    lookback_seconds = lookback_minutes * 60
-                    # Add a small safety margin so we include the most recent partial candle.
-                    limit = int(min(2000, ceil(lookback_seconds / delta_seconds) + 5))
-
-                    candles = self.exchange.fetch_latest_candles(symbol, timeframe, limit=limit)
-                    saved = self.storage.save_candles(candles)
-                    results[key] = saved
-                    if saved > 0:
-                        logger.info(f"Catch-up saved {saved} candles for {key} (limit={limit})")
-                except Exception as e:
-                    logger.error(f"Failed catch-up for {key}: {e}")
-                    results[key] = -1
+        for symbol, timeframe in settings.series_list if series is None else series:
+            key = f"{symbol}/{timeframe}"
+            try:
+                delta = TIMEFRAMES.get(timeframe, ("1h", timedelta(hours=1)))[1]
+                delta_seconds = max(1.0, delta.total_seconds())
+                lookback_seconds = lookback_minutes * 60
+                # Add a small safety margin so we include the most recent partial candle.
+                limit = int(min(2000, ceil(lookback_seconds / delta_seconds) + 5))
+
+                candles = self.scheduler.fetch_latest(
+                    self.exchange, symbol, timeframe, limit=limit, kind="catchup"
+                )
+                saved = self.storage.save_candles(candles)
+                results[key] = saved
+                if saved > 0:
+                    logger.info(f"Catch-up saved {saved} candles for {key} (limit={limit})")
+            except Exception as e:
+                logger.error(f"Failed catch-up for {key}: {e}")
+                results[key] = -1
 
         return results
@@ -0,0 +1,71 @@
+"""Relay committed candle writes from other processes into the local candle hub."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.services.realtime import CandleHub, SeriesKey
+from market_data.storage.notify import CandleChange
+from market_data.storage.postgres import PostgresStorage
+
+logger = logging.getLogger(__name__)
+
+# Drops cached state for one series, or everything when given None.
+Invalidator = Callable[[SeriesKey | None], None]
+
+
+class ChangeFeedRelay:
+    """ChangeListener callback that makes another process's writes look like local hub events.
+
+    Small changes (the realtime stream's open candle, a few repaired candles) are re-read and
+    published to the CandleHub, so push subscribers, the indicator cache and the snapshot table
+    update exactly as if the daemon ran in-process; the hub drops repeats it has already seen.
+    Larger changes (backfill) and reconnects only invalidate the registered caches.
+    """
+
+    def __init__(
+        self,
+        storage: PostgresStorage,
+        hub: CandleHub,
+        invalidators: list[Invalidator] | None = None,
+        replay_max: int = 50,
+    ):
+        self.storage = storage
+        self.hub = hub
+        self.invalidators = invalidators or []
+        self.replay_max = replay_max
+        self._replayed = 0
+        self._invalidated = 0
+
+    def __call__(self, change: CandleChange | None) -> None:
+        if change is None:
+            self._invalidate(None)
+            return
+
+        key = (change.exchange, change.symbol, change.timeframe)
+        delta = TIMEFRAMES[change.timeframe][1] if change.timeframe in TIMEFRAMES else None
+        if delta is None or (change.last_open_time - change.first_open_time) / delta >= self.replay_max:
+            self._invalidate(key)
+            return
+
+        candles = self.storage.get_candles_after(
+            exchange=change.exchange,
+            symbol=change.symbol,
+            timeframe=change.timeframe,
+            start=change.first_open_time,
+            end=change.last_open_time + timedelta(microseconds=1),
+            limit=self.replay_max,
+        )
+        self.hub.publish(candles)
+        self._replayed += len(candles)
+
+    def get_stats(self) -> dict:
+        return {"replayed": self._replayed, "invalidated": self._invalidated}
+
+    def _invalidate(self, key: SeriesKey | None) -> None:
+        self._invalidated += 1
+        for invalidate in self.invalidators:
+            invalidate(key)
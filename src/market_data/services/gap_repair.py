@@ -3,17 +3,32 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
+
 from market_data.config import settings
 from market_data.exchanges.base import ExchangeAdapter
 from market_data.exchanges.bitfinex import BitfinexAdapter, TIMEFRAMES
+from market_data.metrics import GAP_DETECTION_SECONDS, GAP_REPAIR_SECONDS
+from market_data.scheduler import RestWorkScheduler, get_rest_scheduler
 from market_data.storage.postgres import PostgresStorage
 from market_data.types import CandleGap, IngestionJob
 
 logger = logging.getLogger(__name__)
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Default lookback of detect_gaps; older rows may already be compacted out of Postgres.
+GAP_DETECTION_WINDOW = timedelta(days=30)
+
+
+def _from_epoch_ms(value: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=int(value))
+
+
 class GapRepairService:
     """Service for detecting and repairing gaps in candle data."""
 
@@ -21,9 +36,11 @@ class GapRepairService:
         self,
         storage: PostgresStorage | None = None,
         exchange: ExchangeAdapter | None = None,
+        scheduler: RestWorkScheduler | None = None,
     ):
         self.storage = storage or PostgresStorage()
         self.exchange = exchange or BitfinexAdapter()
+        self.scheduler = scheduler or get_rest_scheduler()
 
     def _get_timeframe_delta(self, timeframe: str) -> timedelta:
         """Get expected delta between candles."""
@@ -43,48 +60,47 @@ class GapRepairService:
         is greater than the expected timeframe delta.
         """
         end = end or datetime.now(timezone.utc)
-        start = start or (end - timedelta(days=30))
+        start = start or (end - GAP_DETECTION_WINDOW)
 
-        candles = self.storage.get_candles(
+        # Only the two time columns are needed: scan them as arrays rather than Candle objects.
+        columns = self.storage.get_candle_columns(
             exchange=exchange,
             symbol=symbol,
             timeframe=timeframe,
             start=start,
             end=end,
-            limit=100000,  # Get all in range
+            columns=("open_time", "close_time"),
         )
+        open_ms, close_ms = columns["open_time"], columns["close_time"]
 
-        if len(candles) < 2:
+        if len(open_ms) < 2:
             return []
 
         expected_delta = self._get_timeframe_delta(timeframe)
         # Allow some tolerance (5% of timeframe)
         tolerance = expected_delta * 0.05
+        threshold_ms = (expected_delta + tolerance) // timedelta(milliseconds=1)
+
+        # If gap is larger than expected (with tolerance)
+        actual_ms = open_ms[1:] - close_ms[:-1]
         gaps = []
 
-        for i in range(len(candles) - 1):
-            current = candles[i]
-            next_candle = candles[i + 1]
-
-            actual_delta = next_candle.open_time - current.close_time
-
-            # If gap is larger than expected (with tolerance)
-            if actual_delta > expected_delta + tolerance:
-                gap = CandleGap(
-                    id=None,
-                    exchange=exchange,
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    gap_start=current.close_time,
-                    gap_end=next_candle.open_time,
-                    detected_at=datetime.now(timezone.utc),
-                )
-                gaps.append(gap)
-                logger.info(
-                    f"Gap detected: {symbol}/{timeframe} "
-                    f"from {gap.gap_start} to {gap.gap_end} "
-                    f"({actual_delta})"
-                )
+        for i in np.flatnonzero(actual_ms > threshold_ms):
+            gap = CandleGap(
+                id=None,
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=timeframe,
+                gap_start=_from_epoch_ms(close_ms[i]),
+                gap_end=_from_epoch_ms(open_ms[i + 1]),
+                detected_at=datetime.now(timezone.utc),
+            )
+            gaps.append(gap)
+            logger.info(
+                f"Gap detected: {symbol}/{timeframe} "
+                f"from {gap.gap_start} to {gap.gap_end} "
+                f"({timedelta(milliseconds=int(actual_ms[i]))})"
+            )
 
         return gaps
 
@@ -106,7 +122,8 @@ class GapRepairService:
 
         for sym in symbols:
             for tf in timeframes:
-                gaps = self.detect_gaps(exchange, sym, tf)
+                with GAP_DETECTION_SECONDS.time():
+                    gaps = self.detect_gaps(exchange, sym, tf)
                 for gap in gaps:
                     gap_id = self.storage.save_gap(gap)
                     if gap_id:
@@ -131,6 +148,7 @@ class GapRepairService:
             started_at=datetime.now(timezone.utc),
         )
         job_id = self.storage.create_job(job)
+        started = time.perf_counter()
 
         try:
             logger.info(
@@ -146,11 +164,14 @@ class GapRepairService:
             if gap_end.tzinfo is None:
                 gap_end = gap_end.replace(tzinfo=timezone.utc)
 
-            candles = self.exchange.fetch_candles(
+            # Fresh gaps end within the scheduler's recent window and run ahead of backfill.
+            candles = self.scheduler.fetch_range(
+                self.exchange,
                 gap.symbol,
                 gap.timeframe,
                 gap_start,
                 gap_end,
+                kind="gap_repair",
             )
 
             if candles:
@@ -170,9 +191,11 @@ class GapRepairService:
                 candles_fetched=saved,
                 completed=True,
             )
+            GAP_REPAIR_SECONDS.labels("success").observe(time.perf_counter() - started)
             return saved
 
         except Exception as e:
+            GAP_REPAIR_SECONDS.labels("failed").observe(time.perf_counter() - started)
             logger.error(f"Gap repair failed: {e}")
             self.storage.update_job(
                 job_id,
@@ -182,12 +205,15 @@ class GapRepairService:
             )
             raise
 
-    def repair_all_gaps(self) -> dict[str, int]:
-        """Repair all unrepaired gaps.
+    def repair_all_gaps(self, series: list[tuple[str, str]] | None = None) -> dict[str, int]:
+        """Repair all unrepaired gaps (or only those of the given (symbol, timeframe) `series`).
         
         Returns dict of gap_id -> candles fetched.
         """
         gaps = self.storage.get_unrepaired_gaps()
+        if series is not None:
+            wanted = set(series)
+            gaps = [gap for gap in gaps if (gap.symbol, gap.timeframe) in wanted]
         results = {}
 
         max_repairs = int(settings.gap_repair_max_repairs_per_run)
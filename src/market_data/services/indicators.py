@@ -0,0 +1,322 @@
+"""Cached, incrementally updated technical indicators per series."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.indicators import SEED_CANDLES, IndicatorState
+from market_data.services.realtime import CandleHub, SeriesKey, candle_key
+from market_data.storage.postgres import PostgresStorage
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp())
+
+
+def _from_epoch_ms(value: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=int(value))
+
+
+def _candle_at(exchange: str, symbol: str, timeframe: str, columns: dict[str, np.ndarray], i: int) -> Candle:
+    return Candle(
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        open_time=_from_epoch_ms(columns["open_time"][i]),
+        close_time=_from_epoch_ms(columns["close_time"][i]),
+        open=Decimal(repr(float(columns["open"][i]))),
+        high=Decimal(repr(float(columns["high"][i]))),
+        low=Decimal(repr(float(columns["low"][i]))),
+        close=Decimal(repr(float(columns["close"][i]))),
+        volume=Decimal(repr(float(columns["volume"][i]))),
+    )
+
+
+def _fold(state: IndicatorState, candle: Candle) -> None:
+    state.update(
+        _epoch_seconds(candle.open_time),
+        float(candle.high),
+        float(candle.low),
+        float(candle.close),
+        float(candle.volume),
+    )
+
+
+def seed_limit(timeframe: str, now: datetime, seed_candles: int = SEED_CANDLES) -> int:
+    """Candles to seed a series from: the indicator windows, and every candle of the UTC day for the VWAP."""
+    delta = TIMEFRAMES[timeframe][1] if timeframe in TIMEFRAMES else None
+    if delta is None:
+        return seed_candles
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(seed_candles, (now - midnight) // delta + 1)
+
+
+@dataclass
+class _SeriesIndicators:
+    state: IndicatorState
+    last_closed: datetime | None
+    live: Candle | None = None
+    seeded_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Seeding:
+    """A seed in flight: hub events for the series are buffered until its state is installed."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    events: list[tuple[Candle, bool]] = field(default_factory=list)
+    invalidated: bool = False
+    error: BaseException | None = None
+
+
+class IndicatorService:
+    """Serves latest indicator values per series from cached streaming state.
+
+    State is seeded once per series from stored candles (batched columnar queries covering
+    the indicator windows and the UTC day the VWAP is anchored to) and then kept current by
+    candle events from the CandleHub, so serving the latest values costs O(series)
+    regardless of the indicator window. Concurrent requests for a cold series share one
+    seed, and events arriving while it runs are replayed onto the seeded state. Entries are
+    dropped and lazily re-seeded when the event stream skips a period, rewrites history, or
+    goes quiet for longer than one period.
+    """
+
+    def __init__(
+        self,
+        storage: PostgresStorage,
+        hub: CandleHub | None = None,
+        seed_candles: int = SEED_CANDLES,
+    ):
+        self.storage = storage
+        self.seed_candles = seed_candles
+        self._lock = threading.Lock()
+        self._entries: dict[SeriesKey, _SeriesIndicators] = {}
+        self._seeding: dict[SeriesKey, _Seeding] = {}
+        self._seeds = 0
+        self._incremental_updates = 0
+        self._invalidations = 0
+        if hub is not None:
+            hub.add_listener(self.on_candle)
+
+    def latest(self, exchange: str, series: list[tuple[str, str]]) -> dict[tuple[str, str], dict[str, Any] | None]:
+        """Latest indicator values for each (symbol, timeframe); None for series without data."""
+        keys = list(dict.fromkeys((exchange, symbol, timeframe) for symbol, timeframe in series))
+        now = datetime.now(UTC)
+
+        with self._lock:
+            missing = [key for key in keys if not self._is_fresh(key, now)]
+            # Series another request is already seeding are waited for, not read again.
+            pending = [self._seeding[key] for key in missing if key in self._seeding]
+            claimed = [key for key in missing if key not in self._seeding]
+            for key in claimed:
+                self._seeding[key] = _Seeding()
+        if claimed:
+            self._seed(exchange, claimed, now)
+        for seeding in pending:
+            seeding.done.wait()
+            if seeding.error is not None:
+                raise seeding.error
+
+        result: dict[tuple[str, str], dict[str, Any] | None] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                result[(key[1], key[2])] = self._values(entry) if entry else None
+        return result
+
+    def on_candle(self, candle: Candle, closed: bool) -> None:
+        """CandleHub listener: fold closed candles into cached state, track the open candle."""
+        key = candle_key(candle)
+        with self._lock:
+            seeding = self._seeding.get(key)
+            if seeding is not None:
+                seeding.events.append((candle, closed))
+                return
+            self._apply(key, candle, closed)
+
+    def invalidate(self, key: SeriesKey | None = None) -> None:
+        """Drop cached state for one series (or all); it is re-seeded on next use."""
+        with self._lock:
+            # A seed in flight may have read the state being invalidated: do not install it.
+            for seeding_key, seeding in self._seeding.items():
+                if key is None or seeding_key == key:
+                    seeding.invalidated = True
+                    seeding.events.clear()
+            if key is None:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+            else:
+                self._invalidate(key)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "series_cached": len(self._entries),
+                "seeds": self._seeds,
+                "incremental_updates": self._incremental_updates,
+                "invalidations": self._invalidations,
+            }
+
+    def _apply(self, key: SeriesKey, candle: Candle, closed: bool) -> None:
+        """Fold one hub event into cached state; the caller holds the lock."""
+        entry = self._entries.get(key)
+        delta = TIMEFRAMES[candle.timeframe][1] if candle.timeframe in TIMEFRAMES else None
+        if entry is None or delta is None:
+            return
+
+        if entry.last_closed is not None and candle.open_time <= entry.last_closed:
+            # History before our state changed (late update or repair): re-seed.
+            self._invalidate(key)
+            return
+
+        if closed:
+            if not self._commit(entry, candle, delta):
+                self._invalidate(key)
+                return
+            if entry.live is not None and entry.live.open_time <= candle.open_time:
+                entry.live = None
+            return
+
+        # If the previous open candle closed without us seeing its final state event, fold it now.
+        if (
+            entry.live is not None
+            and candle.open_time > entry.live.open_time
+            and not self._commit(entry, entry.live, delta)
+        ):
+            self._invalidate(key)
+            return
+        if entry.last_closed is not None and candle.open_time > entry.last_closed + delta:
+            self._invalidate(key)
+            return
+        entry.live = candle
+
+    def _invalidate(self, key: SeriesKey) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._invalidations += 1
+
+    def _commit(self, entry: _SeriesIndicators, candle: Candle, delta: timedelta) -> bool:
+        """Fold a closed candle; False if it does not directly follow the last closed one."""
+        if entry.last_closed is not None and candle.open_time != entry.last_closed + delta:
+            return False
+        _fold(entry.state, candle)
+        entry.last_closed = candle.open_time
+        self._incremental_updates += 1
+        return True
+
+    def _is_fresh(self, key: SeriesKey, now: datetime) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        delta = TIMEFRAMES[key[2]][1] if key[2] in TIMEFRAMES else None
+        if delta is None:
+            return False
+        newest = entry.live.open_time if entry.live else entry.last_closed
+        if newest is None:
+            return False
+        if newest.tzinfo is None:
+            newest = newest.replace(tzinfo=UTC)
+        # No events for over a period: the stream is not reaching us, so fall back to storage
+        # (at most once per period, in case the series simply has no trades).
+        stale = newest + 2 * delta < now
+        return not stale or (time.monotonic() - entry.seeded_at) < delta.total_seconds()
+
+    def _seed_limit(self, timeframe: str, now: datetime) -> int:
+        return seed_limit(timeframe, now, self.seed_candles)
+
+    def _seed(self, exchange: str, keys: list[SeriesKey], now: datetime) -> None:
+        """Seed claimed series, then install their state and replay events buffered meanwhile."""
+        entries: dict[SeriesKey, _SeriesIndicators] = {}
+        error: BaseException | None = None
+        try:
+            entries = self._read_seed(exchange, keys, now)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            installed = 0
+            with self._lock:
+                for key in keys:
+                    seeding = self._seeding.pop(key)
+                    entry = entries.get(key)
+                    if entry is not None and not seeding.invalidated:
+                        self._entries[key] = entry
+                        installed += 1
+                        for candle, closed in seeding.events:
+                            self._apply(key, candle, closed)
+                    seeding.error = error
+                    seeding.done.set()
+                self._seeds += installed
+        logger.debug(f"Seeded indicator state for {installed}/{len(keys)} series")
+
+    def _read_seed(self, exchange: str, keys: list[SeriesKey], now: datetime) -> dict[SeriesKey, _SeriesIndicators]:
+        # One batched query per seed size, so a 1m series seeding a whole day does not
+        # widen the reads of coarser series requested alongside it.
+        by_limit: dict[int, list[tuple[str, str]]] = {}
+        for _, symbol, timeframe in keys:
+            by_limit.setdefault(self._seed_limit(timeframe, now), []).append((symbol, timeframe))
+        grouped: dict[tuple[str, str], dict[str, np.ndarray]] = {}
+        for limit, series in by_limit.items():
+            grouped.update(self.storage.get_candle_columns_batch(exchange=exchange, series=series, limit=limit))
+        now_ms = _epoch_seconds(now) * 1000
+
+        entries: dict[SeriesKey, _SeriesIndicators] = {}
+        for (symbol, timeframe), columns in grouped.items():
+            open_ms = columns["open_time"]
+            if not len(open_ms):
+                continue
+            live: Candle | None = None
+            closed = len(open_ms)
+            if columns["close_time"][-1] > now_ms:
+                live = _candle_at(exchange, symbol, timeframe, columns, -1)
+                closed -= 1
+
+            state = IndicatorState.from_arrays(
+                open_ms[:closed] // 1000,
+                columns["high"][:closed],
+                columns["low"][:closed],
+                columns["close"][:closed],
+                columns["volume"][:closed],
+            )
+            entries[(exchange, symbol, timeframe)] = _SeriesIndicators(
+                state=state,
+                last_closed=_from_epoch_ms(open_ms[closed - 1]) if closed else None,
+                live=live,
+            )
+        return entries
+
+    @staticmethod
+    def _values(entry: _SeriesIndicators) -> dict[str, Any]:
+        live = entry.live
+        if live is not None:
+            values = entry.state.values_with(
+                _epoch_seconds(live.open_time),
+                float(live.high),
+                float(live.low),
+                float(live.close),
+                float(live.volume),
+            )
+            open_time = live.open_time
+        else:
+            values = entry.state.values()
+            open_time = entry.last_closed
+        return {
+            "open_time": open_time.isoformat() if open_time else None,
+            "closed": live is None,
+            **values,
+        }
@@ -0,0 +1,263 @@
+"""End-to-end latency of realtime candle updates, from WebSocket receive to committed row.
+
+Every WS candle update is stamped when its frame arrives, when it is queued for persistence,
+when its batch flush starts and when that batch commits. Per series this records four stage
+latencies (all wall-clock seconds):
+
+- `enqueue`: receive to queued (parse and hub publish)
+- `queue`: queued to flush start (batching delay, driven by `ws_save_batch_size` and
+  `ws_save_flush_seconds`)
+- `write`: flush start to commit (`save_candles`, including pool and executor waits)
+- `total`: receive to commit, i.e. when the update is visible to `/candles/latest`
+
+Bitfinex candle frames carry no emit timestamp, so receive time is the earliest stamp.
+Exchange-side freshness is tracked as now minus the newest committed `open_time`.
+
+Recent samples (a bounded window per series) back the percentiles served by the API and the
+SLO checks. All samples also feed the `market_data_ingest_latency_seconds` histogram.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+
+from market_data.config import settings
+from market_data.metrics import REGISTRY
+from market_data.timeframes import parse_timeframe
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("enqueue", "queue", "write", "total")
+PERCENTILES = (50, 90, 99)
+
+SeriesKey = tuple[str, str, str]  # (exchange, symbol, timeframe)
+
+INGEST_LATENCY_SECONDS = REGISTRY.histogram(
+    "market_data_ingest_latency_seconds",
+    "Realtime candle update latency by stage, from WS receive to commit",
+    ["symbol", "timeframe", "stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0),
+)
+INGEST_FRESHNESS_SECONDS = REGISTRY.gauge(
+    "market_data_ingest_freshness_seconds", "Now minus the newest committed open_time", ["symbol", "timeframe"]
+)
+INGEST_SLO_BREACHED = REGISTRY.gauge(
+    "market_data_ingest_slo_breached", "1 while a series breaches its ingest SLO", ["symbol", "timeframe", "slo"]
+)
+
+
+@dataclass(frozen=True)
+class IngestSLO:
+    """Per-series targets: p99 receive-to-commit latency and maximum freshness lag."""
+
+    latency_p99_seconds: float | None
+    freshness_seconds: float | None
+
+
+def parse_slo_overrides(value: str) -> dict[tuple[str, str], tuple[float | None, float | None]]:
+    """Parse `SYMBOL:TF=LATENCY_MS/FRESHNESS_S,...`; either side may be empty to keep the default.
+
+    Example: `BTCUSD:1m=500/90,ETHUSD:1h=/7500`.
+    """
+    overrides: dict[tuple[str, str], tuple[float | None, float | None]] = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            series, targets = item.split("=", 1)
+            symbol, timeframe = series.strip().split(":", 1)
+            latency_ms, _, freshness = targets.partition("/")
+            overrides[(symbol.strip(), timeframe.strip())] = (
+                float(latency_ms) / 1000 if latency_ms.strip() else None,
+                float(freshness) if freshness.strip() else None,
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid ingest SLO override {item!r}: {e}") from e
+    return overrides
+
+
+class _SeriesLatency:
+    __slots__ = ("histograms", "newest_open_time", "samples", "updates")
+
+    def __init__(self, symbol: str, timeframe: str, window: int):
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.histograms = {stage: INGEST_LATENCY_SECONDS.labels(symbol, timeframe, stage) for stage in STAGES}
+        self.newest_open_time: datetime | None = None
+        self.updates = 0
+
+
+class IngestLatencyTracker:
+    """Per-series stage latencies, freshness and SLO state of the realtime ingest path."""
+
+    def __init__(
+        self,
+        window: int | None = None,
+        latency_slo_ms: float | None = None,
+        freshness_slo_factor: float | None = None,
+        overrides: str | None = None,
+    ):
+        self.window = max(1, window or settings.ingest_latency_window)
+        latency_slo_ms = settings.ingest_slo_latency_ms if latency_slo_ms is None else latency_slo_ms
+        self.latency_slo = latency_slo_ms / 1000 if latency_slo_ms > 0 else None
+        self.freshness_slo_factor = (
+            settings.ingest_slo_freshness_factor if freshness_slo_factor is None else freshness_slo_factor
+        )
+        self.overrides = parse_slo_overrides(settings.ingest_slo_overrides if overrides is None else overrides)
+        self._lock = threading.Lock()
+        self._series: dict[SeriesKey, _SeriesLatency] = {}
+        self._breached: set[tuple[SeriesKey, str]] = set()
+
+    def record_batch(self, items: Iterable[tuple[Candle, float]], flush_started: float, committed: float) -> None:
+        """Record one committed batch of `(candle, enqueued_at)` pairs (wall-clock seconds)."""
+        write = committed - flush_started
+        with self._lock:
+            for candle, enqueued in items:
+                received = candle.received_at if candle.received_at is not None else enqueued
+                key = (candle.exchange, candle.symbol, candle.timeframe)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _SeriesLatency(candle.symbol, candle.timeframe, self.window)
+                    INGEST_FRESHNESS_SECONDS.labels(candle.symbol, candle.timeframe).set_function(
+                        lambda s=series: (datetime.now(UTC) - s.newest_open_time).total_seconds()
+                    )
+                for stage, value in (
+                    ("enqueue", enqueued - received),
+                    ("queue", flush_started - enqueued),
+                    ("write", write),
+                    ("total", committed - received),
+                ):
+                    value = max(0.0, value)
+                    series.samples[stage].append(value)
+                    series.histograms[stage].observe(value)
+                series.updates += 1
+                if series.newest_open_time is None or candle.open_time > series.newest_open_time:
+                    series.newest_open_time = candle.open_time
+
+    def retain(self, series: Iterable[tuple[str, str]]) -> None:
+        """Forget series no longer ingested here (e.g. after a cluster handoff)."""
+        keep = set(series)
+        with self._lock:
+            dropped = [key for key in self._series if (key[1], key[2]) not in keep]
+            for key in dropped:
+                del self._series[key]
+            cleared = [(key, name) for key, name in self._breached if key in dropped]
+            self._breached.difference_update(cleared)
+        for (_, symbol, timeframe), name in cleared:
+            INGEST_SLO_BREACHED.labels(symbol, timeframe, name).set(0)
+        for _, symbol, timeframe in dropped:
+            INGEST_FRESHNESS_SECONDS.labels(symbol, timeframe).set_function(None)
+
+    def slo_for(self, symbol: str, timeframe: str) -> IngestSLO:
+        latency, freshness = self.overrides.get((symbol, timeframe), (None, None))
+        if latency is None:
+            latency = self.latency_slo
+        if freshness is None and self.freshness_slo_factor > 0:
+            # An open candle's open_time is up to one period old by design.
+            freshness = self.freshness_slo_factor * parse_timeframe(timeframe).total_seconds()
+        return IngestSLO(latency_p99_seconds=latency, freshness_seconds=freshness)
+
+    def get_latency(self, now: datetime | None = None) -> list[dict[str, Any]]:
+        """Per-series percentiles, freshness and SLO status over the recent sample window."""
+        now = now or datetime.now(UTC)
+        with self._lock:
+            snapshot = [
+                (key, {stage: np.fromiter(samples, float) for stage, samples in series.samples.items()},
+                 series.newest_open_time, series.updates)
+                for key, series in sorted(self._series.items())
+            ]
+            breached = set(self._breached)
+
+        rows = []
+        for (exchange, symbol, timeframe), samples, newest, updates in snapshot:
+            slo = self.slo_for(symbol, timeframe)
+            stages = {}
+            for stage, values in samples.items():
+                if not len(values):
+                    continue
+                pct = np.percentile(values, PERCENTILES)
+                stages[stage] = {
+                    **{f"p{p}_ms": round(float(v) * 1000, 2) for p, v in zip(PERCENTILES, pct, strict=True)},
+                    "max_ms": round(float(values.max()) * 1000, 2),
+                }
+            rows.append({
+                "exchange": exchange,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "updates": updates,
+                "samples": int(len(samples["total"])),
+                "stages": stages,
+                "newest_open_time": newest.isoformat() if newest else None,
+                "freshness_seconds": round((now - newest).total_seconds(), 3) if newest else None,
+                "slo": {
+                    "latency_p99_ms": slo.latency_p99_seconds * 1000 if slo.latency_p99_seconds else None,
+                    "freshness_seconds": slo.freshness_seconds,
+                    "breached": sorted(name for (key, name) in breached if key == (exchange, symbol, timeframe)),
+                },
+            })
+        return rows
+
+    def check_slos(self, now: datetime | None = None) -> list[tuple[SeriesKey, str, float, float]]:
+        """Evaluate SLOs; log on breach/recovery. Returns current breaches (series, slo, value, target)."""
+        now = now or datetime.now(UTC)
+        with self._lock:
+            current = [
+                (key, np.fromiter(series.samples["total"], float), series.newest_open_time)
+                for key, series in self._series.items()
+            ]
+
+        breaches = []
+        for key, totals, newest in current:
+            _, symbol, timeframe = key
+            slo = self.slo_for(symbol, timeframe)
+            checks = []
+            if slo.latency_p99_seconds is not None and len(totals):
+                checks.append(("latency", float(np.percentile(totals, 99)), slo.latency_p99_seconds))
+            if slo.freshness_seconds is not None and newest is not None:
+                checks.append(("freshness", (now - newest).total_seconds(), slo.freshness_seconds))
+            for name, value, target in checks:
+                breached = value > target
+                if breached:
+                    breaches.append((key, name, value, target))
+                self._set_breached(key, name, breached, value, target)
+        return breaches
+
+    def _set_breached(self, key: SeriesKey, name: str, breached: bool, value: float, target: float) -> None:
+        _, symbol, timeframe = key
+        with self._lock:
+            was = (key, name) in self._breached
+            if breached == was:
+                return
+            if breached:
+                self._breached.add((key, name))
+            else:
+                self._breached.discard((key, name))
+        INGEST_SLO_BREACHED.labels(symbol, timeframe, name).set(1 if breached else 0)
+        if breached:
+            logger.warning(f"Ingest SLO breached: {symbol}/{timeframe} {name} {value:.3f}s > {target:.3f}s")
+        else:
+            logger.info(f"Ingest SLO recovered: {symbol}/{timeframe} {name} {value:.3f}s <= {target:.3f}s")
+
+
+# Global instance for easy access
+_tracker: IngestLatencyTracker | None = None
+_tracker_lock = threading.Lock()
+
+
+def get_ingest_latency_tracker() -> IngestLatencyTracker:
+    """Get the process-wide tracker (populated in the process running WS ingestion)."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = IngestLatencyTracker()
+    return _tracker
@@ -0,0 +1,216 @@
+"""In-process fan-out of realtime candle updates to push subscribers.
+
+The daemon publishes every candle it receives from the exchange WebSocket; API push
+endpoints (WebSocket / SSE) subscribe to a set of series. Publishing and consuming may
+happen on different threads and event loops (the API runs uvicorn in its own thread), so
+hand-off is done with `loop.call_soon_threadsafe`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+SeriesKey = tuple[str, str, str]  # (exchange, symbol, timeframe)
+CandleListener = Callable[[Candle, bool], None]  # (candle, closed)
+
+
+def candle_key(candle: Candle) -> SeriesKey:
+    return (candle.exchange, candle.symbol, candle.timeframe)
+
+
+class Subscription:
+    """A consumer's view of the hub: a filtered, conflated queue of candle events.
+
+    Live (still open) updates are conflated per series, so a slow consumer only ever sees the
+    newest state of each series instead of an unbounded backlog. Closed candles are keyed per
+    candle and are never conflated away.
+    """
+
+    def __init__(
+        self,
+        hub: CandleHub,
+        loop: asyncio.AbstractEventLoop,
+        series: Iterable[SeriesKey] = (),
+        closed_only: bool = False,
+    ):
+        self._hub = hub
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._series: set[SeriesKey] = set(series)
+        self._pending: dict[tuple, dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._wakeup_scheduled = False
+        self.closed_only = closed_only
+        self.delivered = 0
+        self.conflated = 0
+
+    @property
+    def series(self) -> set[SeriesKey]:
+        with self._lock:
+            return set(self._series)
+
+    def add_series(self, series: Iterable[SeriesKey]) -> None:
+        with self._lock:
+            self._series.update(series)
+
+    def remove_series(self, series: Iterable[SeriesKey]) -> None:
+        with self._lock:
+            self._series.difference_update(series)
+
+    def wants(self, key: SeriesKey) -> bool:
+        with self._lock:
+            return key in self._series
+
+    def offer(self, key: SeriesKey, candle: Candle, closed: bool) -> None:
+        """Queue an event (called from the publishing thread)."""
+        if self.closed_only and not closed:
+            return
+
+        slot = (key, candle.open_time) if closed else key
+        event = {"closed": closed, "candle": candle.to_dict()}
+        with self._lock:
+            if key not in self._series:
+                return
+            if self._pending.pop(slot, None) is not None:
+                self.conflated += 1
+            self._pending[slot] = event
+            if self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Consumer loop already closed; the subscription is dead.
+            self._hub.unsubscribe(self)
+
+    async def get(self) -> list[dict[str, Any]]:
+        """Wait for and drain all pending events."""
+        while True:
+            await self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                self._wakeup_scheduled = False
+                events = list(self._pending.values())
+                self._pending.clear()
+            if events:
+                self.delivered += len(events)
+                return events
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+
+class CandleHub:
+    """Thread-safe publish/subscribe hub for realtime candle updates."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: set[Subscription] = set()
+        self._listeners: list[CandleListener] = []
+        self._last: dict[SeriesKey, Candle] = {}
+        self._published = 0
+        self._duplicates = 0
+
+    def subscribe(
+        self,
+        series: Iterable[SeriesKey] = (),
+        closed_only: bool = False,
+    ) -> Subscription:
+        """Create a subscription bound to the calling coroutine's event loop."""
+        sub = Subscription(self, asyncio.get_running_loop(), series=series, closed_only=closed_only)
+        with self._lock:
+            self._subscriptions.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(sub)
+
+    def add_listener(self, listener: CandleListener) -> None:
+        """Register a synchronous in-process consumer (e.g. a cache) of every candle event.
+
+        Listeners run on the publishing thread and must be fast and non-blocking.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: CandleListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def publish(self, candles: Iterable[Candle]) -> None:
+        """Fan out candle updates to subscribers (safe to call from any thread).
+
+        A candle is reported as closed once an update for a later period of the same series
+        arrives; updates for periods older than the newest one seen are closed by definition.
+        Exact repeats of the latest state are dropped.
+        """
+        for candle in candles:
+            key = candle_key(candle)
+            events: list[tuple[Candle, bool]] = []
+
+            with self._lock:
+                last = self._last.get(key)
+                if last == candle:
+                    self._duplicates += 1
+                    continue
+                if last is None or candle.open_time >= last.open_time:
+                    if last is not None and candle.open_time > last.open_time:
+                        events.append((last, True))
+                    self._last[key] = candle
+                    events.append((candle, False))
+                else:
+                    events.append((candle, True))
+                self._published += 1
+                subscribers = [sub for sub in self._subscriptions if sub.wants(key)]
+                listeners = list(self._listeners)
+
+            for event_candle, closed in events:
+                for sub in subscribers:
+                    sub.offer(key, event_candle, closed)
+                for listener in listeners:
+                    try:
+                        listener(event_candle, closed)
+                    except Exception as e:
+                        logger.error(f"Candle listener error: {e}")
+
+    def latest(self, key: SeriesKey) -> Candle | None:
+        with self._lock:
+            return self._last.get(key)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            return {
+                "subscribers": len(subscriptions),
+                "series_tracked": len(self._last),
+                "published": self._published,
+                "duplicates_dropped": self._duplicates,
+                "delivered": sum(sub.delivered for sub in subscriptions),
+                "conflated": sum(sub.conflated for sub in subscriptions),
+            }
+
+
+# Global instance for easy access
+_hub: CandleHub | None = None
+_hub_lock = threading.Lock()
+
+
+def get_candle_hub() -> CandleHub:
+    """Get the process-wide candle hub."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = CandleHub()
+    return _hub
@@ -0,0 +1,151 @@
+"""In-memory table of the newest candle per series, for cross-symbol snapshots."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Any
+
+from market_data.services.realtime import CandleHub
+from market_data.storage.postgres import PostgresStorage
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotTable:
+    """Newest candle of every series, indexed by (exchange, timeframe) -> symbol.
+
+    Seeded from the database with a single `DISTINCT ON` query at startup and kept current by
+    candle events from the CandleHub, so a snapshot read only touches the rows it returns and
+    never the database. A background thread re-seeds the table (merged, newest wins) every
+    `refresh_seconds`, which picks up series that are only written by REST backfill; an
+    invalidated series re-reads just its newest row.
+    """
+
+    def __init__(
+        self,
+        storage: PostgresStorage,
+        hub: CandleHub | None = None,
+        refresh_seconds: float = 60.0,
+    ):
+        self.storage = storage
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._rows: dict[tuple[str, str], dict[str, Candle]] = {}
+        self._seeded_at: float | None = None
+        self._seeds = 0
+        self._updates = 0
+        self._reloads = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        if hub is not None:
+            hub.add_listener(self.on_candle)
+
+    def snapshot(self, exchange: str, timeframe: str, symbols: list[str] | None = None) -> list[Candle]:
+        """Newest candle per symbol for one exchange/timeframe, sorted by symbol."""
+        with self._lock:
+            rows = self._rows.get((exchange, timeframe), {})
+            if symbols is None:
+                return [rows[symbol] for symbol in sorted(rows)]
+            return [rows[symbol] for symbol in sorted(set(symbols)) if symbol in rows]
+
+    def on_candle(self, candle: Candle, closed: bool) -> None:
+        """CandleHub listener: keep the newest state of each series."""
+        with self._lock:
+            self._put(candle)
+
+    def start(self) -> None:
+        """Start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def seed(self) -> None:
+        """(Re)load the newest stored candle of every series, keeping newer in-memory rows.
+
+        Callers that queued behind a seed which started after they did reuse its result.
+        """
+        requested = time.monotonic()
+        with self._seed_lock:
+            if self._seeded_at is not None and self._seeded_at > requested:
+                return
+            candles = self.storage.get_latest_candles()
+            with self._lock:
+                for candle in candles:
+                    self._put(candle, count=False)
+                self._seeded_at = time.monotonic()
+                self._seeds += 1
+        logger.debug(f"Seeded snapshot table with {len(candles)} series")
+
+    def invalidate(self, key: tuple[str, str, str] | None = None) -> None:
+        """Re-read the newest stored row of one series, or re-seed everything in the background."""
+        if key is None:
+            self._wake.set()
+            return
+        exchange, symbol, timeframe = key
+        candles = self.storage.get_candles_before(exchange, symbol, timeframe, limit=1)
+        with self._lock:
+            for candle in candles:
+                self._put(candle, count=False)
+            self._reloads += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "series": sum(len(rows) for rows in self._rows.values()),
+                "seeds": self._seeds,
+                "updates": self._updates,
+                "reloads": self._reloads,
+                "age_seconds": time.monotonic() - self._seeded_at if self._seeded_at is not None else None,
+            }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.seed()
+            except Exception as e:
+                logger.warning(f"Snapshot refresh failed: {e}")
+
+    def _put(self, candle: Candle, count: bool = True) -> None:
+        rows = self._rows.setdefault((candle.exchange, candle.timeframe), {})
+        current = rows.get(candle.symbol)
+        if current is not None and candle.open_time < current.open_time:
+            return
+        rows[candle.symbol] = candle
+        if count:
+            self._updates += 1
+
+
+def snapshot_row(candle: Candle) -> dict[str, Any]:
+    """Render a snapshot row: the newest candle plus its change from open."""
+    change = candle.close - candle.open
+    return {
+        "symbol": candle.symbol,
+        "open_time": candle.open_time.isoformat(),
+        "close_time": candle.close_time.isoformat(),
+        "open": str(candle.open),
+        "high": str(candle.high),
+        "low": str(candle.low),
+        "close": str(candle.close),
+        "volume": str(candle.volume),
+        "change": str(change),
+        "change_pct": float(change / candle.open * 100) if candle.open != Decimal(0) else None,
+    }
@@ -0,0 +1,12 @@
+"""Pair names shared by the Bitfinex simulator and the synthetic database seeder."""
+
+from __future__ import annotations
+
+BASE_SYMBOLS = ("BTCUSD", "ETHUSD", "SOLUSD", "XRPUSD", "LTCUSD", "ADAUSD", "DOTUSD", "AVAXUSD")
+
+
+def symbol_names(count: int) -> list[str]:
+    """The first `count` simulated pairs: the base pairs, then SIM0000USD, SIM0001USD, ..."""
+    count = max(0, count)
+    extra = [f"SIM{i:04d}USD" for i in range(max(0, count - len(BASE_SYMBOLS)))]
+    return [*BASE_SYMBOLS, *extra][:count]
@@ -0,0 +1,403 @@
+"""Local Bitfinex v2 simulator (REST + WebSocket) for offline load and soak tests.
+
+Serves the parts of the public API this service uses:
+
+- `GET /v2/candles/trade:{TF}:t{SYMBOL}/hist` with `start`, `end`, `limit` and `sort`
+- `GET /v2/conf/pub:list:pair:exchange`
+- `/ws/2`: `info` on connect, candle `subscribe`/`unsubscribe` (with a per-connection
+  subscription limit), snapshot, periodic updates, heartbeats and `ping`
+
+Prices are a deterministic function of (symbol, time), so any range can be requested in any
+order and every request for it returns the same candles; open candles move with the clock.
+Faults are configurable: random and windowed 429s, a per-minute REST budget, periodic WS
+disconnects, candles missing at random (as for illiquid pairs) and missing time ranges.
+
+Run `market-data-simulator --symbols 1000`, then point the service at it:
+`BITFINEX_REST_URL=http://127.0.0.1:8200/v2 BITFINEX_WS_URL=ws://127.0.0.1:8200/ws/2`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from fastapi import FastAPI, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.sim_symbols import BASE_SYMBOLS, symbol_names
+
+logger = logging.getLogger(__name__)
+
+# Bitfinex API timeframe label -> milliseconds
+API_TIMEFRAME_MS = {api: int(delta.total_seconds() * 1000) for api, delta in TIMEFRAMES.values()}
+MAX_LIMIT = 10000
+SNAPSHOT_SIZE = 240
+HEARTBEAT_SECONDS = 15.0
+RATE_LIMIT_BODY = ["error", 11010, "ratelimit: error"]
+
+_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _seed(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def _uniform(seed: int, values: np.ndarray) -> np.ndarray:
+    """Deterministic uniform [0, 1) per value (splitmix64 of seed ^ value)."""
+    with np.errstate(over="ignore"):
+        z = (values.astype(np.uint64) ^ np.uint64(seed)) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = (z ^ (z >> np.uint64(31))) & _MASK
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+@dataclass
+class SimulatorConfig:
+    symbols: int = len(BASE_SYMBOLS)
+    history_days: int = 3650
+    update_interval: float = 1.0  # seconds between updates per WS subscription
+    max_subscriptions: int = 30  # per WS connection (Bitfinex limit)
+    rate_limit_fraction: float = 0.0  # share of REST requests answered 429
+    rate_limit_per_minute: int = 0  # REST budget per client per minute (0 = unlimited)
+    rate_limit_windows: list[tuple[float, float]] = field(default_factory=list)  # (start, end) epoch s: all 429
+    disconnect_after: float = 0.0  # close each WS connection after this many seconds (0 = never)
+    missing_fraction: float = 0.0  # share of candles that do not exist (no trades)
+    missing_ranges: list[tuple[int, int]] = field(default_factory=list)  # [start, end) epoch ms without candles
+    seed: int = 0
+
+
+class SimulatedMarket:
+    """Deterministic candles for any (symbol, timeframe, time)."""
+
+    def __init__(self, config: SimulatorConfig, clock: Callable[[], float] = time.time):
+        self.config = config
+        self.clock = clock
+
+    def symbols(self) -> list[str]:
+        return symbol_names(self.config.symbols)
+
+    def _params(self, symbol: str) -> tuple[float, np.ndarray]:
+        seed = _seed(f"{self.config.seed}:{symbol}")
+        u = _uniform(seed, np.arange(8, dtype=np.uint64))
+        base = 10 ** (u[0] * 5 - 1)  # 0.1 .. 10,000
+        return base, u
+
+    def prices(self, symbol: str, times_ms: np.ndarray) -> np.ndarray:
+        """Smooth multi-period price path plus small per-minute noise."""
+        base, u = self._params(symbol)
+        t = times_ms.astype(np.float64) / 1000
+        wave = (
+            0.25 * np.sin(2 * np.pi * t / (86400 * 90) + u[1] * 6.28)
+            + 0.05 * np.sin(2 * np.pi * t / 86400 + u[2] * 6.28)
+            + 0.01 * np.sin(2 * np.pi * t / 3600 + u[3] * 6.28)
+        )
+        noise = (_uniform(_seed(f"noise:{symbol}"), (times_ms // 60_000).astype(np.uint64)) - 0.5) * 0.002
+        return base * np.exp(wave + noise)
+
+    def exists(self, symbol: str, open_ms: np.ndarray, step_ms: int) -> np.ndarray:
+        keep = np.ones(len(open_ms), dtype=bool)
+        if self.config.missing_fraction > 0:
+            u = _uniform(_seed(f"missing:{symbol}:{step_ms}"), open_ms.astype(np.uint64))
+            keep &= u >= self.config.missing_fraction
+        for start, end in self.config.missing_ranges:
+            keep &= (open_ms + step_ms <= start) | (open_ms >= end)
+        return keep
+
+    def candles(self, symbol: str, step_ms: int, open_ms: np.ndarray) -> list[list[float]]:
+        """[MTS, OPEN, CLOSE, HIGH, LOW, VOLUME] rows; the current candle closes at `now`."""
+        if not len(open_ms):
+            return []
+        now_ms = int(self.clock() * 1000)
+        close_ms = np.minimum(open_ms + step_ms, now_ms)
+        opens = self.prices(symbol, open_ms)
+        closes = self.prices(symbol, close_ms)
+        progress = (close_ms - open_ms) / step_ms
+        wick = _uniform(_seed(f"wick:{symbol}:{step_ms}"), open_ms.astype(np.uint64)) * 0.004 * np.sqrt(progress)
+        highs = np.maximum(opens, closes) * (1 + wick)
+        lows = np.minimum(opens, closes) * (1 - wick * 0.8)
+        activity = _uniform(_seed(f"volume:{symbol}:{step_ms}"), open_ms.astype(np.uint64))
+        volumes = (step_ms / 60_000) * (0.2 + 3 * activity**3) * progress * 1000 / np.sqrt(opens)
+        digits = max(2, 6 - int(math.log10(max(float(opens[0]), 1e-9))))  # ~5 significant digits
+        return [
+            [int(m), round(float(o), digits), round(float(c), digits), round(float(h), digits),
+             round(float(lo), digits), round(float(v), 8)]
+            for m, o, c, h, lo, v in zip(open_ms, opens, closes, highs, lows, volumes, strict=True)
+        ]
+
+    def hist(
+        self,
+        symbol: str,
+        step_ms: int,
+        start: int | None,
+        end: int | None,
+        limit: int,
+        sort: int,
+    ) -> list[list[float]]:
+        """Candles with open time in [start, end], at most `limit`, oldest first if sort=1."""
+        now_ms = int(self.clock() * 1000)
+        earliest = now_ms - self.config.history_days * 86_400_000
+        last = (min(end if end is not None else now_ms, now_ms) // step_ms) * step_ms
+        first = max(start if start is not None else earliest, earliest)
+        first = -(-first // step_ms) * step_ms
+        if last < first or limit <= 0:
+            return []
+
+        rows: list[list[float]] = []
+        chunk = max(limit, 500)
+        if sort == 1:
+            cursor = first
+            while cursor <= last and len(rows) < limit:
+                opens = np.arange(cursor, min(last, cursor + (chunk - 1) * step_ms) + 1, step_ms, dtype=np.int64)
+                rows.extend(self.candles(symbol, step_ms, opens[self.exists(symbol, opens, step_ms)]))
+                cursor = int(opens[-1]) + step_ms
+        else:
+            cursor = last
+            while cursor >= first and len(rows) < limit:
+                opens = np.arange(cursor, max(first, cursor - (chunk - 1) * step_ms) - 1, -step_ms, dtype=np.int64)
+                rows.extend(self.candles(symbol, step_ms, opens[self.exists(symbol, opens, step_ms)]))
+                cursor = int(opens[-1]) - step_ms
+        return rows[:limit]
+
+    def current(self, symbol: str, step_ms: int) -> list[float]:
+        now_ms = int(self.clock() * 1000)
+        return self.candles(symbol, step_ms, np.array([(now_ms // step_ms) * step_ms], dtype=np.int64))[0]
+
+
+class _RestLimiter:
+    """Fault injection for REST: random 429s, 429 windows and a per-client budget."""
+
+    def __init__(self, config: SimulatorConfig, clock: Callable[[], float]):
+        self.config = config
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._recent: dict[str, deque[float]] = {}
+        self._random = random.Random(config.seed)
+
+    def allow(self, client: str) -> bool:
+        now = self.clock()
+        if any(start <= now < end for start, end in self.config.rate_limit_windows):
+            return False
+        with self._lock:
+            if self.config.rate_limit_fraction and self._random.random() < self.config.rate_limit_fraction:
+                return False
+            if self.config.rate_limit_per_minute <= 0:
+                return True
+            recent = self._recent.setdefault(client, deque())
+            while recent and recent[0] <= now - 60:
+                recent.popleft()
+            if len(recent) >= self.config.rate_limit_per_minute:
+                return False
+            recent.append(now)
+            return True
+
+
+def _parse_candle_key(key: str) -> tuple[int, str] | None:
+    """'trade:1m:tBTCUSD' -> (60000, 'BTCUSD')."""
+    parts = key.split(":")
+    if len(parts) != 3 or parts[0] != "trade" or parts[1] not in API_TIMEFRAME_MS or not parts[2].startswith("t"):
+        return None
+    return API_TIMEFRAME_MS[parts[1]], parts[2][1:]
+
+
+def create_simulator_app(config: SimulatorConfig | None = None, clock: Callable[[], float] = time.time) -> FastAPI:
+    config = config or SimulatorConfig()
+    market = SimulatedMarket(config, clock)
+    limiter = _RestLimiter(config, clock)
+    stats = {"rest_requests": 0, "rest_rate_limited": 0, "ws_connections": 0, "ws_subscriptions": 0,
+             "ws_messages": 0, "ws_disconnects": 0}
+    stats_lock = threading.Lock()
+
+    def count(name: str, amount: int = 1) -> None:
+        with stats_lock:
+            stats[name] += amount
+    app = FastAPI(title="Bitfinex simulator")
+    app.state.market = market
+    app.state.stats = stats
+
+    def rate_limited(request: Request) -> JSONResponse | None:
+        count("rest_requests")
+        if limiter.allow(request.client.host if request.client else "-"):
+            return None
+        count("rest_rate_limited")
+        return JSONResponse(RATE_LIMIT_BODY, status_code=429)
+
+    @app.get("/v2/candles/{key}/hist")
+    def candles_hist(
+        request: Request,
+        key: str,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int = Query(default=100, ge=1),
+        sort: int = -1,
+    ):
+        if (response := rate_limited(request)) is not None:
+            return response
+        parsed = _parse_candle_key(key)
+        if parsed is None:
+            return JSONResponse(["error", 10020, "symbol: invalid"], status_code=500)
+        step_ms, symbol = parsed
+        return market.hist(symbol, step_ms, start, end, min(limit, MAX_LIMIT), sort)
+
+    @app.get("/v2/conf/pub:list:pair:exchange")
+    def pair_list(request: Request):
+        if (response := rate_limited(request)) is not None:
+            return response
+        return [market.symbols()]
+
+    @app.get("/sim/stats")
+    def simulator_stats():
+        with stats_lock:
+            return dict(stats)
+
+    @app.websocket("/ws/2")
+    async def websocket_feed(websocket: WebSocket):
+        await websocket.accept()
+        count("ws_connections")
+        channels: dict[int, tuple[str, int]] = {}  # chanId -> (symbol, step_ms)
+        next_chan_id = 1
+
+        async def send(message: Any) -> None:
+            count("ws_messages")
+            await websocket.send_text(json.dumps(message))
+
+        async def publisher() -> None:
+            # One timer loop per connection; updates are spread evenly over the interval.
+            due: dict[int, float] = {}
+            last_hb: dict[int, float] = {}
+            while True:
+                now = time.monotonic()
+                for chan_id, (symbol, step_ms) in list(channels.items()):
+                    if chan_id not in due:
+                        due[chan_id] = now + random.random() * config.update_interval
+                        last_hb[chan_id] = now
+                    if config.update_interval > 0 and due[chan_id] <= now:
+                        due[chan_id] += config.update_interval
+                        last_hb[chan_id] = now
+                        await send([chan_id, market.current(symbol, step_ms)])
+                    elif now - last_hb[chan_id] >= HEARTBEAT_SECONDS:
+                        last_hb[chan_id] = now
+                        await send([chan_id, "hb"])
+                for chan_id in set(due) - set(channels):
+                    due.pop(chan_id)
+                    last_hb.pop(chan_id, None)
+                wait = min(due.values(), default=now + 0.05) - time.monotonic()
+                await asyncio.sleep(min(max(wait, 0.001), 0.05))
+
+        publish = asyncio.create_task(publisher())
+        deadline = time.monotonic() + config.disconnect_after if config.disconnect_after > 0 else None
+        try:
+            await send({"event": "info", "version": 2, "serverId": "market-data-simulator", "platform": {"status": 1}})
+            while True:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    count("ws_disconnects")
+                    await websocket.close(code=1012)
+                    return
+                try:
+                    raw = await asyncio.wait_for(websocket.receive_text(), timeout)
+                except TimeoutError:
+                    continue
+                message = json.loads(raw)
+                event = message.get("event") if isinstance(message, dict) else None
+                if event == "ping":
+                    await send({"event": "pong", "ts": int(clock() * 1000), "cid": message.get("cid")})
+                elif event == "subscribe" and message.get("channel") == "candles":
+                    key = str(message.get("key", ""))
+                    parsed = _parse_candle_key(key)
+                    if parsed is None:
+                        await send({"event": "error", "msg": "subscribe: invalid", "code": 10300, "key": key})
+                        continue
+                    if len(channels) >= config.max_subscriptions:
+                        await send({"event": "error", "msg": "subscribe: limit", "code": 10305, "key": key})
+                        continue
+                    chan_id, next_chan_id = next_chan_id, next_chan_id + 1
+                    step_ms, symbol = parsed
+                    await send({"event": "subscribed", "channel": "candles", "chanId": chan_id, "key": key})
+                    snapshot = market.hist(symbol, step_ms, None, None, SNAPSHOT_SIZE, -1)
+                    await send([chan_id, snapshot])
+                    channels[chan_id] = (symbol, step_ms)
+                    count("ws_subscriptions")
+                elif event == "unsubscribe":
+                    chan_id = int(message.get("chanId", 0))
+                    if channels.pop(chan_id, None) is not None:
+                        count("ws_subscriptions", -1)
+                        await send({"event": "unsubscribed", "status": "OK", "chanId": chan_id})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            publish.cancel()
+            with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+                await publish
+            count("ws_subscriptions", -len(channels))
+            count("ws_connections", -1)
+
+    return app
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _window(value: str) -> tuple[float, float]:
+    start, _, end = value.partition("/")
+    return _epoch(start), _epoch(end)
+
+
+def main() -> None:
+    """Entry point: run the simulator with uvicorn."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Bitfinex v2 REST + WebSocket simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--symbols", type=int, default=len(BASE_SYMBOLS), help="Pairs listed by conf")
+    parser.add_argument("--history-days", type=int, default=3650)
+    parser.add_argument("--update-interval", type=float, default=1.0, help="Seconds between updates per channel")
+    parser.add_argument("--max-subscriptions", type=int, default=30, help="Per WS connection")
+    parser.add_argument("--rate-limit-fraction", type=float, default=0.0, help="Share of REST requests to 429")
+    parser.add_argument("--rate-limit-per-minute", type=int, default=0, help="REST budget per client (0 = off)")
+    parser.add_argument("--rate-limit-window", action="append", default=[], metavar="START/END",
+                        help="ISO time window in which every REST request gets 429 (repeatable)")
+    parser.add_argument("--disconnect-after", type=float, default=0.0, help="Close WS connections after N s")
+    parser.add_argument("--missing-fraction", type=float, default=0.0, help="Share of candles without trades")
+    parser.add_argument("--missing", action="append", default=[], metavar="START/END",
+                        help="ISO time range with no candles at all (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        symbols=args.symbols,
+        history_days=args.history_days,
+        update_interval=args.update_interval,
+        max_subscriptions=args.max_subscriptions,
+        rate_limit_fraction=args.rate_limit_fraction,
+        rate_limit_per_minute=args.rate_limit_per_minute,
+        rate_limit_windows=[_window(w) for w in args.rate_limit_window],
+        disconnect_after=args.disconnect_after,
+        missing_fraction=args.missing_fraction,
+        missing_ranges=[(int(s * 1000), int(e * 1000)) for s, e in (_window(w) for w in args.missing)],
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logger.info(f"Bitfinex simulator on http://{args.host}:{args.port} ({len(SimulatedMarket(config).symbols())} pairs)")
+    uvicorn.run(create_simulator_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Parquet archive of closed candles, queried with DuckDB (optional `archive` extra).
+
+Layout: `<root>/<exchange>/<symbol>/<timeframe>/<YYYY-MM>.parquet`, one file per series and
+month. Prices keep their exact DECIMAL(24, 8) values; times are stored as UTC timestamps.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    duckdb = None
+
+_MONTH_FILE = re.compile(r"^(\d{4})-(\d{2})\.parquet$")
+
+# Select list producing candle rows in storage order (exchange, symbol, timeframe added by caller).
+_ROW_COLUMNS = "open_time, close_time, open, high, low, close, volume"
+
+_COLUMN_SQL = {
+    "open_time": "epoch_ms(open_time)",
+    "close_time": "epoch_ms(close_time)",
+    "open": "CAST(open AS DOUBLE)",
+    "high": "CAST(high AS DOUBLE)",
+    "low": "CAST(low AS DOUBLE)",
+    "close": "CAST(close AS DOUBLE)",
+    "volume": "CAST(volume AS DOUBLE)",
+}
+
+# Column types of the CSV exported from Postgres by the compactor.
+CSV_COLUMNS = {
+    "open_time": "TIMESTAMPTZ",
+    "close_time": "TIMESTAMPTZ",
+    "open": "DECIMAL(24, 8)",
+    "high": "DECIMAL(24, 8)",
+    "low": "DECIMAL(24, 8)",
+    "close": "DECIMAL(24, 8)",
+    "volume": "DECIMAL(24, 8)",
+}
+
+
+def month_start(value: datetime) -> date:
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """[start, end) of a calendar month in UTC."""
+    start = datetime(month.year, month.month, 1, tzinfo=UTC)
+    end_month = next_month(month)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=UTC)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ParquetArchive:
+    """Read/write access to the monthly Parquet partitions of closed candles."""
+
+    def __init__(self, root: str | Path):
+        if duckdb is None:
+            raise ImportError("The candle archive requires DuckDB: pip install 'market-data[archive]'")
+        self.root = Path(root)
+
+    def series_dir(self, exchange: str, symbol: str, timeframe: str) -> Path:
+        return self.root / exchange / symbol / timeframe
+
+    def series(self, exchange: str | None = None) -> list[tuple[str, str, str]]:
+        """(exchange, symbol, timeframe) of every series with archived months."""
+        if not self.root.is_dir():
+            return []
+        exchanges = [self.root / exchange] if exchange else sorted(self.root.iterdir())
+        found = []
+        for exchange_dir in exchanges:
+            if not exchange_dir.is_dir():
+                continue
+            for symbol_dir in sorted(exchange_dir.iterdir()):
+                if not symbol_dir.is_dir():
+                    continue
+                for timeframe_dir in sorted(symbol_dir.iterdir()):
+                    key = (exchange_dir.name, symbol_dir.name, timeframe_dir.name)
+                    if timeframe_dir.is_dir() and self.months(*key):
+                        found.append(key)
+        return found
+
+    def months(self, exchange: str, symbol: str, timeframe: str) -> list[date]:
+        """Archived months of a series, oldest first."""
+        directory = self.series_dir(exchange, symbol, timeframe)
+        if not directory.is_dir():
+            return []
+        months = []
+        for path in directory.iterdir():
+            match = _MONTH_FILE.match(path.name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def watermark(self, exchange: str, symbol: str, timeframe: str) -> datetime | None:
+        """End of the newest archived month: older candles are served from the archive."""
+        months = self.months(exchange, symbol, timeframe)
+        return month_bounds(months[-1])[1] if months else None
+
+    def write_month(self, exchange: str, symbol: str, timeframe: str, month: date, csv_path: str | Path) -> int:
+        """Merge a Postgres CSV export (CSV_COLUMNS, with header) into a month partition.
+
+        Rows from the export replace archived rows with the same open_time. The partition is
+        written to a temporary file and renamed, so readers never see a partial file.
+        """
+        path = self.series_dir(exchange, symbol, timeframe) / f"{month:%Y-%m}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        columns = "{" + ", ".join(f"{_quote(name)}: {_quote(kind)}" for name, kind in CSV_COLUMNS.items()) + "}"
+        exported = f"""
+            SELECT timezone('UTC', open_time) AS open_time, timezone('UTC', close_time) AS close_time,
+                   open, high, low, close, volume, 0 AS source
+            FROM read_csv({_quote(str(csv_path))}, header = true, columns = {columns})
+        """
+        sources = [exported]
+        if path.exists():
+            sources.append(f"SELECT {_ROW_COLUMNS}, 1 AS source FROM read_parquet({_quote(str(path))})")
+
+        with duckdb.connect() as con:
+            con.execute("SET TimeZone = 'UTC'")
+            con.execute(f"""
+                COPY (
+                    SELECT {_ROW_COLUMNS}
+                    FROM ({" UNION ALL ".join(sources)})
+                    QUALIFY row_number() OVER (PARTITION BY open_time ORDER BY source) = 1
+                    ORDER BY open_time
+                ) TO {_quote(str(tmp_path))} (FORMAT parquet, COMPRESSION zstd)
+            """)
+            count = con.execute(f"SELECT COUNT(*) FROM read_parquet({_quote(str(tmp_path))})").fetchone()[0]
+        os.replace(tmp_path, path)
+        return count
+
+    def drop_months_before(self, exchange: str, symbol: str, timeframe: str, cutoff: datetime) -> int:
+        """Delete partitions whose whole month is older than `cutoff`. Returns files removed."""
+        removed = 0
+        for month in self.months(exchange, symbol, timeframe):
+            if month_bounds(month)[1] <= cutoff:
+                (self.series_dir(exchange, symbol, timeframe) / f"{month:%Y-%m}.parquet").unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def get_rows(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+        newest: bool = True,
+    ) -> list[tuple]:
+        """Candle rows in [start, end): the newest (or oldest) `limit`, in chronological order."""
+        files = self._files(exchange, symbol, timeframe, start, end)
+        if not files:
+            return []
+        where, params = self._window(start, end)
+        order = "DESC" if newest else "ASC"
+
+        with duckdb.connect() as con:
+            rows = con.execute(
+                f"""
+                SELECT {_ROW_COLUMNS} FROM read_parquet([{", ".join(map(_quote, files))}])
+                {where} ORDER BY open_time {order} LIMIT ?
+                """,
+                [*params, limit],
+            ).fetchall()
+
+        if newest:
+            rows.reverse()
+        return [
+            (exchange, symbol, timeframe, open_time.replace(tzinfo=UTC), close_time.replace(tzinfo=UTC), *values)
+            for open_time, close_time, *values in rows
+        ]
+
+    def get_resampled_rows(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        bucket: timedelta,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple]:
+        """Epoch-aligned buckets of archived rows in [start, end), newest `limit`, chronological.
+
+        Rows are (bucket_start, open, high, low, close, volume), aggregated like
+        PostgresStorage.get_resampled_candles.
+        """
+        files = self._files(exchange, symbol, timeframe, start, end)
+        if not files:
+            return []
+        where, params = self._window(start, end)
+
+        with duckdb.connect() as con:
+            rows = con.execute(
+                f"""
+                SELECT time_bucket(?, open_time, TIMESTAMP '1970-01-01') AS bucket_start,
+                       arg_min(open, open_time), MAX(high), MIN(low), arg_max(close, open_time),
+                       SUM(volume)
+                FROM read_parquet([{", ".join(map(_quote, files))}]) {where}
+                GROUP BY bucket_start ORDER BY bucket_start DESC LIMIT ?
+                """,
+                [bucket, *params, limit],
+            ).fetchall()
+
+        rows.reverse()
+        return [(bucket_start.replace(tzinfo=UTC), *values) for bucket_start, *values in rows]
+
+    def get_columns(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        columns: tuple[str, ...] = tuple(_COLUMN_SQL),
+    ) -> dict[str, np.ndarray]:
+        """Columnar read in chronological order (epoch-ms int64 times, float64 values)."""
+        files = self._files(exchange, symbol, timeframe, start, end)
+        if not files:
+            return {
+                name: np.empty(0, dtype=np.int64 if name.endswith("_time") else np.float64) for name in columns
+            }
+        where, params = self._window(start, end)
+        select = ", ".join(f"{_COLUMN_SQL[name]} AS {name}" for name in columns)
+
+        with duckdb.connect() as con:
+            result = con.execute(
+                f"SELECT {select} FROM read_parquet([{', '.join(map(_quote, files))}]) {where} ORDER BY open_time",
+                params,
+            ).fetchnumpy()
+        return {name: np.asarray(result[name]) for name in columns}
+
+    def summary(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> dict:
+        files = self._files(exchange, symbol, timeframe, start, end)
+        if not files:
+            return {"count": 0, "oldest": None, "newest": None, "last_modified": None}
+        where, params = self._window(start, end)
+
+        with duckdb.connect() as con:
+            count, oldest, newest = con.execute(
+                f"SELECT COUNT(*), MIN(open_time), MAX(open_time) "
+                f"FROM read_parquet([{', '.join(map(_quote, files))}]) {where}",
+                params,
+            ).fetchone()
+        modified = max(Path(f).stat().st_mtime for f in files)
+        return {
+            "count": count,
+            "oldest": oldest.replace(tzinfo=UTC) if oldest else None,
+            "newest": newest.replace(tzinfo=UTC) if newest else None,
+            "last_modified": datetime.fromtimestamp(modified, tz=UTC),
+        }
+
+    def _files(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list[str]:
+        """Partition files overlapping [start, end)."""
+        start = start if start is None or start.tzinfo else start.replace(tzinfo=UTC)
+        end = end if end is None or end.tzinfo else end.replace(tzinfo=UTC)
+        directory = self.series_dir(exchange, symbol, timeframe)
+        files = []
+        for month in self.months(exchange, symbol, timeframe):
+            lower, upper = month_bounds(month)
+            if (start is None or upper > start) and (end is None or lower < end):
+                files.append(str(directory / f"{month:%Y-%m}.parquet"))
+        return files
+
+    @staticmethod
+    def _window(start: datetime | None, end: datetime | None) -> tuple[str, list]:
+        conditions, params = [], []
+        if start:
+            conditions.append("open_time >= ?")
+            params.append(_naive_utc(start))
+        if end:
+            conditions.append("open_time < ?")
+            params.append(_naive_utc(end))
+        return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
@@ -0,0 +1,178 @@
+"""Postgres LISTEN/NOTIFY change feed for committed candle writes."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import select
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+import psycopg2
+from sqlalchemy.engine import make_url
+
+from market_data.config import settings
+from market_data.types import Candle
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CandleChange:
+    """Committed write to one series, covering open_times [first_open_time, last_open_time]."""
+
+    exchange: str
+    symbol: str
+    timeframe: str
+    first_open_time: datetime
+    last_open_time: datetime
+
+    def to_payload(self) -> str:
+        return json.dumps(
+            {
+                "e": self.exchange,
+                "s": self.symbol,
+                "t": self.timeframe,
+                "a": self.first_open_time.isoformat(),
+                "b": self.last_open_time.isoformat(),
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: str) -> CandleChange:
+        data = json.loads(payload)
+        return cls(
+            exchange=data["e"],
+            symbol=data["s"],
+            timeframe=data["t"],
+            first_open_time=datetime.fromisoformat(data["a"]),
+            last_open_time=datetime.fromisoformat(data["b"]),
+        )
+
+
+def summarize_changes(candles: list[Candle]) -> list[CandleChange]:
+    """Collapse written candles into one change per series (min/max open_time)."""
+    ranges: dict[tuple[str, str, str], tuple[datetime, datetime]] = {}
+    for candle in candles:
+        key = (candle.exchange, candle.symbol, candle.timeframe)
+        current = ranges.get(key)
+        if current is None:
+            ranges[key] = (candle.open_time, candle.open_time)
+        else:
+            ranges[key] = (min(current[0], candle.open_time), max(current[1], candle.open_time))
+    return [CandleChange(*key, first, last) for key, (first, last) in ranges.items()]
+
+
+# Receives a change, or None after a reconnect (notifications may have been missed: treat
+# every series as changed).
+ChangeCallback = Callable[[CandleChange | None], None]
+
+
+class ChangeListener:
+    """Background thread that LISTENs for candle change notifications and fans them out.
+
+    Uses its own dedicated connection (outside the SQLAlchemy pool) and reconnects with
+    backoff; after a reconnect callbacks receive None so caches can drop everything.
+    """
+
+    def __init__(
+        self,
+        database_url: str | None = None,
+        channel: str | None = None,
+        poll_timeout: float = 5.0,
+        max_backoff: float = 30.0,
+    ):
+        self.database_url = database_url or settings.database_url
+        self.channel = channel or settings.notify_channel
+        self.poll_timeout = poll_timeout
+        self.max_backoff = max_backoff
+        self._callbacks: list[ChangeCallback] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._received = 0
+        self._reconnects = 0
+
+    def add_callback(self, callback: ChangeCallback) -> None:
+        self._callbacks.append(callback)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="candle-change-listener", daemon=True)
+        self._thread.start()
+        logger.info(f"Listening for candle changes on channel '{self.channel}'")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_timeout + 1)
+            self._thread = None
+
+    def get_stats(self) -> dict:
+        return {
+            "channel": self.channel,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "received": self._received,
+            "reconnects": self._reconnects,
+        }
+
+    def _run(self) -> None:
+        backoff = 1.0
+        first = True
+        while not self._stop.is_set():
+            try:
+                conn = self._connect()
+            except Exception as e:
+                logger.warning(f"Change listener connect failed, retrying in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = 1.0
+            if not first:
+                self._reconnects += 1
+                self._dispatch(None)
+            first = False
+
+            try:
+                self._listen(conn)
+            except Exception as e:
+                logger.warning(f"Change listener connection lost: {e}")
+            finally:
+                with contextlib.suppress(Exception):
+                    conn.close()
+
+    def _connect(self):
+        dsn = make_url(self.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn)
+        conn.set_session(autocommit=True)
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _listen(self, conn) -> None:
+        while not self._stop.is_set():
+            if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    change = CandleChange.from_payload(notify.payload)
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Ignoring malformed change notification: {e}")
+                    continue
+                self._received += 1
+                self._dispatch(change)
+
+    def _dispatch(self, change: CandleChange | None) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Change callback error: {e}")
@@ -2,19 +2,84 @@
 
 from __future__ import annotations
 
+import io
 import logging
-from datetime import datetime, timezone
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from sqlalchemy import create_engine, text
+import numpy as np
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 
 from market_data.config import settings
+from market_data.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUTS, SAVE_CANDLES_SECONDS
+from market_data.storage.columnar import CANDLE_COLUMNS, SERIES_INDEX, parse_binary_copy, select_list
+from market_data.storage.notify import summarize_changes
 from market_data.types import Candle, CandleGap, IngestionJob
 
 logger = logging.getLogger(__name__)
 
 
+def _on_pool_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    DB_POOL_CHECKOUTS.inc()
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_pool_checkin(dbapi_connection, connection_record) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def _row_to_candle(row) -> Candle:
+    """Map a candles row (exchange, symbol, timeframe, open_time, close_time, o, h, l, c, v) to a Candle."""
+    return Candle(
+        exchange=row[0],
+        symbol=row[1],
+        timeframe=row[2],
+        open_time=row[3],
+        close_time=row[4],
+        open=row[5],
+        high=row[6],
+        low=row[7],
+        close=row[8],
+        volume=row[9],
+    )
+
+
+def group_rows_by_series(series: Sequence[tuple[str, str]], rows) -> dict[tuple[str, str], list[Candle]]:
+    """Group newest-first candles rows of a batch query into chronological lists per (symbol, timeframe).
+
+    Every requested series gets an entry, in request order; series without rows map to [].
+    """
+    result: dict[tuple[str, str], list[Candle]] = {pair: [] for pair in series}
+    for row in rows:
+        result[(row[1], row[2])].append(_row_to_candle(row))
+    for candles in result.values():
+        candles.reverse()
+    return result
+
+
+def _series_conditions(
+    exchange: str,
+    symbol: str,
+    timeframe: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> tuple[list[str], dict]:
+    """Build WHERE conditions/params for one series and an optional [start, end) window."""
+    conditions = ["exchange = :exchange", "symbol = :symbol", "timeframe = :timeframe"]
+    params: dict = {"exchange": exchange, "symbol": symbol, "timeframe": timeframe}
+
+    if start:
+        conditions.append("open_time >= :start")
+        params["start"] = start
+    if end:
+        conditions.append("open_time < :end")
+        params["end"] = end
+    return conditions, params
+
+
 class PostgresStorage:
     """PostgreSQL storage for candle data."""
 
@@ -27,10 +92,12 @@ class PostgresStorage:
         if self._engine is None:
             self._engine = create_engine(
                 self.database_url,
-                pool_size=5,
-                max_overflow=10,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
                 pool_pre_ping=True,
             )
+            event.listen(self._engine, "checkout", _on_pool_checkout)
+            event.listen(self._engine, "checkin", _on_pool_checkin)
         return self._engine
 
     def init_schema(self) -> None:
@@ -39,12 +106,19 @@ class PostgresStorage:
         schema_sql = schema_path.read_text()
 
         with self.engine.connect() as conn:
+            # Serialise concurrent daemons (cluster mode) running the IF NOT EXISTS DDL.
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('market_data.init_schema'))"))
             conn.execute(text(schema_sql))
             conn.commit()
         logger.info("Database schema initialized")
 
     def save_candles(self, candles: list[Candle]) -> int:
-        """Upsert candles to database. Returns count saved."""
+        """Upsert candles to database. Returns count saved.
+
+        Re-sent candles with unchanged values are not rewritten, so `updated_at` and `change_xid`
+        only move on real changes and the change feed stays proportional to them. Series with changed rows
+        are announced on the `notify_channel` LISTEN/NOTIFY channel when the batch commits.
+        """
         if not candles:
             return 0
 
@@ -58,12 +132,19 @@ class PostgresStorage:
                 high = EXCLUDED.high,
                 low = EXCLUDED.low,
                 close = EXCLUDED.close,
-                volume = EXCLUDED.volume
+                volume = EXCLUDED.volume,
+                updated_at = clock_timestamp(),
+                change_xid = pg_current_xact_id()
+            WHERE (candles.close_time, candles.open, candles.high, candles.low, candles.close, candles.volume)
+                IS DISTINCT FROM
+                (EXCLUDED.close_time, EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close, EXCLUDED.volume)
         """)
 
+        started = time.perf_counter()
+        changed: list[Candle] = []
         with self.engine.connect() as conn:
             for candle in candles:
-                conn.execute(sql, {
+                result = conn.execute(sql, {
                     "exchange": candle.exchange,
                     "symbol": candle.symbol,
                     "timeframe": candle.timeframe,
@@ -75,8 +156,18 @@ class PostgresStorage:
                     "close": candle.close,
                     "volume": candle.volume,
                 })
+                if result.rowcount:
+                    changed.append(candle)
+            if changed and settings.notify_enabled:
+                # Delivered by Postgres only when (and if) the batch commits.
+                for change in summarize_changes(changed):
+                    conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": settings.notify_channel, "payload": change.to_payload()},
+                    )
             conn.commit()
 
+        SAVE_CANDLES_SECONDS.observe(time.perf_counter() - started)
         return len(candles)
 
     def get_candles(
@@ -89,46 +180,448 @@ class PostgresStorage:
         limit: int = 1000,
     ) -> list[Candle]:
         """Retrieve candles from database."""
-        conditions = ["exchange = :exchange", "symbol = :symbol", "timeframe = :timeframe"]
-        params: dict = {"exchange": exchange, "symbol": symbol, "timeframe": timeframe, "limit": limit}
+        return self.get_candles_before(exchange, symbol, timeframe, start=start, end=end, limit=limit)
+
+    def get_candles_before(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        before: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[Candle]:
+        """Keyset page: the newest `limit` candles with open_time < `before`, in chronological order.
+
+        Walks the primary key index backwards, so paging through a series costs O(rows returned).
+        """
+        rows = self.get_candle_rows_before(exchange, symbol, timeframe, before, start, end, limit)
+        return [_row_to_candle(row) for row in rows]
+
+    def get_candle_rows_before(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        before: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple]:
+        """Like get_candles_before, but returns raw candle rows (for direct serialisation)."""
+        conditions, params = _series_conditions(exchange, symbol, timeframe, start, end)
+        params["limit"] = limit
+        if before:
+            conditions.append("open_time < :before")
+            params["before"] = before
+
+        sql = text(f"""
+            SELECT exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume
+            FROM candles
+            WHERE {" AND ".join(conditions)}
+            ORDER BY open_time DESC
+            LIMIT :limit
+        """)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, params).tuples().all()
+
+        rows.reverse()  # Return in chronological order
+        return rows
+
+    def get_candles_after(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        after: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[Candle]:
+        """Keyset page: the oldest `limit` candles with open_time > `after`, in chronological order."""
+        rows = self.get_candle_rows_after(exchange, symbol, timeframe, after, start, end, limit)
+        return [_row_to_candle(row) for row in rows]
+
+    def get_candle_rows_after(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        after: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple]:
+        """Like get_candles_after, but returns raw candle rows (for direct serialisation)."""
+        conditions, params = _series_conditions(exchange, symbol, timeframe, start, end)
+        params["limit"] = limit
+        if after:
+            conditions.append("open_time > :after")
+            params["after"] = after
+
+        sql = text(f"""
+            SELECT exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume
+            FROM candles
+            WHERE {" AND ".join(conditions)}
+            ORDER BY open_time ASC
+            LIMIT :limit
+        """)
+
+        with self.engine.connect() as conn:
+            return conn.execute(sql, params).tuples().all()
+
+    def get_candles_batch(
+        self,
+        exchange: str,
+        series: list[tuple[str, str]],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 100,
+    ) -> dict[tuple[str, str], list[Candle]]:
+        """Retrieve the newest `limit` candles for many (symbol, timeframe) series in one query.
+
+        Uses a LATERAL join over the unnested series arrays so every series gets its own
+        index-backed `ORDER BY open_time DESC LIMIT` scan, in a single round trip.
+        Returns candles per series in chronological order (series without data map to []).
+        """
+        pairs = list(dict.fromkeys(series))
+        if not pairs:
+            return {}
+
+        conditions = ["c.exchange = :exchange", "c.symbol = s.symbol", "c.timeframe = s.timeframe"]
+        params: dict = {
+            "exchange": exchange,
+            "symbols": [symbol for symbol, _ in pairs],
+            "timeframes": [timeframe for _, timeframe in pairs],
+            "limit": limit,
+        }
 
         if start:
-            conditions.append("open_time >= :start")
+            conditions.append("c.open_time >= :start")
             params["start"] = start
         if end:
-            conditions.append("open_time < :end")
+            conditions.append("c.open_time < :end")
             params["end"] = end
 
         sql = text(f"""
-            SELECT exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume
+            SELECT l.exchange, l.symbol, l.timeframe, l.open_time, l.close_time, l.open, l.high, l.low, l.close, l.volume
+            FROM unnest(CAST(:symbols AS text[]), CAST(:timeframes AS text[])) AS s(symbol, timeframe)
+            CROSS JOIN LATERAL (
+                SELECT c.exchange, c.symbol, c.timeframe, c.open_time, c.close_time,
+                       c.open, c.high, c.low, c.close, c.volume
+                FROM candles c
+                WHERE {" AND ".join(conditions)}
+                ORDER BY c.open_time DESC
+                LIMIT :limit
+            ) l
+        """)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return group_rows_by_series(pairs, rows)
+
+    def get_resampled_candles(
+        self,
+        exchange: str,
+        symbol: str,
+        base_timeframe: str,
+        bucket: timedelta,
+        timeframe_label: str,
+        start: datetime,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[Candle]:
+        """Aggregate stored base candles into epoch-aligned buckets with SQL `date_bin`.
+
+        `bucket` must be a multiple of the base timeframe. Only base rows inside [start, end) are
+        read; the newest `limit` buckets are returned in chronological order. The newest bucket
+        may still be incomplete.
+        """
+        conditions, params = _series_conditions(exchange, symbol, base_timeframe, start, end)
+        params.update({"bucket": bucket, "limit": limit})
+
+        sql = text(f"""
+            SELECT
+                date_bin(:bucket, open_time, TIMESTAMPTZ '1970-01-01 00:00:00+00') AS bucket_start,
+                (array_agg(open ORDER BY open_time ASC))[1],
+                MAX(high),
+                MIN(low),
+                (array_agg(close ORDER BY open_time DESC))[1],
+                SUM(volume)
             FROM candles
             WHERE {" AND ".join(conditions)}
-            ORDER BY open_time DESC
+            GROUP BY bucket_start
+            ORDER BY bucket_start DESC
             LIMIT :limit
         """)
 
         with self.engine.connect() as conn:
-            result = conn.execute(sql, params)
-            rows = result.fetchall()
+            rows = conn.execute(sql, params).fetchall()
 
         candles = [
             Candle(
-                exchange=row[0],
-                symbol=row[1],
-                timeframe=row[2],
-                open_time=row[3],
-                close_time=row[4],
-                open=row[5],
-                high=row[6],
-                low=row[7],
-                close=row[8],
-                volume=row[9],
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=timeframe_label,
+                open_time=row[0],
+                close_time=row[0] + bucket,
+                open=row[1],
+                high=row[2],
+                low=row[3],
+                close=row[4],
+                volume=row[5],
             )
             for row in rows
         ]
         candles.reverse()  # Return in chronological order
         return candles
 
+    def get_latest_candles(self, exchange: str | None = None) -> list[Candle]:
+        """Retrieve the newest candle of every stored series with one `DISTINCT ON` query."""
+        where = "WHERE exchange = :exchange" if exchange else ""
+        sql = text(f"""
+            SELECT DISTINCT ON (exchange, symbol, timeframe)
+                exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume
+            FROM candles
+            {where}
+            ORDER BY exchange, symbol, timeframe, open_time DESC
+        """)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, {"exchange": exchange}).fetchall()
+
+        return [_row_to_candle(row) for row in rows]
+
+    def get_range_summary(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> dict:
+        """Summarize a series window without fetching its rows (count, open_time bounds, last change time)."""
+        conditions, params = _series_conditions(exchange, symbol, timeframe, start, end)
+
+        sql = text(f"""
+            SELECT COUNT(*), MIN(open_time), MAX(open_time), MAX(updated_at)
+            FROM candles
+            WHERE {" AND ".join(conditions)}
+        """)
+
+        with self.engine.connect() as conn:
+            row = conn.execute(sql, params).fetchone()
+
+        return {
+            "count": row[0] if row else 0,
+            "oldest": row[1] if row else None,
+            "newest": row[2] if row else None,
+            "last_modified": row[3] if row else None,
+        }
+
+    def get_candle_changes(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        since: datetime | None = None,
+        after_xid: int | None = None,
+        after_open_time: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple[int, datetime, Candle]]:
+        """Retrieve candles of one series changed after a position, oldest change first.
+
+        The position is keyset (`change_xid`, `open_time`): rows changed strictly after it, or
+        with `updated_at` at/after `since` when no position is given. Only rows written by
+        transactions older than the oldest one still running are returned, so a write that
+        commits later always lands after the returned position and is never skipped.
+        Returns (change_xid, updated_at, candle) triples.
+        """
+        conditions, params = _series_conditions(exchange, symbol, timeframe)
+        params["limit"] = limit
+        conditions.append("change_xid < pg_snapshot_xmin(pg_current_snapshot())")
+
+        if after_xid is not None and after_open_time:
+            conditions.append("(change_xid, open_time) > (CAST(:after_xid AS xid8), :after_open_time)")
+            params.update({"after_xid": str(after_xid), "after_open_time": after_open_time})
+        elif since:
+            conditions.append("updated_at >= :since")
+            params["since"] = since
+
+        sql = text(f"""
+            SELECT exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume,
+                change_xid::text, updated_at
+            FROM candles
+            WHERE {" AND ".join(conditions)}
+            ORDER BY change_xid ASC, open_time ASC
+            LIMIT :limit
+        """)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [(int(row[10]), row[11], _row_to_candle(row)) for row in rows]
+
+    def get_candle_columns(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        columns: Sequence[str] = tuple(CANDLE_COLUMNS),
+    ) -> dict[str, np.ndarray]:
+        """Columnar read of one series in chronological order, for analytics over many rows.
+
+        Streams `COPY ... TO STDOUT (FORMAT binary)` into NumPy arrays keyed by column name:
+        times as epoch-ms int64, prices/volume as float64. No per-row Python objects are built.
+        """
+        conditions = ["exchange = %(exchange)s", "symbol = %(symbol)s", "timeframe = %(timeframe)s"]
+        params: dict = {"exchange": exchange, "symbol": symbol, "timeframe": timeframe}
+        if start:
+            conditions.append("open_time >= %(start)s")
+            params["start"] = start
+        if end:
+            conditions.append("open_time < %(end)s")
+            params["end"] = end
+
+        sql = f"""
+            SELECT {select_list(list(columns))}
+            FROM candles
+            WHERE {" AND ".join(conditions)}
+            ORDER BY open_time ASC
+        """
+        return self._copy_columns(sql, params, [(name, CANDLE_COLUMNS[name][1]) for name in columns])
+
+    def get_candle_columns_batch(
+        self,
+        exchange: str,
+        series: list[tuple[str, str]],
+        limit: int = 100,
+        columns: Sequence[str] = tuple(CANDLE_COLUMNS),
+    ) -> dict[tuple[str, str], dict[str, np.ndarray]]:
+        """Columnar read of the newest `limit` candles for many series in one query.
+
+        Same LATERAL plan as get_candles_batch; arrays per series are chronological views
+        into one buffer (series without data map to empty arrays).
+        """
+        pairs = list(dict.fromkeys(series))
+        if not pairs:
+            return {}
+
+        params = {
+            "exchange": exchange,
+            "symbols": [symbol for symbol, _ in pairs],
+            "timeframes": [timeframe for _, timeframe in pairs],
+            "limit": limit,
+        }
+        sql = f"""
+            SELECT {SERIES_INDEX[0]}, {select_list(list(columns), alias="l")}
+            FROM unnest(CAST(%(symbols)s AS text[]), CAST(%(timeframes)s AS text[]))
+                WITH ORDINALITY AS s(symbol, timeframe, idx)
+            CROSS JOIN LATERAL (
+                SELECT c.open_time, c.close_time, c.open, c.high, c.low, c.close, c.volume
+                FROM candles c
+                WHERE c.exchange = %(exchange)s AND c.symbol = s.symbol AND c.timeframe = s.timeframe
+                ORDER BY c.open_time DESC
+                LIMIT %(limit)s
+            ) l
+            ORDER BY s.idx, l.open_time
+        """
+        fields = [("idx", SERIES_INDEX[1])] + [(name, CANDLE_COLUMNS[name][1]) for name in columns]
+        arrays = self._copy_columns(sql, params, fields)
+
+        idx = arrays.pop("idx")
+        bounds = np.searchsorted(idx, np.arange(1, len(pairs) + 2))
+        return {
+            pair: {name: values[bounds[i] : bounds[i + 1]] for name, values in arrays.items()}
+            for i, pair in enumerate(pairs)
+        }
+
+    def _copy_columns(self, sql: str, params: dict, fields: list[tuple[str, str]]) -> dict[str, np.ndarray]:
+        """Run a fixed-width SELECT through binary COPY and parse it into arrays."""
+        buffer = io.BytesIO()
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            try:
+                query = cursor.mogrify(sql, params).decode()
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT (FORMAT binary)", buffer)
+            finally:
+                cursor.close()
+        finally:
+            raw.close()
+        return parse_binary_copy(buffer.getbuffer(), fields)
+
+    def export_candles_csv(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        path: str | Path,
+    ) -> tuple[int, datetime | None]:
+        """Write a series window [start, end) to a CSV file (with header) for archiving.
+
+        Values are exported as text, so prices keep their exact NUMERIC digits. Count, newest
+        `updated_at` and the rows come from one REPEATABLE READ snapshot; pass that `updated_at`
+        to delete_archived_candles so rows rewritten after the export are kept.
+        Returns (row count, newest updated_at).
+        """
+        params = {"exchange": exchange, "symbol": symbol, "timeframe": timeframe, "start": start, "end": end}
+        where = """
+            exchange = %(exchange)s AND symbol = %(symbol)s AND timeframe = %(timeframe)s
+            AND open_time >= %(start)s AND open_time < %(end)s
+        """
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute(f"SELECT COUNT(*), MAX(updated_at) FROM candles WHERE {where}", params)
+                count, updated_at = cursor.fetchone()
+                if count:
+                    query = cursor.mogrify(
+                        f"""
+                        SELECT open_time, close_time, open, high, low, close, volume
+                        FROM candles WHERE {where} ORDER BY open_time
+                        """,
+                        params,
+                    ).decode()
+                    with open(path, "w", encoding="utf-8") as f:
+                        cursor.copy_expert(f"COPY ({query}) TO STDOUT (FORMAT csv, HEADER)", f)
+            finally:
+                cursor.close()
+            raw.rollback()
+        finally:
+            raw.close()
+        return count, updated_at
+
+    def delete_archived_candles(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        updated_before: datetime,
+    ) -> int:
+        """Delete a series window [start, end) that has been archived, keeping rows changed since."""
+        conditions, params = _series_conditions(exchange, symbol, timeframe, start, end)
+        conditions.append("updated_at <= :updated_before")
+        params["updated_before"] = updated_before
+
+        sql = text(f"DELETE FROM candles WHERE {' AND '.join(conditions)}")
+
+        with self.engine.connect() as conn:
+            result = conn.execute(sql, params)
+            conn.commit()
+        return result.rowcount
+
     def get_latest_candle_time(
         self,
         exchange: str,
@@ -395,6 +888,66 @@ class PostgresStorage:
             ]
         }
 
+    # Cluster coordination
+
+    def heartbeat_cluster_node(self, node_id: str, host: str, ttl_seconds: float) -> list[str]:
+        """Register/refresh a daemon node, expire silent ones, and return the live node ids."""
+        params = {"node_id": node_id, "host": host, "ttl": ttl_seconds}
+
+        with self.engine.connect() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO cluster_nodes (node_id, host, heartbeat_at)
+                    VALUES (:node_id, :host, NOW())
+                    ON CONFLICT (node_id) DO UPDATE SET heartbeat_at = NOW()
+                """),
+                params,
+            )
+            conn.execute(
+                text("DELETE FROM cluster_nodes WHERE heartbeat_at < NOW() - :ttl * INTERVAL '1 second'"),
+                params,
+            )
+            rows = conn.execute(text("SELECT node_id FROM cluster_nodes ORDER BY node_id")).fetchall()
+            conn.commit()
+
+        return [row[0] for row in rows]
+
+    def acquire_leases(self, names: list[str], node_id: str, ttl_seconds: float) -> set[str]:
+        """Take or renew leases that are free, expired or already ours. Returns the ones held."""
+        if not names:
+            return set()
+        sql = text("""
+            INSERT INTO cluster_leases (name, node_id, expires_at)
+            SELECT name, :node_id, NOW() + :ttl * INTERVAL '1 second'
+            FROM unnest(CAST(:names AS text[])) AS name
+            ON CONFLICT (name) DO UPDATE SET node_id = EXCLUDED.node_id, expires_at = EXCLUDED.expires_at
+            WHERE cluster_leases.node_id = EXCLUDED.node_id OR cluster_leases.expires_at < NOW()
+            RETURNING name
+        """)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, {"names": names, "node_id": node_id, "ttl": ttl_seconds}).fetchall()
+            conn.commit()
+
+        return {row[0] for row in rows}
+
+    def release_leases(self, names: list[str], node_id: str) -> None:
+        """Give up leases held by this node so another node can take them immediately."""
+        if not names:
+            return
+        sql = text("DELETE FROM cluster_leases WHERE name = ANY(CAST(:names AS text[])) AND node_id = :node_id")
+
+        with self.engine.connect() as conn:
+            conn.execute(sql, {"names": names, "node_id": node_id})
+            conn.commit()
+
+    def remove_cluster_node(self, node_id: str) -> None:
+        """Deregister a node and drop all of its leases (clean shutdown)."""
+        with self.engine.connect() as conn:
+            conn.execute(text("DELETE FROM cluster_leases WHERE node_id = :node_id"), {"node_id": node_id})
+            conn.execute(text("DELETE FROM cluster_nodes WHERE node_id = :node_id"), {"node_id": node_id})
+            conn.commit()
+
     def cleanup_old_candles(self, retention_days: dict[str, int]) -> dict[str, int]:
         """Delete candles older than retention period per timeframe.
         
@@ -409,7 +962,7 @@ class PostgresStorage:
         now = datetime.now(timezone.utc)
         
         for timeframe, days in retention_days.items():
-            cutoff = now - __import__('datetime').timedelta(days=days)
+            cutoff = now - timedelta(days=days)
             
             sql = text("""
                 DELETE FROM candles 
@@ -15,9 +15,14 @@ CREATE TABLE IF NOT EXISTS candles (
     close DECIMAL(24, 8) NOT NULL,
     volume DECIMAL(24, 8) NOT NULL,
     created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    change_xid XID8 DEFAULT pg_current_xact_id(),
     PRIMARY KEY (exchange, symbol, timeframe, open_time)
 );
 
+-- Last-change tracking for delta sync (added after the initial schema)
+ALTER TABLE candles ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
 -- Index for common queries
 CREATE INDEX IF NOT EXISTS idx_candles_symbol_timeframe_time 
     ON candles (symbol, timeframe, open_time DESC);
@@ -25,6 +30,30 @@ CREATE INDEX IF NOT EXISTS idx_candles_symbol_timeframe_time
 CREATE INDEX IF NOT EXISTS idx_candles_open_time 
     ON candles (open_time DESC);
 
+-- Writing transaction of each row's last change, the commit-ordered position of the change
+-- feed. Added without a default first so existing tables are not rewritten; their rows keep
+-- NULL until the README "Delta Sync" migration backfills them.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'candles' AND column_name = 'change_xid'
+    ) THEN
+        ALTER TABLE candles ADD COLUMN change_xid XID8;
+        ALTER TABLE candles ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id();
+    END IF;
+END $$;
+
+-- Per-series change feed (/candles/changes). Built here only while the table is empty; an
+-- existing table gets it with CREATE INDEX CONCURRENTLY (see the README "Delta Sync" migration).
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM candles LIMIT 1) THEN
+        CREATE INDEX IF NOT EXISTS idx_candles_series_change
+            ON candles (exchange, symbol, timeframe, change_xid, open_time);
+    END IF;
+END $$;
+
 -- Gap tracking table
 CREATE TABLE IF NOT EXISTS candle_gaps (
     id SERIAL PRIMARY KEY,
@@ -68,3 +97,17 @@ CREATE TABLE IF NOT EXISTS ingestion_state (
     updated_at TIMESTAMPTZ DEFAULT NOW(),
     PRIMARY KEY (exchange, symbol, timeframe)
 );
+
+-- Cluster mode: daemon membership and leases on series partitions / the leader role
+CREATE TABLE IF NOT EXISTS cluster_nodes (
+    node_id VARCHAR(100) PRIMARY KEY,
+    host VARCHAR(255),
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS cluster_leases (
+    name VARCHAR(100) PRIMARY KEY,  -- partition:<n> or leader
+    node_id VARCHAR(100) NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
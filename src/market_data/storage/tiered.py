@@ -0,0 +1,328 @@
+"""Storage that serves old candles from the Parquet archive and recent ones from Postgres."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from market_data.config import settings
+from market_data.storage.archive import ParquetArchive
+from market_data.storage.columnar import CANDLE_COLUMNS
+from market_data.storage.postgres import PostgresStorage, _row_to_candle
+from market_data.types import Candle
+
+_MICROSECOND = timedelta(microseconds=1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+# Postgres rows below the watermark (late corrections) re-aggregated into archived buckets.
+_LATE_ROWS_MAX = 10000
+
+
+def _merge_rows(archived: list[tuple], recent: list[tuple]) -> list[tuple]:
+    """Chronological union of two chronological row lists; Postgres rows win on equal open_time."""
+    if not archived:
+        return recent
+    if not recent:
+        return archived
+    seen = {row[3] for row in recent}
+    return sorted([row for row in archived if row[3] not in seen] + recent, key=lambda row: row[3])
+
+
+def _from_epoch_ms(value: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=int(value))
+
+
+def _bucket_start(value: datetime, bucket: timedelta) -> datetime:
+    return _EPOCH + (value - _EPOCH) // bucket * bucket
+
+
+def _aggregate(rows: list[tuple]) -> tuple:
+    """(open, high, low, close, volume) of chronological candle rows, as in SQL resampling."""
+    return (
+        rows[0][5],
+        max(row[6] for row in rows),
+        min(row[7] for row in rows),
+        rows[-1][8],
+        sum(row[9] for row in rows),
+    )
+
+
+def _later(*values: datetime | None) -> datetime | None:
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def _earlier(*values: datetime | None) -> datetime | None:
+    present = [value for value in values if value is not None]
+    return min(present) if present else None
+
+
+class TieredStorage(PostgresStorage):
+    """PostgresStorage whose series reads also cover candles compacted into the archive.
+
+    Each series has an archive watermark (end of its newest archived month). Reads that stay
+    above it only touch Postgres; reads reaching below it are answered from both tiers and
+    merged by open_time. Rows still in Postgres below the watermark (late corrections that
+    arrived after compaction) take precedence over archived ones, also inside resampled
+    buckets. Batch reads, counts, latest candles and the ingestion status cover both tiers.
+    """
+
+    def __init__(self, database_url: str | None = None, archive: ParquetArchive | str | Path | None = None):
+        super().__init__(database_url)
+        if archive is None:
+            archive = settings.archive_path
+        self.archive = archive if isinstance(archive, ParquetArchive) else ParquetArchive(archive)
+
+    def _watermark(self, exchange: str, symbol: str, timeframe: str, start: datetime | None) -> datetime | None:
+        """Archive watermark if [start, ...) reaches archived data, else None."""
+        watermark = self.archive.watermark(exchange, symbol, timeframe)
+        if watermark is None or (start is not None and start >= watermark):
+            return None
+        return watermark
+
+    def get_candle_rows_before(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        before: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple]:
+        recent = super().get_candle_rows_before(exchange, symbol, timeframe, before, start, end, limit)
+        watermark = self._watermark(exchange, symbol, timeframe, start)
+        if watermark is None or (len(recent) >= limit and recent[0][3] >= watermark):
+            return recent
+
+        archived = self.archive.get_rows(
+            exchange, symbol, timeframe, start=start, end=_earlier(before, end), limit=limit, newest=True
+        )
+        return _merge_rows(archived, recent)[-limit:]
+
+    def get_candle_rows_after(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        after: datetime | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[tuple]:
+        recent = super().get_candle_rows_after(exchange, symbol, timeframe, after, start, end, limit)
+        lower = _later(start, after + _MICROSECOND if after else None)
+        if self._watermark(exchange, symbol, timeframe, lower) is None:
+            return recent
+
+        archived = self.archive.get_rows(exchange, symbol, timeframe, start=lower, end=end, limit=limit, newest=False)
+        return _merge_rows(archived, recent)[:limit]
+
+    def get_resampled_candles(
+        self,
+        exchange: str,
+        symbol: str,
+        base_timeframe: str,
+        bucket: timedelta,
+        timeframe_label: str,
+        start: datetime,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[Candle]:
+        watermark = self._watermark(exchange, symbol, base_timeframe, start)
+        if watermark is None:
+            return super().get_resampled_candles(
+                exchange, symbol, base_timeframe, bucket, timeframe_label, start, end, limit
+            )
+
+        # Split at the watermark: archived buckets below it, Postgres buckets above it. A bucket
+        # spanning the watermark has an older (archived) part and a newer (Postgres) part.
+        recent = []
+        if end is None or end > watermark:
+            recent = super().get_resampled_candles(
+                exchange, symbol, base_timeframe, bucket, timeframe_label, watermark, end, limit
+            )
+        below = _earlier(end, watermark)
+        archived = self.archive.get_resampled_rows(exchange, symbol, base_timeframe, bucket, start, below, limit)
+        archived = self._with_late_rows(exchange, symbol, base_timeframe, bucket, start, below, archived)
+
+        candles = [
+            Candle(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=timeframe_label,
+                open_time=bucket_start,
+                close_time=bucket_start + bucket,
+                open=open_,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+            )
+            for bucket_start, open_, high, low, close, volume in archived
+        ]
+        if candles and recent and candles[-1].open_time == recent[0].open_time:
+            older, newer = candles.pop(), recent[0]
+            recent[0] = Candle(
+                exchange=exchange,
+                symbol=symbol,
+                timeframe=timeframe_label,
+                open_time=newer.open_time,
+                close_time=newer.close_time,
+                open=older.open,
+                high=max(older.high, newer.high),
+                low=min(older.low, newer.low),
+                close=newer.close,
+                volume=older.volume + newer.volume,
+            )
+        return (candles + recent)[-limit:]
+
+    def get_candle_columns(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        columns: Sequence[str] = tuple(CANDLE_COLUMNS),
+    ) -> dict[str, np.ndarray]:
+        columns = tuple(columns)
+        watermark = self._watermark(exchange, symbol, timeframe, start)
+        if watermark is None:
+            return super().get_candle_columns(exchange, symbol, timeframe, start, end, columns)
+
+        # open_time is needed to order and de-duplicate the two tiers.
+        read = columns if "open_time" in columns else ("open_time", *columns)
+        archived = self.archive.get_columns(exchange, symbol, timeframe, start, _earlier(end, watermark), read)
+        recent = super().get_candle_columns(exchange, symbol, timeframe, start, end, read)
+
+        keep = ~np.isin(archived["open_time"], recent["open_time"])
+        merged = {name: np.concatenate([archived[name][keep], recent[name]]) for name in read}
+        order = np.argsort(merged["open_time"], kind="stable")
+        return {name: merged[name][order] for name in columns}
+
+    def get_range_summary(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> dict:
+        recent = super().get_range_summary(exchange, symbol, timeframe, start, end)
+        watermark = self._watermark(exchange, symbol, timeframe, start)
+        if watermark is None:
+            return recent
+
+        archived = self.archive.summary(exchange, symbol, timeframe, start, _earlier(end, watermark))
+        # Rows still in Postgres below the watermark may also be archived; the count can
+        # over-report those (it is only used for validators and estimates).
+        return {
+            "count": recent["count"] + archived["count"],
+            "oldest": _earlier(recent["oldest"], archived["oldest"]),
+            "newest": _later(recent["newest"], archived["newest"]),
+            "last_modified": _later(recent["last_modified"], archived["last_modified"]),
+        }
+
+    def get_candles_batch(
+        self,
+        exchange: str,
+        series: list[tuple[str, str]],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 100,
+    ) -> dict[tuple[str, str], list[Candle]]:
+        result = super().get_candles_batch(exchange, series, start, end, limit)
+        for (symbol, timeframe), recent in result.items():
+            watermark = self._watermark(exchange, symbol, timeframe, start)
+            if watermark is None or (len(recent) >= limit and recent[0].open_time >= watermark):
+                continue
+            archived = self.archive.get_rows(exchange, symbol, timeframe, start=start, end=end, limit=limit, newest=True)
+            seen = {candle.open_time for candle in recent}
+            merged = [_row_to_candle(row) for row in archived if row[3] not in seen] + recent
+            result[(symbol, timeframe)] = sorted(merged, key=lambda candle: candle.open_time)[-limit:]
+        return result
+
+    def get_candle_count(self, exchange: str, symbol: str, timeframe: str) -> int:
+        summary = self._series_summary(exchange, symbol, timeframe)
+        return super().get_candle_count(exchange, symbol, timeframe) if summary is None else summary["count"]
+
+    def get_latest_candles(self, exchange: str | None = None) -> list[Candle]:
+        latest = super().get_latest_candles(exchange)
+        # Series whose rows have all been compacted exist only in the archive.
+        present = {(c.exchange, c.symbol, c.timeframe) for c in latest}
+        for key in self.archive.series(exchange):
+            if key not in present:
+                latest.extend(_row_to_candle(row) for row in self.archive.get_rows(*key, limit=1, newest=True))
+        return latest
+
+    def get_ingestion_status(self) -> dict:
+        status = super().get_ingestion_status()
+        rows = {(row["exchange"], row["symbol"], row["timeframe"]): row for row in status["symbols"]}
+        for key in self.archive.series():
+            summary = self._series_summary(*key)
+            if summary is None:
+                continue
+            rows[key] = {
+                "exchange": key[0],
+                "symbol": key[1],
+                "timeframe": key[2],
+                "candle_count": summary["count"],
+                "oldest": summary["oldest"].isoformat() if summary["oldest"] else None,
+                "newest": summary["newest"].isoformat() if summary["newest"] else None,
+            }
+        return {"symbols": [rows[key] for key in sorted(rows)]}
+
+    def _series_summary(self, exchange: str, symbol: str, timeframe: str) -> dict | None:
+        """Exact count and open_time bounds of a whole series across both tiers (None if unarchived).
+
+        Postgres rows below the watermark that replace archived ones are counted once.
+        """
+        watermark = self.archive.watermark(exchange, symbol, timeframe)
+        if watermark is None:
+            return None
+        archived = self.archive.summary(exchange, symbol, timeframe)
+        recent = super().get_range_summary(exchange, symbol, timeframe, watermark, None)
+        late = super().get_candle_columns(exchange, symbol, timeframe, None, watermark, ("open_time",))["open_time"]
+        count = archived["count"] + recent["count"] + len(late)
+        late_bounds: tuple[datetime | None, datetime | None] = (None, None)
+        if len(late):
+            late_bounds = (_from_epoch_ms(late[0]), _from_epoch_ms(late[-1]))
+            overlap = self.archive.get_columns(
+                exchange, symbol, timeframe, late_bounds[0], late_bounds[1] + _MICROSECOND, ("open_time",)
+            )["open_time"]
+            count -= int(np.isin(late, overlap).sum())
+        return {
+            "count": count,
+            "oldest": _earlier(archived["oldest"], late_bounds[0], recent["oldest"]),
+            "newest": _later(archived["newest"], late_bounds[1], recent["newest"]),
+        }
+
+    def _with_late_rows(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        bucket: timedelta,
+        start: datetime,
+        end: datetime,
+        archived: list[tuple],
+    ) -> list[tuple]:
+        """Re-aggregate archived buckets that Postgres rows below the watermark correct."""
+        late = super().get_candle_rows_before(exchange, symbol, timeframe, None, start, end, _LATE_ROWS_MAX)
+        if not late:
+            return archived
+
+        by_bucket: dict[datetime, list[tuple]] = {}
+        for row in late:
+            by_bucket.setdefault(_bucket_start(row[3], bucket), []).append(row)
+        buckets = {row[0]: row for row in archived}
+        for bucket_start, rows in by_bucket.items():
+            older = self.archive.get_rows(
+                exchange, symbol, timeframe, start=max(bucket_start, start), end=min(bucket_start + bucket, end),
+                limit=_LATE_ROWS_MAX, newest=False,
+            )
+            buckets[bucket_start] = (bucket_start, *_aggregate(_merge_rows(older, rows)))
+        return [buckets[key] for key in sorted(buckets)]
@@ -0,0 +1,477 @@
+"""Synthetic OHLCV generator and bulk seeder for production-sized test databases.
+
+Every symbol is a fat-tailed 1m random walk (Student-t returns) whose volatility follows a
+slow hourly regime and an intraday/weekday activity profile; volume follows the same profile
+and rises with the size of the move. Per-symbol parameters (price level, volatility, traded
+notional) are drawn from the seed, so the same arguments always produce the same rows.
+
+Gaps come in three kinds:
+
+- illiquid symbols (`illiquid_share`) do not trade every minute, less so at quiet hours;
+- quiet spells (`illiquid_periods_per_year`) cut trading and volume for every symbol;
+- outages (`holes_per_year`, `missing_ranges`) have no candles at all.
+
+Higher timeframes (up to 1D) are aggregated from the generated 1m candles, so they are
+consistent with them. Rows are bulk-loaded with `COPY ... FROM STDIN` from several worker
+processes:
+
+    market-data-seed --symbols 2000 --start 2022-01-01 --end 2024-01-01 --timeframes 1m,1h --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy import text
+
+from market_data.config import settings
+from market_data.exchanges.bitfinex import TIMEFRAMES
+from market_data.sim_symbols import symbol_names
+from market_data.storage.postgres import PostgresStorage
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+MINUTES_PER_YEAR = 525_600
+CHUNK_DAYS = 7  # generated, aggregated and committed per symbol at a time
+PRICE_DIGITS = 5  # significant digits, as Bitfinex quotes
+VOL_REGIME_PHI = 0.98  # hourly persistence of the log-volatility regime
+VOL_REGIME_SD = 0.4  # stationary spread of the log-volatility regime
+QUIET_TRADE_FACTOR = 0.1  # trade probability multiplier in quiet spells
+QUIET_VOLUME_FACTOR = 0.2
+COPY_COLUMNS = "exchange, symbol, timeframe, open_time, close_time, open, high, low, close, volume"
+
+# Timeframes that fit in a UTC day can be aggregated chunk by chunk (1W buckets are not epoch-aligned).
+SEEDABLE_TIMEFRAMES = {
+    tf: int(delta.total_seconds() * 1000)
+    for tf, (_, delta) in TIMEFRAMES.items()
+    if timedelta(days=1) % delta == timedelta(0)
+}
+
+
+@dataclass
+class SyntheticConfig:
+    seed: int = 0
+    missing_fraction: float = 0.0  # share of candles dropped at random
+    holes_per_year: float = 2.0  # outages per symbol (no candles at all), Poisson rate
+    hole_hours: float = 6.0  # mean outage length
+    illiquid_share: float = 0.1  # share of symbols that do not trade every minute
+    illiquid_periods_per_year: float = 4.0  # quiet spells per symbol, Poisson rate
+    illiquid_period_hours: float = 48.0  # mean quiet spell length
+    missing_ranges: list[tuple[int, int]] = field(default_factory=list)  # [start, end) epoch ms, all symbols
+
+
+def _symbol_seed(symbol: str) -> int:
+    return int.from_bytes(hashlib.blake2b(symbol.encode(), digest_size=8).digest(), "big")
+
+
+def _activity(open_ms: np.ndarray) -> np.ndarray:
+    """Relative activity by UTC hour and weekday: busiest around the EU/US overlap, quieter at weekends."""
+    hours = (open_ms % DAY_MS) / 3_600_000
+    weekday = (open_ms // DAY_MS + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    activity = 1 + 0.45 * np.cos(2 * np.pi * (hours - 15) / 24)
+    return np.where(weekday >= 5, 0.65 * activity, activity)
+
+
+def _in_windows(open_ms: np.ndarray, windows: Sequence[tuple[int, int]]) -> np.ndarray:
+    """Minutes overlapping any [start, end) window."""
+    mask = np.zeros(len(open_ms), dtype=bool)
+    if not len(open_ms):
+        return mask
+    first, last = int(open_ms[0]), int(open_ms[-1]) + MINUTE_MS
+    for start, end in windows:
+        if start < last and end > first:
+            mask |= (open_ms + MINUTE_MS > start) & (open_ms < end)
+    return mask
+
+
+def _round_price(values: np.ndarray) -> np.ndarray:
+    """Round to PRICE_DIGITS significant digits (integer scales only, so the text form stays short)."""
+    exponent = PRICE_DIGITS - 1 - np.floor(np.log10(values))
+    up = 10.0 ** np.maximum(exponent, 0)
+    down = 10.0 ** np.maximum(-exponent, 0)
+    return np.where(exponent >= 0, np.round(values * up) / up, np.round(values / down) * down)
+
+
+class SyntheticSeries:
+    """One symbol's 1m candles over [start_ms, end_ms) (UTC midnights), generated a week at a time."""
+
+    def __init__(self, symbol: str, start_ms: int, end_ms: int, config: SyntheticConfig | None = None):
+        if start_ms % DAY_MS or end_ms % DAY_MS or end_ms <= start_ms:
+            raise ValueError("start and end must be UTC midnights with start < end")
+        self.symbol = symbol
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.config = config or SyntheticConfig()
+        self._rng = np.random.default_rng([self.config.seed, _symbol_seed(symbol)])
+        rng = self._rng
+
+        self.price = float(10 ** rng.uniform(-1, 4.7))
+        self.sigma = rng.uniform(0.4, 1.5) / math.sqrt(MINUTES_PER_YEAR)  # 40-150% annualised
+        illiquid = rng.random() < self.config.illiquid_share
+        self.trade_probability = float(rng.uniform(0.02, 0.4)) if illiquid else 1.0
+        self.notional = float(10 ** (rng.uniform(3, 5) if illiquid else rng.uniform(5, 8)))  # quote units per day
+        years = (end_ms - start_ms) / (DAY_MS * 365)
+        self.holes = self._windows(self.config.holes_per_year * years, self.config.hole_hours)
+        self.holes += list(self.config.missing_ranges)
+        self.quiet = self._windows(self.config.illiquid_periods_per_year * years, self.config.illiquid_period_hours)
+        self._log_vol = float(rng.normal(0, VOL_REGIME_SD))
+
+    def _windows(self, expected: float, mean_hours: float) -> list[tuple[int, int]]:
+        count = self._rng.poisson(max(0.0, expected))
+        starts = self._rng.integers(self.start_ms // MINUTE_MS, self.end_ms // MINUTE_MS, count) * MINUTE_MS
+        lengths = np.maximum(1, self._rng.exponential(mean_hours * 60, count)).astype(np.int64) * MINUTE_MS
+        return [(int(s), int(s + n)) for s, n in zip(starts, lengths, strict=True)]
+
+    def _regime(self, hours: int) -> np.ndarray:
+        """Hourly volatility multipliers: an AR(1) in log space, continued across chunks."""
+        decay = VOL_REGIME_PHI ** np.arange(1, hours + 1)
+        shocks = self._rng.normal(0, VOL_REGIME_SD * math.sqrt(1 - VOL_REGIME_PHI**2), hours)
+        log_vol = decay * (self._log_vol + np.cumsum(shocks / decay))
+        self._log_vol = float(log_vol[-1])
+        return np.exp(log_vol - VOL_REGIME_SD**2 / 2)
+
+    def chunks(self) -> Iterator[dict[str, np.ndarray]]:
+        """Yield column arrays (open_time as epoch ms) per CHUNK_DAYS, in time order."""
+        for start in range(self.start_ms, self.end_ms, CHUNK_DAYS * DAY_MS):
+            yield self._chunk(start, min(start + CHUNK_DAYS * DAY_MS, self.end_ms))
+
+    def _chunk(self, start: int, end: int) -> dict[str, np.ndarray]:
+        rng = self._rng
+        n = (end - start) // MINUTE_MS
+        open_ms = start + np.arange(n, dtype=np.int64) * MINUTE_MS
+        activity = _activity(open_ms)
+        regime = np.repeat(self._regime(n // 60), 60)
+        quiet = _in_windows(open_ms, self.quiet)
+
+        sigma = self.sigma * regime * np.sqrt(activity)
+        shocks = rng.standard_t(4, n) / math.sqrt(2)  # unit variance, fat tails
+        close = np.exp(math.log(self.price) + np.cumsum(sigma * shocks))
+        open_ = np.concatenate(([self.price], close[:-1]))
+        self.price = float(close[-1])
+        wick = 0.6 * sigma
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 1, n)) * wick)
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 1, n)) * wick)
+        volume = (
+            self.notional / 1440 / close
+            * activity * regime * (0.5 + 0.5 * np.abs(shocks))
+            * rng.lognormal(-0.18, 0.6, n)
+            * np.where(quiet, QUIET_VOLUME_FACTOR, 1.0)
+        )
+
+        probability = np.minimum(1.0, self.trade_probability * activity) if self.trade_probability < 1 else 1.0
+        probability = np.where(quiet, probability * QUIET_TRADE_FACTOR, probability)
+        keep = rng.random(n) < probability * (1 - self.config.missing_fraction)
+        keep &= ~_in_windows(open_ms, self.holes)
+        return {
+            "open_time": open_ms[keep],
+            "open": _round_price(open_[keep]),
+            "high": _round_price(high[keep]),
+            "low": _round_price(low[keep]),
+            "close": _round_price(close[keep]),
+            "volume": np.maximum(np.round(volume[keep], 8), 1e-8),
+        }
+
+
+def aggregate(columns: dict[str, np.ndarray], step_ms: int) -> dict[str, np.ndarray]:
+    """Combine chronological 1m columns into `step_ms` buckets (only buckets with candles)."""
+    if not len(columns["open_time"]):
+        return {name: values.copy() for name, values in columns.items()}
+    bucket = columns["open_time"] // step_ms
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    ends = np.append(starts[1:], len(bucket)) - 1
+    return {
+        "open_time": bucket[starts] * step_ms,
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.round(np.add.reduceat(columns["volume"], starts), 8),
+    }
+
+
+def generate_candles(
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+    config: SyntheticConfig | None = None,
+) -> dict[str, np.ndarray]:
+    """All synthetic candles of one series in [start, end), as column arrays."""
+    step_ms = _step_ms(timeframe)
+    series = SyntheticSeries(symbol, _epoch_ms(start), _epoch_ms(end), config)
+    chunks = [chunk if step_ms == MINUTE_MS else aggregate(chunk, step_ms) for chunk in series.chunks()]
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def copy_text(exchange: str, symbol: str, timeframe: str, columns: dict[str, np.ndarray]) -> str:
+    """COPY text-format rows for COPY_COLUMNS."""
+    open_ms = columns["open_time"]
+    if not len(open_ms):
+        return ""
+    step_ms = _step_ms(timeframe)
+    opens = np.datetime_as_string(open_ms.astype("datetime64[ms]"), unit="s").tolist()
+    closes = np.datetime_as_string((open_ms + step_ms).astype("datetime64[ms]"), unit="s").tolist()
+    line = f"{exchange}\t{symbol}\t{timeframe}\t{{}}+00\t{{}}+00\t{{}}\t{{}}\t{{}}\t{{}}\t{{}}\n".format
+    return "".join(map(
+        line,
+        opens,
+        closes,
+        columns["open"].tolist(),
+        columns["high"].tolist(),
+        columns["low"].tolist(),
+        columns["close"].tolist(),
+        columns["volume"].tolist(),
+    ))
+
+
+def _step_ms(timeframe: str) -> int:
+    if timeframe not in SEEDABLE_TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe '{timeframe}', expected one of {', '.join(SEEDABLE_TIMEFRAMES)}")
+    return SEEDABLE_TIMEFRAMES[timeframe]
+
+
+def _epoch_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+# Loading
+
+
+@dataclass
+class SeedJob:
+    exchange: str
+    timeframes: list[str]
+    start_ms: int
+    end_ms: int
+    config: SyntheticConfig
+    replace: bool = False
+
+
+def load_symbol(connection: Any, symbol: str, job: SeedJob) -> int:
+    """Generate and COPY one symbol's series, committing per chunk. Returns rows written."""
+    series = SyntheticSeries(symbol, job.start_ms, job.end_ms, job.config)
+    cursor = connection.cursor()
+    try:
+        if job.replace:
+            cursor.execute(
+                """
+                DELETE FROM candles
+                WHERE exchange = %s AND symbol = %s AND timeframe = ANY(%s)
+                  AND open_time >= to_timestamp(%s / 1000.0) AND open_time < to_timestamp(%s / 1000.0)
+                """,
+                (job.exchange, symbol, job.timeframes, job.start_ms, job.end_ms),
+            )
+        rows = 0
+        for chunk in series.chunks():
+            buffer = io.StringIO()
+            for tf in job.timeframes:
+                step_ms = _step_ms(tf)
+                columns = chunk if step_ms == MINUTE_MS else aggregate(chunk, step_ms)
+                buffer.write(copy_text(job.exchange, symbol, tf, columns))
+                rows += len(columns["open_time"])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY candles ({COPY_COLUMNS}) FROM STDIN", buffer)
+            connection.commit()
+        return rows
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _open_connection(database_url: str) -> Any:
+    connection = PostgresStorage(database_url).engine.raw_connection()
+    cursor = connection.cursor()
+    # Seeding is restartable with --replace; losing the last commits on a crash is acceptable.
+    cursor.execute("SET synchronous_commit = off")
+    cursor.close()
+    connection.commit()
+    return connection
+
+
+_worker_connection: Any = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_connection
+    _worker_connection = _open_connection(database_url)
+
+
+def _load_in_worker(symbol: str, job: SeedJob) -> tuple[str, int]:
+    return symbol, load_symbol(_worker_connection, symbol, job)
+
+
+def _drop_secondary_indexes(storage: PostgresStorage) -> list[str]:
+    """Drop the non-primary-key indexes on candles; returns their definitions for rebuilding."""
+    with storage.engine.begin() as conn:
+        rows = conn.execute(text(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname
+            JOIN pg_index x ON x.indexrelid = c.oid
+            WHERE i.schemaname = current_schema() AND i.tablename = 'candles' AND NOT x.indisprimary
+            """
+        )).fetchall()
+        for name, _ in rows:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+    return [definition for _, definition in rows]
+
+
+def _rebuild_indexes(storage: PostgresStorage, definitions: list[str]) -> None:
+    for definition in definitions:
+        started = time.monotonic()
+        with storage.engine.begin() as conn:
+            conn.execute(text(definition))
+        logger.info(f"Rebuilt index in {time.monotonic() - started:.1f}s: {definition}")
+
+
+def seed_database(
+    database_url: str,
+    symbols: Sequence[str],
+    timeframes: Sequence[str],
+    start: datetime,
+    end: datetime,
+    config: SyntheticConfig | None = None,
+    exchange: str = "bitfinex",
+    workers: int = 1,
+    replace: bool = False,
+    defer_indexes: bool = False,
+) -> int:
+    """Bulk-load synthetic series for every symbol and timeframe. Returns rows written.
+
+    Without `replace` the target ranges must be empty (COPY stops on the primary key).
+    `defer_indexes` drops the secondary candles indexes for the load and rebuilds them after,
+    which is much faster for large loads on an otherwise idle database.
+    """
+    for tf in timeframes:
+        _step_ms(tf)
+    job = SeedJob(exchange, list(timeframes), _epoch_ms(start), _epoch_ms(end), config or SyntheticConfig(), replace)
+    SyntheticSeries("", job.start_ms, job.end_ms)  # validates the range before touching the database
+
+    storage = PostgresStorage(database_url)
+    storage.init_schema()
+    deferred = _drop_secondary_indexes(storage) if defer_indexes else []
+    started = time.monotonic()
+    total = 0
+    try:
+        if workers <= 1:
+            connection = _open_connection(database_url)
+            try:
+                for done, symbol in enumerate(symbols, 1):
+                    total += load_symbol(connection, symbol, job)
+                    _log_progress(done, len(symbols), total, started)
+            finally:
+                connection.close()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(database_url,),
+            ) as pool:
+                futures = [pool.submit(_load_in_worker, symbol, job) for symbol in symbols]
+                for done, future in enumerate(as_completed(futures), 1):
+                    total += future.result()[1]
+                    _log_progress(done, len(symbols), total, started)
+    finally:
+        if deferred:
+            _rebuild_indexes(storage, deferred)
+        with storage.engine.begin() as conn:
+            conn.execute(text("ANALYZE candles"))
+        storage.engine.dispose()
+    return total
+
+
+def _log_progress(done: int, count: int, rows: int, started: float) -> None:
+    elapsed = max(time.monotonic() - started, 1e-9)
+    logger.info(f"{done}/{count} symbols, {rows:,} rows ({rows / elapsed * 60:,.0f} rows/min)")
+
+
+def _date(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=UTC)
+
+
+def _range_ms(value: str) -> tuple[int, int]:
+    start, _, end = value.partition("/")
+    return (
+        _epoch_ms(datetime.fromisoformat(start.replace("Z", "+00:00"))),
+        _epoch_ms(datetime.fromisoformat(end.replace("Z", "+00:00"))),
+    )
+
+
+def main() -> None:
+    """Entry point: generate synthetic candles and bulk-load them."""
+    today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description="Generate synthetic candles and bulk-load them into PostgreSQL")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL")
+    parser.add_argument("--symbols", type=int, default=100, help="Number of pairs (simulator naming)")
+    parser.add_argument("--start", default=None, help="First day (YYYY-MM-DD, UTC); default one year before --end")
+    parser.add_argument("--end", default=today.date().isoformat(), help="Day after the last one (YYYY-MM-DD, UTC)")
+    parser.add_argument("--timeframes", default="1m", help=f"Comma-separated, of {', '.join(SEEDABLE_TIMEFRAMES)}")
+    parser.add_argument("--exchange", default="bitfinex")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Loader processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--missing-fraction", type=float, default=0.0, help="Share of candles dropped at random")
+    parser.add_argument("--holes-per-year", type=float, default=2.0, help="Outages per symbol and year")
+    parser.add_argument("--hole-hours", type=float, default=6.0, help="Mean outage length")
+    parser.add_argument("--illiquid-share", type=float, default=0.1, help="Share of symbols not trading every minute")
+    parser.add_argument("--illiquid-periods-per-year", type=float, default=4.0, help="Quiet spells per symbol and year")
+    parser.add_argument("--illiquid-period-hours", type=float, default=48.0, help="Mean quiet spell length")
+    parser.add_argument("--missing", action="append", default=[], metavar="START/END",
+                        help="ISO time range without candles for any symbol (repeatable)")
+    parser.add_argument("--replace", action="store_true", help="Delete existing rows in the seeded ranges first")
+    parser.add_argument("--defer-indexes", action="store_true", help="Drop secondary indexes during the load")
+    args = parser.parse_args()
+
+    end = _date(args.end)
+    start = _date(args.start) if args.start else end - timedelta(days=365)
+    config = SyntheticConfig(
+        seed=args.seed,
+        missing_fraction=args.missing_fraction,
+        holes_per_year=args.holes_per_year,
+        hole_hours=args.hole_hours,
+        illiquid_share=args.illiquid_share,
+        illiquid_periods_per_year=args.illiquid_periods_per_year,
+        illiquid_period_hours=args.illiquid_period_hours,
+        missing_ranges=[_range_ms(r) for r in args.missing],
+    )
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    symbols = symbol_names(args.symbols)
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+    logger.info(f"Seeding {len(symbols)} symbols x {', '.join(timeframes)} from {start.date()} to {end.date()}")
+    started = time.monotonic()
+    rows = seed_database(
+        args.database_url or settings.database_url,
+        symbols,
+        timeframes,
+        start,
+        end,
+        config,
+        exchange=args.exchange,
+        workers=args.workers,
+        replace=args.replace,
+        defer_indexes=args.defer_indexes,
+    )
+    elapsed = time.monotonic() - started
+    logger.info(f"Loaded {rows:,} rows in {elapsed:.0f}s ({rows / max(elapsed, 1e-9) * 60:,.0f} rows/min)")
+
+
+if __name__ == "__main__":
+    main()
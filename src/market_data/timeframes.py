@@ -0,0 +1,42 @@
+"""Timeframe parsing and base-timeframe selection for resampling."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from datetime import timedelta
+
+from market_data.exchanges.bitfinex import TIMEFRAMES
+
+_UNITS = {
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+}
+# Lowercase units only: on Bitfinex "1M" is a month, and stored timeframes are lowercase.
+_TIMEFRAME_RE = re.compile(r"^(\d+)([mhdw])$")
+
+# Weekly exchange candles are not aligned to epoch multiples of 7 days, so they cannot be
+# combined into larger epoch-aligned buckets.
+_NON_RESAMPLABLE = {"1w"}
+
+
+def parse_timeframe(label: str) -> timedelta:
+    """Parse an arbitrary timeframe label such as '90m', '2h', '12h', '3d' or '2w'."""
+    match = _TIMEFRAME_RE.match(label.strip())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid timeframe '{label}', expected <N><m|h|d|w>")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def choose_base_timeframe(target: timedelta, available: Iterable[str]) -> str | None:
+    """Pick the coarsest stored timeframe that evenly divides `target` (fewest rows to read)."""
+    candidates = [
+        (TIMEFRAMES[tf][1], tf)
+        for tf in available
+        if tf in TIMEFRAMES and tf not in _NON_RESAMPLABLE and target % TIMEFRAMES[tf][1] == timedelta(0)
+    ]
+    if not candidates:
+        return None
+    return max(candidates)[1]
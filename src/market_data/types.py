@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from typing import Literal
@@ -24,6 +24,8 @@ class Candle:
     low: Decimal
     close: Decimal
     volume: Decimal
+    # Wall-clock time the realtime frame carrying this update arrived (latency tracing only).
+    received_at: float | None = field(default=None, compare=False, repr=False)
 
     def to_dict(self) -> dict:
         return {
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import numpy as np
+
+from market_data.timeframes import parse_timeframe
+from market_data.types import Candle
+
+T0 = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def make_candle(
+    open_time: datetime | int = 0,
+    close: str | float | Decimal = "1",
+    *,
+    symbol: str = "BTCUSD",
+    timeframe: str = "1h",
+    exchange: str = "bitfinex",
+    open: str | float | Decimal | None = None,
+    high: str | float | Decimal | None = None,
+    low: str | float | Decimal | None = None,
+    volume: str | float | Decimal = "1",
+    received_at: float | None = None,
+) -> Candle:
+    """A candle for tests. An int `open_time` counts timeframes from T0.
+
+    `open` defaults to `close`, `high`/`low` to the larger/smaller of the two.
+    """
+    step = parse_timeframe(timeframe)
+    if isinstance(open_time, int):
+        open_time = T0 + open_time * step
+    close_ = Decimal(str(close))
+    open_ = Decimal(str(open)) if open is not None else close_
+    candle = Candle(
+        exchange=exchange,
+        symbol=symbol,
+        timeframe=timeframe,
+        open_time=open_time,
+        close_time=open_time + step,
+        open=open_,
+        high=Decimal(str(high)) if high is not None else max(open_, close_),
+        low=Decimal(str(low)) if low is not None else min(open_, close_),
+        close=close_,
+        volume=Decimal(str(volume)),
+    )
+    candle.received_at = received_at
+    return candle
+
+
+class FakeStorage:
+    """In-memory stand-in for the PostgresStorage read methods; `calls` counts reads per method."""
+
+    def __init__(self, candles: list[Candle] | None = None):
+        self.candles: list[Candle] = list(candles or [])
+        self.calls: Counter[str] = Counter()
+
+    def _series(self, exchange: str, symbol: str, timeframe: str) -> list[Candle]:
+        return sorted(
+            (c for c in self.candles if (c.exchange, c.symbol, c.timeframe) == (exchange, symbol, timeframe)),
+            key=lambda c: c.open_time,
+        )
+
+    def get_latest_candles(self, exchange=None):
+        self.calls["get_latest_candles"] += 1
+        newest: dict = {}
+        for c in self.candles:
+            key = (c.exchange, c.symbol, c.timeframe)
+            if (exchange is None or c.exchange == exchange) and (key not in newest or c.open_time > newest[key].open_time):
+                newest[key] = c
+        return list(newest.values())
+
+    def get_candles_before(self, exchange, symbol, timeframe, before=None, start=None, end=None, limit=1000):
+        self.calls["get_candles_before"] += 1
+        return [
+            c for c in self._series(exchange, symbol, timeframe)
+            if (before is None or c.open_time < before)
+            and (start is None or c.open_time >= start)
+            and (end is None or c.open_time < end)
+        ][-limit:]
+
+    def get_candles_after(self, exchange, symbol, timeframe, after=None, start=None, end=None, limit=1000):
+        self.calls["get_candles_after"] += 1
+        return [
+            c for c in self._series(exchange, symbol, timeframe)
+            if (after is None or c.open_time > after)
+            and (start is None or c.open_time >= start)
+            and (end is None or c.open_time < end)
+        ][:limit]
+
+    def get_candles_batch(self, exchange, series, start=None, end=None, limit=100):
+        self.calls["get_candles_batch"] += 1
+        return {
+            (symbol, timeframe): [
+                c for c in self._series(exchange, symbol, timeframe)
+                if (start is None or c.open_time >= start) and (end is None or c.open_time < end)
+            ][-limit:]
+            for symbol, timeframe in dict.fromkeys(series)
+        }
+
+    def get_candle_columns_batch(self, exchange, series, limit=100):
+        self.calls["get_candle_columns_batch"] += 1
+        result = {}
+        for symbol, timeframe in dict.fromkeys(series):
+            candles = self._series(exchange, symbol, timeframe)[-limit:]
+            result[(symbol, timeframe)] = {
+                "open_time": np.array([int(c.open_time.timestamp() * 1000) for c in candles], dtype=np.int64),
+                "close_time": np.array([int(c.close_time.timestamp() * 1000) for c in candles], dtype=np.int64),
+                **{
+                    name: np.array([float(getattr(c, name)) for c in candles])
+                    for name in ("open", "high", "low", "close", "volume")
+                },
+            }
+        return result
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import QueryParams
+
+from market_data.api import admission, deps
+from market_data.api.admission import (
+    FULL_SCAN_COST,
+    AdmissionController,
+    AdmissionRejected,
+    _series_count,
+    estimate_cost,
+)
+from market_data.api.main import create_app
+from market_data.services.indicators import seed_limit
+from tests.helpers import FakeStorage
+
+
+def test_estimate_cost_scales_with_rows() -> None:
+    small = estimate_cost("/candles", QueryParams("timeframe=1h&start=2024-01-01T00:00:00&end=2024-01-02T00:00:00"))
+    large = estimate_cost("/candles", QueryParams("timeframe=1m&limit=10000"))
+    params = QueryParams("symbols=BTCUSD,ETHUSD&timeframes=1h,4h,1d&limit=1000")
+
+    assert small == pytest.approx(1.024)
+    assert large == pytest.approx(11)
+    assert estimate_cost("/candles/batch", params, _series_count(params)) == pytest.approx(7)
+    assert estimate_cost("/status", QueryParams("")) == FULL_SCAN_COST
+    assert estimate_cost("/health", QueryParams("")) is None
+    assert estimate_cost("/stream/sse", QueryParams("")) is None
+
+
+def test_indicators_cost_follows_seed_size() -> None:
+    coarse = estimate_cost("/indicators", QueryParams("symbols=BTCUSD,ETHUSD&timeframes=1d"))
+    fine = estimate_cost("/indicators", QueryParams("series=BTCUSD:1m,ETHUSD:1d"))
+
+    assert coarse == pytest.approx(1.6)
+    # A cold 1m series seeds every candle since UTC midnight for the VWAP.
+    assert fine == pytest.approx(1 + (seed_limit("1m", datetime.now(UTC)) + 300) / 1000, abs=0.002)
+
+
+def test_controller_queues_then_rejects_over_client_budget() -> None:
+    controller = AdmissionController(
+        max_concurrency=10, max_cost=100, client_max_concurrency=1, client_max_cost=50, queue_seconds=0.05
+    )
+
+    async def scenario() -> None:
+        async with controller.admit("a", 5):
+            # Another client is unaffected; the same client must wait and times out.
+            async with controller.admit("b", 5):
+                pass
+            with pytest.raises(AdmissionRejected) as exc:
+                async with controller.admit("a", 1):
+                    pass
+            assert exc.value.retry_after == 1
+
+        # Once released, a queued request is admitted.
+        async def holder() -> None:
+            async with controller.admit("a", 1000):
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        async with controller.admit("a", 1):
+            pass
+        await task
+
+    asyncio.run(scenario())
+    stats = controller.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["admitted"] == 4
+
+
+def test_rejections_carry_cors_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = AdmissionController(
+        max_concurrency=0, max_cost=100, client_max_concurrency=1, client_max_cost=50, queue_seconds=0.01
+    )
+    monkeypatch.setattr(admission, "_admission_controller", controller)
+    monkeypatch.setattr(deps, "_storage", FakeStorage())
+
+    with TestClient(create_app()) as client:
+        response = client.get("/candles/count", headers={"Origin": "https://example.com"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
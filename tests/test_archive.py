@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("duckdb")
+
+from market_data.services.archive import ArchiveCompactor  # noqa: E402
+from market_data.storage.archive import ParquetArchive  # noqa: E402
+from market_data.storage.postgres import PostgresStorage, _row_to_candle  # noqa: E402
+from market_data.storage.tiered import TieredStorage  # noqa: E402
+from market_data.types import Candle  # noqa: E402
+
+SERIES = ("bitfinex", "BTCUSD", "1h")
+HOUR = timedelta(hours=1)
+
+
+def _row(open_time: datetime, close: str) -> tuple:
+    price = Decimal(close)
+    return (*SERIES, open_time, open_time + HOUR, price, price, price, price, Decimal("1.50000000"))
+
+
+def _write_csv(path: Path, rows: list[tuple]) -> None:
+    lines = ["open_time,close_time,open,high,low,close,volume"]
+    lines += [",".join([row[3].isoformat(), row[4].isoformat(), *map(str, row[5:])]) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _hours(start: datetime, count: int, close: str = "100.12345678") -> list[tuple]:
+    return [_row(start + i * HOUR, close) for i in range(count)]
+
+
+def test_write_month_merges_and_reads_back(tmp_path: Path) -> None:
+    archive = ParquetArchive(tmp_path / "archive")
+    jan = datetime(2024, 1, 1, tzinfo=UTC)
+    csv = tmp_path / "export.csv"
+
+    _write_csv(csv, _hours(jan, 3))
+    assert archive.write_month(*SERIES, date(2024, 1, 1), csv) == 3
+    # A later export of the same month replaces overlapping rows and adds new ones.
+    _write_csv(csv, _hours(jan + 2 * HOUR, 2, close="7.00000001"))
+    assert archive.write_month(*SERIES, date(2024, 1, 1), csv) == 4
+
+    rows = archive.get_rows(*SERIES, limit=10)
+    assert [row[3] for row in rows] == [jan + i * HOUR for i in range(4)]
+    assert rows[0] == _row(jan, "100.12345678")
+    assert rows[2][8] == Decimal("7.00000001")
+
+    assert archive.get_rows(*SERIES, limit=2, newest=True) == rows[2:]
+    assert archive.get_rows(*SERIES, start=jan + HOUR, limit=1, newest=False) == rows[1:2]
+    assert archive.watermark(*SERIES) == datetime(2024, 2, 1, tzinfo=UTC)
+
+    columns = archive.get_columns(*SERIES, columns=("open_time", "close"))
+    assert columns["open_time"].tolist() == [int((jan + i * HOUR).timestamp() * 1000) for i in range(4)]
+    assert columns["close"].tolist() == [100.12345678, 100.12345678, 7.00000001, 7.00000001]
+
+    assert archive.drop_months_before(*SERIES, datetime(2024, 2, 1, tzinfo=UTC)) == 1
+    assert archive.months(*SERIES) == []
+
+
+def test_tiered_reads_merge_archive_and_postgres(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    archive = ParquetArchive(tmp_path / "archive")
+    jan_end = datetime(2024, 1, 31, 22, tzinfo=UTC)
+    csv = tmp_path / "export.csv"
+    _write_csv(csv, _hours(jan_end, 2, close="1.00000000"))
+    archive.write_month(*SERIES, date(2024, 1, 1), csv)
+
+    # Postgres holds February plus a late correction of the last January hour.
+    postgres = [_row(jan_end + HOUR, "2.00000000")] + _hours(datetime(2024, 2, 1, tzinfo=UTC), 3, "3.00000000")
+
+    def rows_before(self, exchange, symbol, timeframe, before=None, start=None, end=None, limit=1000):
+        rows = [r for r in postgres if (before is None or r[3] < before) and (start is None or r[3] >= start)]
+        return rows[-limit:]
+
+    def rows_after(self, exchange, symbol, timeframe, after=None, start=None, end=None, limit=1000):
+        rows = [r for r in postgres if (after is None or r[3] > after) and (start is None or r[3] >= start)]
+        return rows[:limit]
+
+    monkeypatch.setattr(PostgresStorage, "get_candle_rows_before", rows_before)
+    monkeypatch.setattr(PostgresStorage, "get_candle_rows_after", rows_after)
+    storage = TieredStorage("postgresql://unused/db", archive=archive)
+
+    # Newest page stays in Postgres.
+    assert storage.get_candle_rows_before(*SERIES, limit=3) == postgres[1:]
+
+    newest = storage.get_candle_rows_before(*SERIES, limit=10)
+    assert [row[3] for row in newest] == [jan_end + i * HOUR for i in range(5)]
+    assert newest[1][8] == Decimal("2.00000000")  # Postgres wins over the archive
+
+    oldest = storage.get_candle_rows_after(*SERIES, limit=2)
+    assert oldest == [_row(jan_end, "1.00000000"), postgres[0]]
+
+
+def test_tiered_batch_count_status_and_resample_cover_the_archive(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    archive = ParquetArchive(tmp_path / "archive")
+    jan_end = datetime(2024, 1, 31, 22, tzinfo=UTC)
+    feb = datetime(2024, 2, 1, tzinfo=UTC)
+    csv = tmp_path / "export.csv"
+    _write_csv(csv, _hours(jan_end, 2, close="1.00000000"))
+    archive.write_month(*SERIES, date(2024, 1, 1), csv)
+    # ETHUSD was compacted completely: it only exists in the archive.
+    archive.write_month("bitfinex", "ETHUSD", "1h", date(2024, 1, 1), csv)
+
+    postgres = [_row(jan_end + HOUR, "2.00000000")] + _hours(feb, 3, "3.00000000")
+
+    def window(start=None, end=None, symbol="BTCUSD"):
+        rows = [r for r in postgres if r[1] == symbol]
+        return [r for r in rows if (start is None or r[3] >= start) and (end is None or r[3] < end)]
+
+    def batch(self, exchange, series, start=None, end=None, limit=100):
+        return {pair: [_row_to_candle(r) for r in window(start, end)][-limit:] for pair in series}
+
+    def summary(self, exchange, symbol, timeframe, start=None, end=None):
+        rows = window(start, end, symbol)
+        return {"count": len(rows), "oldest": rows[0][3] if rows else None, "newest": rows[-1][3] if rows else None}
+
+    def columns(self, exchange, symbol, timeframe, start=None, end=None, columns=()):
+        open_times = [int(r[3].timestamp() * 1000) for r in window(start, end, symbol)]
+        return {"open_time": np.array(open_times, dtype=np.int64)}
+
+    def rows_before(self, exchange, symbol, timeframe, before=None, start=None, end=None, limit=1000):
+        return window(start, end, symbol)[-limit:]
+
+    def resampled(self, exchange, symbol, base_timeframe, bucket, label, start, end=None, limit=1000):
+        rows = window(start, end)
+        prices = (rows[0][5], max(r[6] for r in rows), min(r[7] for r in rows), rows[-1][8])
+        return [Candle(exchange, symbol, label, feb, feb + bucket, *prices, sum(r[9] for r in rows))]
+
+    monkeypatch.setattr(PostgresStorage, "get_candles_batch", batch)
+    monkeypatch.setattr(PostgresStorage, "get_range_summary", summary)
+    monkeypatch.setattr(PostgresStorage, "get_candle_columns", columns)
+    monkeypatch.setattr(PostgresStorage, "get_candle_rows_before", rows_before)
+    monkeypatch.setattr(PostgresStorage, "get_resampled_candles", resampled)
+    monkeypatch.setattr(PostgresStorage, "get_candle_count", lambda self, *key: len(postgres))
+    latest = [_row_to_candle(postgres[-1])]
+    monkeypatch.setattr(PostgresStorage, "get_latest_candles", lambda self, exchange=None: latest)
+    monkeypatch.setattr(PostgresStorage, "get_ingestion_status", lambda self: {"symbols": []})
+    storage = TieredStorage("postgresql://unused/db", archive=archive)
+
+    # The late correction of 23:00 replaces its archived row instead of being counted twice.
+    assert storage.get_candle_count(*SERIES) == 5
+    candles = storage.get_candles_batch("bitfinex", [("BTCUSD", "1h")], limit=10)[("BTCUSD", "1h")]
+    assert [c.open_time for c in candles] == [jan_end + i * HOUR for i in range(5)]
+    assert candles[1].close == Decimal("2.00000000")
+
+    assert sorted(c.symbol for c in storage.get_latest_candles()) == ["BTCUSD", "ETHUSD"]
+    status = {row["symbol"]: row for row in storage.get_ingestion_status()["symbols"]}
+    assert status["BTCUSD"]["candle_count"] == 5 and status["BTCUSD"]["oldest"] == jan_end.isoformat()
+    assert status["ETHUSD"]["candle_count"] == 2
+
+    days = storage.get_resampled_candles("bitfinex", "BTCUSD", "1h", timedelta(days=1), "1d", jan_end - 22 * HOUR)
+    assert [(c.open_time.day, c.open, c.close, c.volume) for c in days] == [
+        (31, Decimal("1.00000000"), Decimal("2.00000000"), Decimal("3.00000000")),
+        (1, Decimal("3.00000000"), Decimal("3.00000000"), Decimal("4.50000000")),
+    ]
+
+
+def test_compactor_archives_closed_months(tmp_path: Path) -> None:
+    archive = ParquetArchive(tmp_path / "archive")
+    jan = datetime(2024, 1, 1, tzinfo=UTC)
+    candles = _hours(jan, 3) + _hours(datetime(2024, 2, 1, tzinfo=UTC), 2)
+    updated_at = datetime(2024, 3, 1, tzinfo=UTC)
+
+    class FakeStorage:
+        def __init__(self):
+            self.deleted: list[tuple] = []
+
+        def get_ingestion_status(self):
+            oldest = min(r[3] for r in candles)
+            return {"symbols": [{"exchange": "bitfinex", "symbol": "BTCUSD", "timeframe": "1h",
+                                 "oldest": oldest.isoformat()}]}
+
+        def export_candles_csv(self, exchange, symbol, timeframe, start, end, path):
+            rows = [r for r in candles if start <= r[3] < end]
+            _write_csv(Path(path), rows)
+            return len(rows), updated_at if rows else None
+
+        def delete_archived_candles(self, exchange, symbol, timeframe, start, end, updated_before):
+            self.deleted.append((start, end, updated_before))
+            before = len(candles)
+            candles[:] = [r for r in candles if not start <= r[3] < end]
+            return before - len(candles)
+
+    storage = FakeStorage()
+    compactor = ArchiveCompactor(storage, archive, archive_after_days=45, retention_days={"1h": 365})
+
+    # Mid-March: only January is older than 45 days.
+    result = compactor.run(now=datetime(2024, 3, 20, tzinfo=UTC))
+
+    assert result == {"archived": 3, "deleted": 3, "dropped_files": 0}
+    assert archive.months(*SERIES) == [date(2024, 1, 1)]
+    assert storage.deleted == [(jan, datetime(2024, 2, 1, tzinfo=UTC), updated_at)]
+
+    # Nothing left to move; once past retention the partition is dropped.
+    assert compactor.run(now=datetime(2024, 3, 21, tzinfo=UTC)) == {"archived": 0, "deleted": 0, "dropped_files": 0}
+    assert compactor.run(now=datetime(2025, 2, 1, tzinfo=UTC))["dropped_files"] == 1
+    assert archive.months(*SERIES) == [date(2024, 2, 1)]
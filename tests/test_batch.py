@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from market_data.api import deps
+from market_data.api.deps import parse_series
+from market_data.api.main import create_app
+from market_data.config import settings
+from market_data.storage.postgres import group_rows_by_series
+from tests.helpers import FakeStorage, make_candle
+
+
+def _row(candle) -> tuple:
+    return (
+        candle.exchange, candle.symbol, candle.timeframe, candle.open_time, candle.close_time,
+        candle.open, candle.high, candle.low, candle.close, candle.volume,
+    )
+
+
+def test_parse_series() -> None:
+    assert parse_series(["BTCUSD:1h,ETHUSD:1m", "BTCUSD:1h"]) == [("BTCUSD", "1h"), ("ETHUSD", "1m")]
+    assert parse_series(["SOLUSD:4h"], ["BTCUSD", "ETHUSD"], ["1h,4h"]) == [
+        ("SOLUSD", "4h"), ("BTCUSD", "1h"), ("BTCUSD", "4h"), ("ETHUSD", "1h"), ("ETHUSD", "4h"),
+    ]
+    for args in ((["BTCUSD"],), (["BTCUSD:"],), (None, ["BTCUSD"]), (None, None, None), ([" , "],)):
+        with pytest.raises(HTTPException) as excinfo:
+            parse_series(*args)
+        assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException, match="Too many series"):
+        parse_series(None, ["BTCUSD", "ETHUSD"], ["1h", "4h"], max_series=3)
+
+
+def test_group_rows_by_series() -> None:
+    btc = [make_candle(h) for h in range(3)]
+    eth = [make_candle(h, symbol="ETHUSD") for h in range(2)]
+    # The LATERAL query returns each series newest first, series interleaved in any order.
+    rows = [_row(c) for c in (eth[1], btc[2], btc[1], eth[0], btc[0])]
+
+    grouped = group_rows_by_series([("XRPUSD", "1h"), ("BTCUSD", "1h"), ("ETHUSD", "1h")], rows)
+
+    assert list(grouped) == [("XRPUSD", "1h"), ("BTCUSD", "1h"), ("ETHUSD", "1h")]
+    assert grouped[("XRPUSD", "1h")] == []
+    assert grouped[("BTCUSD", "1h")] == btc
+    assert grouped[("ETHUSD", "1h")] == eth
+
+
+def test_batch_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    storage = FakeStorage([make_candle(h, symbol=s) for s in ("BTCUSD", "ETHUSD") for h in range(5)])
+    monkeypatch.setattr(deps, "_storage", storage)
+    monkeypatch.setattr(settings, "api_batch_max_series", 3)
+
+    with TestClient(create_app()) as client:
+        response = client.get("/candles/batch", params={"series": "ETHUSD:1h,XRPUSD:1h", "limit": 2})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 2
+        assert [(s["symbol"], s["count"]) for s in body["series"]] == [("ETHUSD", 2), ("XRPUSD", 0)]
+        assert [c["open_time"] for c in body["series"][0]["candles"]] == [
+            "2024-01-01T03:00:00+00:00", "2024-01-01T04:00:00+00:00",
+        ]
+
+        assert client.get("/candles/batch", params={"series": "BTCUSD"}).status_code == 400
+        too_many = client.get("/candles/batch", params={"symbols": "BTCUSD,ETHUSD", "timeframes": "1h,4h"})
+        assert too_many.status_code == 400
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from market_data.api.caching import http_date, is_closed_range, is_not_modified, make_etag
+
+
+def test_is_closed_range() -> None:
+    now = datetime(2024, 1, 1, 12, 30, tzinfo=UTC)
+
+    assert is_closed_range("1h", datetime(2024, 1, 1, 11, 30, tzinfo=UTC), now)
+    assert not is_closed_range("1h", datetime(2024, 1, 1, 12, 0, tzinfo=UTC), now)
+    assert not is_closed_range("1h", None, now)
+    assert not is_closed_range("7h", datetime(2020, 1, 1, tzinfo=UTC), now)
+
+
+def test_is_not_modified_etag() -> None:
+    etag = make_etag("bitfinex:BTCUSD:1h", 10)
+
+    assert is_not_modified(etag, None, etag, None)
+    assert is_not_modified(etag, None, f'"other", W/{etag}', None)
+    assert is_not_modified(etag, None, "*", None)
+    assert not is_not_modified(etag, None, '"other"', None)
+
+
+def test_is_not_modified_since() -> None:
+    etag = make_etag("x")
+    modified = datetime(2024, 1, 1, 0, 0, 0, 500000, tzinfo=UTC)
+
+    assert is_not_modified(etag, modified, None, http_date(modified))
+    assert not is_not_modified(etag, modified + timedelta(seconds=1), None, http_date(modified))
+    # If-None-Match wins over If-Modified-Since.
+    assert not is_not_modified(etag, modified, '"other"', http_date(modified))
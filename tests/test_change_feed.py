@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from market_data.services.change_feed import ChangeFeedRelay
+from market_data.services.realtime import CandleHub
+from market_data.storage.notify import CandleChange, summarize_changes
+from tests.helpers import T0, FakeStorage, make_candle
+
+
+def _candle(hour: int, symbol: str = "BTCUSD"):
+    return make_candle(hour, 100 + hour, symbol=symbol)
+
+
+def test_changes_are_summarized_per_series_and_round_trip() -> None:
+    changes = summarize_changes([_candle(3), _candle(1), _candle(2, "ETHUSD"), _candle(5)])
+
+    assert changes == [
+        CandleChange("bitfinex", "BTCUSD", "1h", T0 + timedelta(hours=1), T0 + timedelta(hours=5)),
+        CandleChange("bitfinex", "ETHUSD", "1h", T0 + timedelta(hours=2), T0 + timedelta(hours=2)),
+    ]
+    assert CandleChange.from_payload(changes[0].to_payload()) == changes[0]
+
+
+def test_relay_replays_small_changes_and_invalidates_large_ones() -> None:
+    storage = FakeStorage([_candle(h) for h in range(200)])
+    hub = CandleHub()
+    events: list[tuple[datetime, bool]] = []
+    hub.add_listener(lambda candle, closed: events.append((candle.open_time, closed)))
+    invalidated: list = []
+    relay = ChangeFeedRelay(storage, hub, invalidators=[invalidated.append], replay_max=10)
+
+    relay(CandleChange("bitfinex", "BTCUSD", "1h", T0 + timedelta(hours=198), T0 + timedelta(hours=199)))
+    relay(CandleChange("bitfinex", "BTCUSD", "1h", T0 + timedelta(hours=199), T0 + timedelta(hours=199)))
+
+    assert events == [(T0 + timedelta(hours=198), False), (T0 + timedelta(hours=198), True),
+                      (T0 + timedelta(hours=199), False)]
+
+    relay(CandleChange("bitfinex", "BTCUSD", "1h", T0, T0 + timedelta(hours=100)))
+    relay(None)
+
+    assert storage.calls["get_candles_after"] == 2
+    assert invalidated == [("bitfinex", "BTCUSD", "1h"), None]
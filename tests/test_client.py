@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from market_data.api import deps
+from market_data.api.main import create_app
+from market_data.client import SeriesMirror
+from market_data.types import Candle
+from tests.helpers import T0, make_candle
+
+
+class _ChangeLogStorage:
+    """Keeps (change_xid, updated_at, candle) rows and answers the keyset change query like the SQL does.
+
+    `begin()` starts a transaction whose rows stay invisible until `commit()`, and holds back
+    every row from its xid on, like `pg_snapshot_xmin` does.
+    """
+
+    def __init__(self) -> None:
+        self.rows: dict[datetime, tuple[int, datetime, Candle]] = {}
+        self.pending: dict[int, list[Candle]] = {}
+        self.next_xid = 100
+        self.clock = T0
+
+    def begin(self) -> int:
+        xid, self.next_xid = self.next_xid, self.next_xid + 1
+        self.pending[xid] = []
+        return xid
+
+    def commit(self, xid: int) -> None:
+        for candle in self.pending.pop(xid):
+            self.clock += timedelta(seconds=1)
+            self.rows[candle.open_time] = (xid, self.clock, candle)
+
+    def write(self, *candles: Candle) -> None:
+        xid = self.begin()
+        self.pending[xid].extend(candles)
+        self.commit(xid)
+
+    def get_candle_changes(self, exchange, symbol, timeframe, since=None, after_xid=None, after_open_time=None,
+                           limit=1000):
+        xmin = min(self.pending, default=self.next_xid)
+        rows = sorted((r for r in self.rows.values() if r[0] < xmin), key=lambda r: (r[0], r[2].open_time))
+        if after_xid is not None and after_open_time:
+            rows = [r for r in rows if (r[0], r[2].open_time) > (after_xid, after_open_time)]
+        elif since:
+            rows = [r for r in rows if r[1] >= since]
+        return rows[:limit]
+
+
+def test_mirror_syncs_only_changes(tmp_path, monkeypatch) -> None:
+    storage = _ChangeLogStorage()
+    monkeypatch.setattr(deps, "_storage", storage)
+    storage.write(*[make_candle(h, "5") for h in range(5)])
+    cache = tmp_path / "mirror.json"
+
+    with TestClient(create_app()) as http:
+        mirror = SeriesMirror("http://testserver", "BTCUSD", "1h", cache, page_size=2, client=http)
+        assert mirror.sync() == 5
+        assert mirror.sync() == 0
+
+        storage.write(make_candle(4, "6"), make_candle(5, "7"))
+        resumed = SeriesMirror("http://testserver", "BTCUSD", "1h", cache, client=http)
+        assert resumed.sync() == 2
+
+    candles = resumed.candles()
+    assert [c.open_time.hour for c in candles] == [0, 1, 2, 3, 4, 5]
+    assert [c.close for c in candles[-2:]] == [Decimal("6"), Decimal("7")]
+
+
+def test_mirror_never_skips_a_late_committing_write(tmp_path, monkeypatch) -> None:
+    storage = _ChangeLogStorage()
+    monkeypatch.setattr(deps, "_storage", storage)
+    storage.write(make_candle(0, "5"))
+
+    with TestClient(create_app()) as http:
+        mirror = SeriesMirror("http://testserver", "BTCUSD", "1h", tmp_path / "mirror.json", client=http)
+        assert mirror.sync() == 1
+
+        # A long batch starts first but commits after a later, short one.
+        slow = storage.begin()
+        storage.pending[slow].append(make_candle(1, "6"))
+        storage.write(make_candle(2, "7"))
+        assert mirror.sync() == 0  # held back behind the in-flight transaction
+        storage.commit(slow)
+        assert mirror.sync() == 2
+
+    assert [c.close for c in mirror.candles()] == [Decimal("5"), Decimal("6"), Decimal("7")]
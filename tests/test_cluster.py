@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+
+from market_data.cluster import (
+    LEADER_LEASE,
+    ClusterCoordinator,
+    partition_lease,
+    partition_owner,
+    series_partition,
+)
+from market_data.daemon import MarketDataDaemon
+
+
+class FakeClusterStorage:
+    """In-memory cluster_nodes / cluster_leases with a manual clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.down = False
+        self.nodes: dict[str, float] = {}
+        self.leases: dict[str, tuple[str, float]] = {}
+
+    def heartbeat_cluster_node(self, node_id, host, ttl_seconds):
+        if self.down:
+            raise ConnectionError("database unreachable")
+        self.nodes[node_id] = self.now
+        self.nodes = {n: t for n, t in self.nodes.items() if t >= self.now - ttl_seconds}
+        return sorted(self.nodes)
+
+    def acquire_leases(self, names, node_id, ttl_seconds):
+        held = set()
+        for name in names:
+            owner = self.leases.get(name)
+            if owner is None or owner[0] == node_id or owner[1] < self.now:
+                self.leases[name] = (node_id, self.now + ttl_seconds)
+                held.add(name)
+        return held
+
+    def release_leases(self, names, node_id):
+        for name in names:
+            if self.leases.get(name, (None,))[0] == node_id:
+                del self.leases[name]
+
+    def remove_cluster_node(self, node_id):
+        self.nodes.pop(node_id, None)
+        self.leases = {k: v for k, v in self.leases.items() if v[0] != node_id}
+
+
+def _node(storage: FakeClusterStorage, node_id: str) -> ClusterCoordinator:
+    return ClusterCoordinator(storage, node_id=node_id, partitions=16, lease_seconds=30)
+
+
+def test_partitioning_is_stable_and_minimal_on_join() -> None:
+    assert series_partition("bitfinex", "BTCUSD", "1h", 64) == series_partition("bitfinex", "BTCUSD", "1h", 64)
+
+    before = {p: partition_owner(p, ["a", "b"]) for p in range(64)}
+    after = {p: partition_owner(p, ["a", "b", "c"]) for p in range(64)}
+    moved = [p for p in range(64) if before[p] != after[p]]
+    assert moved and all(after[p] == "c" for p in moved)
+    assert partition_owner(0, []) is None
+
+
+def test_nodes_split_partitions_and_elect_one_leader() -> None:
+    storage = FakeClusterStorage()
+    a, b = _node(storage, "a"), _node(storage, "b")
+
+    a.tick()
+    assert a.owned_partitions() == frozenset(range(16)) and a.is_leader
+
+    # b joins: a releases b's share on its next tick, b takes it on the following one.
+    b.tick()
+    a.tick()
+    gained, lost = b.tick()
+    assert gained and not lost
+    assert a.owned_partitions() | b.owned_partitions() == frozenset(range(16))
+    assert not a.owned_partitions() & b.owned_partitions()
+    assert a.is_leader and not b.is_leader
+    assert storage.leases[LEADER_LEASE][0] == "a"
+
+
+def test_dead_node_partitions_are_taken_over_after_lease_expiry() -> None:
+    storage = FakeClusterStorage()
+    a, b = _node(storage, "a"), _node(storage, "b")
+    for node in (a, b, a, b):
+        node.tick()
+    a_share = a.owned_partitions()
+    assert a_share
+
+    # a stops heartbeating; its leases are still valid for a while.
+    storage.now = 20
+    b.tick()
+    assert not b.owned_partitions() & a_share
+
+    storage.now = 40
+    gained, _ = b.tick()
+    assert gained == set(a_share)
+    assert b.owned_partitions() == frozenset(range(16)) and b.is_leader
+
+
+def test_leave_hands_off_immediately() -> None:
+    storage = FakeClusterStorage()
+    a, b = _node(storage, "a"), _node(storage, "b")
+    for node in (a, b, a, b):
+        node.tick()
+
+    a.leave()
+    assert a.owned_partitions() == frozenset() and not a.is_leader
+    b.tick()
+    assert b.owned_partitions() == frozenset(range(16))
+    assert all(storage.leases[partition_lease(p)][0] == "b" for p in range(16))
+
+
+def test_cut_off_daemon_stops_ingesting_once_leases_lapse() -> None:
+    storage = FakeClusterStorage()
+    daemon = MarketDataDaemon()
+    daemon.cluster = ClusterCoordinator(storage, node_id="a", partitions=16, lease_seconds=0.15)
+    daemon.cluster.tick()
+    assert daemon._owned_series()
+
+    async def scenario() -> None:
+        daemon._running = True
+        storage.down = True
+        loop = asyncio.create_task(daemon.run_cluster_loop())
+        try:
+            await asyncio.wait_for(daemon._ownership_changed.wait(), timeout=2)
+        finally:
+            daemon._running = False
+            await loop
+
+    asyncio.run(scenario())
+    assert daemon._owned_series() == []
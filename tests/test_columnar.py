@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import struct
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from market_data.services.gap_repair import GapRepairService
+from market_data.storage.columnar import parse_binary_copy, select_list
+
+HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+TRAILER = struct.pack(">h", -1)
+FIELDS = [("open_time", ">i8"), ("close", ">f8")]
+
+
+def _tuple(open_ms: int, close: float) -> bytes:
+    return struct.pack(">hiqid", 2, 8, open_ms, 8, close)
+
+
+def test_parse_binary_copy() -> None:
+    data = HEADER + _tuple(1_700_000_000_000, 1.5) + _tuple(1_700_003_600_000, -2.25) + TRAILER
+
+    columns = parse_binary_copy(data, FIELDS)
+
+    assert columns["open_time"].dtype == np.int64
+    assert columns["open_time"].tolist() == [1_700_000_000_000, 1_700_003_600_000]
+    assert columns["close"].tolist() == [1.5, -2.25]
+    assert parse_binary_copy(HEADER + TRAILER, FIELDS)["close"].size == 0
+
+
+def test_parse_binary_copy_rejects_nulls() -> None:
+    null_close = struct.pack(">hiqi", 2, 8, 1_700_000_000_000, -1) + b"\0" * 8
+
+    with pytest.raises(ValueError):
+        parse_binary_copy(HEADER + null_close + TRAILER, FIELDS)
+    with pytest.raises(ValueError):
+        parse_binary_copy(b"not a copy stream", FIELDS)
+
+
+def test_select_list_qualifies_alias() -> None:
+    assert select_list(["open_time", "close"], alias="l") == (
+        "(EXTRACT(EPOCH FROM l.open_time) * 1000)::int8, l.close::float8"
+    )
+
+
+class _ColumnStorage:
+    def __init__(self, open_times: list[datetime], delta: timedelta):
+        self.open_ms = np.array([int(t.timestamp() * 1000) for t in open_times], dtype=np.int64)
+        self.delta_ms = int(delta / timedelta(milliseconds=1))
+
+    def get_candle_columns(self, exchange, symbol, timeframe, start=None, end=None, columns=()):
+        return {"open_time": self.open_ms, "close_time": self.open_ms + self.delta_ms}
+
+
+def test_gap_detection_on_columns() -> None:
+    t0 = datetime(2024, 1, 1, tzinfo=UTC)
+    hours = [0, 1, 2, 5, 6, 9]
+    storage = _ColumnStorage([t0 + timedelta(hours=h) for h in hours], timedelta(hours=1))
+    service = GapRepairService(storage, exchange=object())
+
+    gaps = service.detect_gaps("bitfinex", "BTCUSD", "1h", start=t0, end=t0 + timedelta(days=1))
+
+    assert [(g.gap_start, g.gap_end) for g in gaps] == [
+        (t0 + timedelta(hours=3), t0 + timedelta(hours=5)),
+        (t0 + timedelta(hours=7), t0 + timedelta(hours=9)),
+    ]
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import HTTPException
+
+from market_data.api.cursor import Cursor, decode_cursor, encode_cursor, series_key
+
+
+def test_cursor_round_trip() -> None:
+    key = series_key("bitfinex", "BTCUSD", "1h")
+    cursor = Cursor(key, datetime(2024, 1, 2, 3, 0, 0, 123456, tzinfo=UTC), "backward")
+
+    token = encode_cursor(cursor)
+
+    assert "=" not in token
+    assert decode_cursor(token, key) == cursor
+
+
+def test_cursor_rejects_other_series() -> None:
+    token = encode_cursor(Cursor(series_key("bitfinex", "BTCUSD", "1h"), datetime(2024, 1, 1, tzinfo=UTC), "forward"))
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token, series_key("bitfinex", "ETHUSD", "1h"))
+    assert exc.value.status_code == 400
+
+
+def test_cursor_rejects_garbage() -> None:
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor", series_key("bitfinex", "BTCUSD", "1h"))
+    assert exc.value.status_code == 400
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from market_data.executors import BoundedExecutor
+
+
+async def test_queue_limit_applies_backpressure() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        calls = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        stats = executor.get_stats()
+        assert stats["running"] == 1
+        # One call queued in the pool, one waiting for a queue slot.
+        assert stats["queue_depth"] == 2
+
+        release.set()
+        assert await asyncio.gather(*calls) == [True, True, True]
+        stats = executor.get_stats()
+        assert stats["completed"] == 3 and stats["queue_depth"] == 0 and stats["running"] == 0
+        assert stats["wait_seconds_max"] >= 0.04
+    finally:
+        executor.shutdown()
+
+
+async def test_failures_are_counted_and_raised() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+
+    def boom() -> None:
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        assert executor.get_stats()["failed"] == 1
+    finally:
+        executor.shutdown()
+
+
+async def test_separate_pools_do_not_starve_each_other() -> None:
+    slow = BoundedExecutor("slow", max_workers=1, max_queue=0)
+    fast = BoundedExecutor("fast", max_workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        blocked = asyncio.create_task(slow.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        assert await asyncio.wait_for(fast.run(lambda: "saved"), 1) == "saved"
+        release.set()
+        await blocked
+    finally:
+        slow.shutdown()
+        fast.shutdown()
+
+
+async def test_cancelled_waiter_leaves_queue() -> None:
+    executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(executor.run(release.wait, 5))
+        waiting = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.02)
+        assert executor.get_stats()["queue_depth"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert executor.get_stats()["queue_depth"] == 0
+        release.set()
+        await running
+    finally:
+        executor.shutdown()
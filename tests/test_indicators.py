@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from market_data import indicators
+from market_data.services.indicators import IndicatorService
+from market_data.services.realtime import CandleHub
+from tests.helpers import FakeStorage, make_candle
+
+
+def _series(n: int) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    volume = rng.random(n) * 10
+    open_time_s = 1_700_000_000 + np.arange(n) * 3600
+    return open_time_s, high, low, close, volume
+
+
+def test_vectorised_ema_matches_recursive_definition() -> None:
+    _, _, _, close, _ = _series(500)
+    expected = [np.mean(close[:26])]
+    for x in close[26:]:
+        expected.append(expected[-1] + 2 / 27 * (x - expected[-1]))
+
+    assert np.allclose(indicators.ema(close, 26)[25:], expected)
+
+
+def test_streaming_state_matches_vectorised_batch() -> None:
+    t, high, low, close, volume = _series(600)
+
+    state = indicators.IndicatorState.from_arrays(t[:350], high[:350], low[:350], close[:350], volume[:350])
+    for i in range(350, 600):
+        state.update(int(t[i]), float(high[i]), float(low[i]), float(close[i]), float(volume[i]))
+    values = state.values()
+
+    line, signal, _ = indicators.macd(close)
+    mid, upper, _ = indicators.bollinger(close)
+    assert values["rsi"] == pytest.approx(indicators.rsi(close)[-1])
+    assert values["macd"]["macd"] == pytest.approx(line[-1])
+    assert values["macd"]["signal"] == pytest.approx(signal[-1])
+    assert values["atr"] == pytest.approx(indicators.atr(high, low, close)[-1])
+    assert values["bollinger"]["middle"] == pytest.approx(mid[-1])
+    assert values["bollinger"]["upper"] == pytest.approx(upper[-1])
+    assert values["vwap"] == pytest.approx(indicators.vwap(t, high, low, close, volume)[-1])
+
+
+def test_short_history_reports_none_while_warming_up() -> None:
+    t, high, low, close, volume = _series(10)
+
+    values = indicators.IndicatorState.from_arrays(t, high, low, close, volume).values()
+
+    assert values["rsi"] is None
+    assert values["macd"]["macd"] is None
+    assert values["bollinger"]["middle"] is None
+    assert values["vwap"] is not None
+
+
+def _candle(open_time: datetime, close: float):
+    return make_candle(open_time, close, high=close + 1, low=close - 1, volume="5")
+
+
+def test_service_updates_incrementally_from_hub_events() -> None:
+    now = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    history = [_candle(now - timedelta(hours=50 - i), 100 + i) for i in range(50)]
+    storage = FakeStorage(history)
+    hub = CandleHub()
+    service = IndicatorService(storage, hub)
+
+    first = service.latest("bitfinex", [("BTCUSD", "1h")])[("BTCUSD", "1h")]
+    hub.publish([_candle(now, 151)])
+    hub.publish([_candle(now, 152)])
+    second = service.latest("bitfinex", [("BTCUSD", "1h")])[("BTCUSD", "1h")]
+
+    assert storage.calls["get_candle_columns_batch"] == 1
+    assert first["closed"] is True
+    assert second["closed"] is False
+    assert second["close"] == 152
+    assert service.get_stats()["incremental_updates"] == 0
+
+    hub.publish([_candle(now + timedelta(hours=1), 153)])
+    assert service.get_stats()["incremental_updates"] == 1
+
+    # A skipped period invalidates the cached state instead of folding in wrong data.
+    hub.publish([_candle(now + timedelta(hours=3), 154)])
+    assert service.get_stats()["invalidations"] == 1
+
+
+def test_minute_vwap_is_seeded_from_the_whole_day(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = datetime(2024, 1, 2, 12, 0, 30, tzinfo=UTC)
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr("market_data.services.indicators.datetime", _Clock)
+    start = datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+    history = [
+        make_candle(start + timedelta(minutes=i), 100 + i % 7, timeframe="1m", volume=1 + i % 3)
+        for i in range(24 * 60 + 1)
+    ]
+    storage = FakeStorage(history)
+    service = IndicatorService(storage, CandleHub())
+
+    values = service.latest("bitfinex", [("BTCUSD", "1m")])[("BTCUSD", "1m")]
+
+    today = [c for c in history if c.open_time >= datetime(2024, 1, 2, tzinfo=UTC)]
+    assert len(today) == 12 * 60 + 1  # more than SEED_CANDLES, including the open candle
+    typical = sum(float(c.high + c.low + c.close) / 3 * float(c.volume) for c in today)
+    assert values["closed"] is False
+    assert values["vwap"] == pytest.approx(typical / sum(float(c.volume) for c in today))
+
+
+class _SlowStorage(FakeStorage):
+    """Blocks the seeding read until released, to interleave hub events and other requests."""
+
+    def __init__(self, candles):
+        super().__init__(candles)
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def get_candle_columns_batch(self, exchange, series, limit=100):
+        self.reading.set()
+        self.release.wait(5)
+        return super().get_candle_columns_batch(exchange, series, limit)
+
+
+def test_concurrent_cold_requests_share_one_seed_and_keep_events() -> None:
+    now = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    storage = _SlowStorage([_candle(now - timedelta(hours=50 - i), 100 + i) for i in range(50)])
+    hub = CandleHub()
+    service = IndicatorService(storage, hub)
+    results: list = []
+
+    def request() -> None:
+        results.append(service.latest("bitfinex", [("BTCUSD", "1h")])[("BTCUSD", "1h")])
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    threads[0].start()
+    assert storage.reading.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    hub.publish([_candle(now, 151)])  # arrives while the seed query runs
+    storage.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert storage.calls["get_candle_columns_batch"] == 1
+    assert len(results) == 3
+    assert all(r["closed"] is False and r["close"] == 151 for r in results)
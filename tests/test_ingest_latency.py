@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from market_data.services.ingest_latency import IngestLatencyTracker, parse_slo_overrides
+from tests.helpers import make_candle
+
+NOW = datetime(2024, 1, 1, 12, 0, tzinfo=UTC)
+
+
+def _candle(symbol: str, timeframe: str, open_time: datetime, received_at: float | None):
+    return make_candle(open_time, symbol=symbol, timeframe=timeframe, received_at=received_at)
+
+
+def test_parse_slo_overrides() -> None:
+    assert parse_slo_overrides("BTCUSD:1m=500/90, ETHUSD:1h=/7500,") == {
+        ("BTCUSD", "1m"): (0.5, 90.0),
+        ("ETHUSD", "1h"): (None, 7500.0),
+    }
+    with pytest.raises(ValueError):
+        parse_slo_overrides("BTCUSD=500")
+
+
+def test_received_at_does_not_affect_equality() -> None:
+    assert _candle("BTCUSD", "1m", NOW, 1.0) == _candle("BTCUSD", "1m", NOW, 2.0)
+
+
+def test_stage_latencies_and_percentiles() -> None:
+    tracker = IngestLatencyTracker(window=100, latency_slo_ms=0, freshness_slo_factor=0, overrides="")
+    batch = [(_candle("BTCUSD", "1m", NOW, 100.0 + i * 0.01), 100.1 + i * 0.01) for i in range(10)]
+    tracker.record_batch(batch, flush_started=101.0, committed=101.05)
+
+    [row] = tracker.get_latency(now=NOW + timedelta(seconds=30))
+    assert row["symbol"] == "BTCUSD" and row["updates"] == 10
+    assert row["stages"]["enqueue"]["p50_ms"] == pytest.approx(100.0)
+    assert row["stages"]["write"]["max_ms"] == pytest.approx(50.0)
+    assert row["stages"]["total"]["max_ms"] == pytest.approx(1050.0)
+    assert row["stages"]["queue"]["p99_ms"] < row["stages"]["queue"]["max_ms"] + 1e-9
+    assert row["freshness_seconds"] == 30.0
+    assert row["slo"] == {"latency_p99_ms": None, "freshness_seconds": None, "breached": []}
+
+
+def test_slo_breach_and_recovery() -> None:
+    tracker = IngestLatencyTracker(window=4, latency_slo_ms=1000, freshness_slo_factor=2, overrides="ETHUSD:1m=200/")
+    tracker.record_batch([(_candle("BTCUSD", "1m", NOW, 10.0), 10.0)], flush_started=10.0, committed=10.5)
+    tracker.record_batch([(_candle("ETHUSD", "1m", NOW, 10.0), 10.0)], flush_started=10.0, committed=10.5)
+
+    breaches = tracker.check_slos(now=NOW + timedelta(seconds=60))
+    assert [(key[1], name) for key, name, _, _ in breaches] == [("ETHUSD", "latency")]
+
+    # Stale series: newest open_time more than two periods ago.
+    breaches = tracker.check_slos(now=NOW + timedelta(minutes=3))
+    assert {(key[1], name) for key, name, _, _ in breaches} == {
+        ("ETHUSD", "latency"), ("BTCUSD", "freshness"), ("ETHUSD", "freshness")
+    }
+    [btc] = [row for row in tracker.get_latency() if row["symbol"] == "BTCUSD"]
+    assert btc["slo"]["breached"] == ["freshness"]
+
+    # Fast updates push the slow sample out of the window; a new candle restores freshness.
+    for _ in range(4):
+        tracker.record_batch(
+            [(_candle("ETHUSD", "1m", NOW + timedelta(minutes=3), 20.0), 20.0)], flush_started=20.0, committed=20.05
+        )
+    breaches = tracker.check_slos(now=NOW + timedelta(minutes=3, seconds=5))
+    assert {(key[1], name) for key, name, _, _ in breaches} == {("BTCUSD", "freshness")}
+
+    tracker.retain([("ETHUSD", "1m")])
+    assert [row["symbol"] for row in tracker.get_latency()] == ["ETHUSD"]
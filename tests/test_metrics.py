@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import urllib.request
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from market_data.api.metrics import RequestMetricsMiddleware
+from market_data.metrics import API_REQUEST_SECONDS, MetricsRegistry, render_metrics, start_metrics_server
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    messages = registry.counter("test_messages_total", "Messages", ["kind"])
+    depth = registry.gauge("test_depth", "Depth")
+    latency = registry.histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+
+    messages.labels("update").inc()
+    messages.labels("update").inc(2)
+    messages.labels('say "hi"').inc()
+    depth.set_function(lambda: 7)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE test_messages_total counter" in text
+    assert 'test_messages_total{kind="update"} 3' in text
+    assert 'test_messages_total{kind="say \\"hi\\""} 1' in text
+    assert "test_depth 7" in text
+    assert 'test_seconds_bucket{le="0.1"} 2' in text
+    assert 'test_seconds_bucket{le="1"} 3' in text
+    assert 'test_seconds_bucket{le="+Inf"} 4' in text
+    assert "test_seconds_sum 3.65" in text
+    assert "test_seconds_count 4" in text
+
+    with pytest.raises(ValueError):
+        messages.labels()
+    with pytest.raises(ValueError):
+        registry.counter("test_depth", "Duplicate")
+
+
+def test_api_latency_is_labelled_by_route_template() -> None:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in (1, 2):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/nope").status_code == 404
+
+    counts, total = API_REQUEST_SECONDS.labels("GET", "/items/{item_id}", 200).snapshot()
+    assert sum(counts) == 2 and total > 0
+    assert sum(API_REQUEST_SECONDS.labels("GET", "unmatched", 404).snapshot()[0]) >= 1
+    assert 'route="/items/{item_id}"' in render_metrics()
+
+
+def test_metrics_server() -> None:
+    server = start_metrics_server(0, "127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert b"market_data_ws_messages_total" in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
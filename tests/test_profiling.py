@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from market_data.api.routes.admin import router as admin_router
+from market_data.config import settings
+from market_data.profiling import MemoryProfiler, collapsed, dump_tasks, register_loop, sample_stacks
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_sees_busy_thread() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks, samples = sample_stacks(0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert samples > 5
+    spinner = [stack for stack in stacks if stack.startswith("spinner;")]
+    assert spinner and all("_spin (test_profiling.py:" in stack for stack in spinner)
+    line = collapsed(stacks).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_memory_snapshot_diff() -> None:
+    profiler = MemoryProfiler()
+    profiler.start(frames=5)
+    try:
+        assert "top" in profiler.snapshot(limit=5)
+        hoard = [bytearray(1024) for _ in range(2000)]
+        result = profiler.snapshot(limit=5)
+        assert result["diff"][0]["size_diff_bytes"] >= 2000 * 1024
+        assert result["diff"][0]["file"].endswith("test_profiling.py")
+        del hoard
+    finally:
+        profiler.stop()
+    with pytest.raises(RuntimeError):
+        profiler.snapshot()
+
+
+async def test_dump_tasks_lists_registered_loop() -> None:
+    register_loop("test")
+
+    async def parked() -> None:
+        await asyncio.sleep(10)
+
+    task = asyncio.create_task(parked(), name="parked-task")
+    await asyncio.sleep(0)
+    try:
+        tasks = await asyncio.to_thread(dump_tasks)
+        [entry] = [t for t in tasks["test"] if t["name"] == "parked-task"]
+        assert entry["coro"].endswith("parked") and "in parked" in entry["stack"][0]
+    finally:
+        task.cancel()
+
+
+def test_admin_routes_require_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = FastAPI()
+    app.include_router(admin_router, prefix="/admin")
+    client = TestClient(app)
+
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.get("/admin/tasks").status_code == 404
+
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert client.get("/admin/tasks").status_code == 401
+    assert client.get("/admin/tasks", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/admin/tasks", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    response = client.get("/admin/profile/cpu?seconds=0.05", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200 and int(response.headers["X-Profile-Samples"]) > 0
+    assert client.get("/admin/profile/memory", headers={"X-Admin-Token": "s3cret"}).status_code == 409
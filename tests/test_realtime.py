@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from market_data.api import deps
+from market_data.api.main import create_app
+from market_data.services.realtime import CandleHub
+from tests.helpers import FakeStorage, make_candle
+
+KEY = ("bitfinex", "BTCUSD", "1h")
+
+
+async def test_hub_conflates_live_updates_and_reports_closed() -> None:
+    hub = CandleHub()
+    sub = hub.subscribe([KEY])
+
+    for close in ("1.1", "1.2", "1.3"):
+        hub.publish([make_candle(0, close)])
+    hub.publish([make_candle(1, "1.4")])
+
+    events = await sub.get()
+
+    assert [(e["closed"], e["candle"]["close"]) for e in events] == [(True, "1.3"), (False, "1.4")]
+    assert sub.conflated == 3
+
+
+async def test_hub_closed_only_and_filtering() -> None:
+    hub = CandleHub()
+    closed_sub = hub.subscribe([KEY], closed_only=True)
+    other_sub = hub.subscribe([("bitfinex", "ETHUSD", "1h")])
+
+    hub.publish([make_candle(0, "1.1")])
+    hub.publish([make_candle(0, "1.1")])  # exact repeat is dropped
+    hub.publish([make_candle(1, "1.2")])
+
+    events = await closed_sub.get()
+
+    assert [(e["closed"], e["candle"]["open_time"]) for e in events] == [(True, "2024-01-01T00:00:00+00:00")]
+    assert hub.get_stats()["duplicates_dropped"] == 1
+    assert other_sub.delivered == 0
+
+
+def test_ws_reports_malformed_frames_and_stays_open(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deps, "_storage", FakeStorage())
+
+    with TestClient(create_app()) as client, client.websocket_connect("/stream/ws") as ws:
+        ws.send_text("{not json")
+        assert ws.receive_json() == {"type": "error", "detail": "Expected a JSON text message"}
+        ws.send_json({"op": "subscribe", "series": ["BTCUSD:1h"]})
+        assert ws.receive_json() == {"type": "subscribed", "series": ["bitfinex:BTCUSD:1h"]}
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from market_data.api.recording import TraceRecordingMiddleware, TraceWriter
+
+
+def _app(path: Path, sample_rate: float = 1.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/candles/{kind}")
+    def candles(kind: str, limit: int = 100):
+        return {"kind": kind, "limit": limit}
+
+    @app.get("/metrics")
+    def metrics():
+        return "ok"
+
+    app.add_middleware(TraceRecordingMiddleware, path=str(path), sample_rate=sample_rate)
+    return app
+
+
+def _flush(client: TestClient) -> None:
+    layer = client.app.middleware_stack
+    while not isinstance(layer, TraceRecordingMiddleware):
+        layer = layer.app
+    layer.writer.close()
+
+
+def test_records_route_params_and_timing(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    with TestClient(_app(path)) as client:
+        assert client.get("/candles/latest", params={"symbol": "BTCUSD", "limit": 5}).status_code == 200
+        assert client.get("/candles/latest", params={"limit": "x"}).status_code == 422
+        client.get("/missing")
+        client.get("/metrics")
+        _flush(client)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["route"], r["path"], r["status"]) for r in records] == [
+        ("/candles/{kind}", "/candles/latest", 200),
+        ("/candles/{kind}", "/candles/latest", 422),
+        ("unmatched", "/missing", 404),
+    ]
+    first = records[0]
+    assert first["method"] == "GET" and first["query"] == "symbol=BTCUSD&limit=5"
+    assert first["ms"] >= 0 and first["bytes"] == len(b'{"kind":"latest","limit":5}') and first["t"] > 0
+
+
+def test_sampling_and_batched_writes(tmp_path: Path) -> None:
+    path = tmp_path / "trace.jsonl"
+    with TestClient(_app(path, sample_rate=0.0)) as client:
+        client.get("/candles/latest")
+        _flush(client)
+    assert path.read_text() == ""
+
+    writer = TraceWriter(str(tmp_path / "batched.jsonl"), flush_lines=3, flush_seconds=3600)
+    writer.write({"n": 1})
+    writer.write({"n": 2})
+    assert Path(writer.path).read_text() == ""
+    writer.write({"n": 3})
+    writer.write({"n": 4})
+    assert Path(writer.path).read_text().splitlines() == ['{"n":1}', '{"n":2}', '{"n":3}']
+    writer.close()
+    writer.write({"n": 5})  # dropped after close
+    assert [json.loads(line)["n"] for line in Path(writer.path).read_text().splitlines()] == [1, 2, 3, 4]
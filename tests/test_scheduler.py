@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from market_data.scheduler import RestWorkScheduler, WorkUnit, split_pages
+from tests.helpers import make_candle
+
+HOUR = timedelta(hours=1)
+OLD = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+class FakeExchange:
+    """Records request order; the first request blocks until `release` is set."""
+
+    page_size = 2
+
+    def __init__(self):
+        self.calls: list[tuple] = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def _wait(self) -> None:
+        self.started.set()
+        assert self.release.wait(5)
+
+    def fetch_candle_page(self, symbol, timeframe, start, end):
+        self._wait()
+        self.calls.append((symbol, start))
+        candles = []
+        while start < end and len(candles) < self.page_size:
+            candles.append(make_candle(start, symbol=symbol))
+            start += HOUR
+        return candles
+
+    def fetch_latest_candles(self, symbol, timeframe, limit=100):
+        self._wait()
+        self.calls.append((symbol, "latest"))
+        return [make_candle(datetime.now(UTC).replace(minute=0, second=0, microsecond=0), symbol=symbol)]
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = RestWorkScheduler(aging_seconds=60, recent_window=timedelta(hours=1))
+    yield scheduler
+    scheduler.stop()
+
+
+def test_split_pages() -> None:
+    pages = split_pages(OLD, OLD + 5 * HOUR, "1h", page_size=2)
+    assert pages == [(OLD, OLD + 2 * HOUR), (OLD + 2 * HOUR, OLD + 4 * HOUR), (OLD + 4 * HOUR, OLD + 5 * HOUR)]
+    assert split_pages(OLD, OLD, "1h", page_size=2) == []
+
+
+def test_recent_work_preempts_backfill_between_pages(scheduler: RestWorkScheduler) -> None:
+    exchange = FakeExchange()
+    backfill = scheduler.submit(WorkUnit(exchange, "BTCUSD", "1h", "backfill", OLD, OLD + 6 * HOUR))
+    assert exchange.started.wait(5)  # first backfill page is in flight
+
+    catchup = scheduler.submit(WorkUnit(exchange, "ETHUSD", "1h", "catchup", limit=10))
+    gap = scheduler.submit(WorkUnit(exchange, "SOLUSD", "1h", "gap_repair", OLD, OLD + HOUR))
+    exchange.release.set()
+
+    candles = backfill.result(timeout=5)
+    assert [c.open_time for c in candles] == [OLD + i * HOUR for i in range(6)]
+    assert len(catchup.result(timeout=5)) == 1
+    gap.result(timeout=5)
+
+    assert [call[0] for call in exchange.calls] == ["BTCUSD", "ETHUSD", "SOLUSD", "BTCUSD", "BTCUSD"]
+    stats = scheduler.get_stats()
+    assert stats["dispatched"] == {"backfill": 3, "catchup": 1, "gap_repair": 1}
+    assert stats["queued"] == {}
+
+
+def test_aged_work_is_not_starved() -> None:
+    scheduler = RestWorkScheduler(aging_seconds=0.01, recent_window=timedelta(hours=1))
+    try:
+        exchange = FakeExchange()
+        blocker = scheduler.submit(WorkUnit(exchange, "BLOCK", "1h", "catchup", limit=1))
+        assert exchange.started.wait(5)
+
+        backfill = scheduler.submit(WorkUnit(exchange, "BTCUSD", "1h", "backfill", OLD, OLD + HOUR))
+        time.sleep(0.1)  # longer than 3 priority levels of aging
+        catchup = scheduler.submit(WorkUnit(exchange, "ETHUSD", "1h", "catchup", limit=1))
+        exchange.release.set()
+
+        for future in (blocker, backfill, catchup):
+            future.result(timeout=5)
+        assert [call[0] for call in exchange.calls] == ["BLOCK", "BTCUSD", "ETHUSD"]
+    finally:
+        scheduler.stop()
+
+
+def test_failed_request_fails_its_unit(scheduler: RestWorkScheduler) -> None:
+    class Failing(FakeExchange):
+        def fetch_candle_page(self, symbol, timeframe, start, end):
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        scheduler.fetch_range(Failing(), "BTCUSD", "1h", OLD, OLD + HOUR, kind="backfill")
+    assert scheduler.get_stats()["failed"] == 1
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+from market_data.api.serialization import candle_row, render_candles
+from market_data.types import Candle
+
+
+def _candles() -> list[Candle]:
+    tz = timezone(timedelta(hours=2))
+    values = [Decimal("0E-8"), Decimal("42000.12345678"), Decimal("1E+3"), Decimal("-0.5"), Decimal("123456789012.1")]
+    return [
+        Candle("bitfinex", "BTCUSD", "1h", datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 1, 1, 1, tzinfo=UTC),
+               *values),
+        Candle("bitfinex", "tTEST:ÜSD\"\\", "1m", datetime(2024, 1, 1, 0, 0, 0, 123456, tzinfo=tz),
+               datetime(2024, 1, 1, 0, 1), *reversed(values)),
+        # Same instant as the first open_time, different offset: must not share its rendering.
+        Candle("bitfinex", "BTCUSD", "1h", datetime(2024, 1, 1, 2, tzinfo=tz), datetime(2024, 1, 1, 3, tzinfo=tz),
+               *values),
+    ]
+
+
+def test_render_matches_json_response_bytes() -> None:
+    candles = _candles()
+    payload = {
+        "exchange": "bitfinex",
+        "symbol": "tTEST:ÜSD",
+        "count": len(candles),
+        "candles": None,
+        "has_more": True,
+        "next_cursor": None,
+    }
+
+    expected = JSONResponse({**payload, "candles": [c.to_dict() for c in candles]}).body
+
+    assert render_candles(payload, [candle_row(c) for c in candles]) == expected
+    assert render_candles({**payload, "count": 0}, []) == JSONResponse({**payload, "count": 0, "candles": []}).body
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from market_data.exchanges.bitfinex import BitfinexAdapter
+from market_data.exchanges.bitfinex_ws import parse_ws_candle
+from market_data.rate_limiter import get_rate_limiter
+from market_data.simulator import SimulatorConfig, create_simulator_app
+
+NOW = datetime(2024, 3, 1, 12, 30, 15, tzinfo=UTC)
+MINUTE_MS = 60_000
+
+
+def _client(**config) -> TestClient:
+    return TestClient(create_simulator_app(SimulatorConfig(**config), clock=NOW.timestamp))
+
+
+def _hist(client: TestClient, **params) -> list[list]:
+    response = client.get("/v2/candles/trade:1m:tBTCUSD/hist", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_hist_sort_limit_and_determinism() -> None:
+    client = _client()
+    now_ms = int(NOW.timestamp() * 1000)
+
+    newest = _hist(client, limit=3)
+    assert [row[0] for row in newest] == [now_ms // MINUTE_MS * MINUTE_MS - i * MINUTE_MS for i in range(3)]
+    for _, open_, close, high, low, volume in newest:
+        assert low <= min(open_, close) <= max(open_, close) <= high and volume > 0
+
+    start = now_ms // MINUTE_MS * MINUTE_MS - 10 * MINUTE_MS
+    oldest = _hist(client, start=start, end=now_ms, limit=4, sort=1)
+    assert [row[0] for row in oldest] == [start + i * MINUTE_MS for i in range(4)]
+    assert oldest == _hist(client, start=start, end=now_ms, limit=4, sort=1)
+    # Closed candles are the same whatever page they are served in.
+    assert oldest[-1] in _hist(client, start=start, end=now_ms, limit=100)
+
+    assert client.get("/v2/conf/pub:list:pair:exchange").json()[0][:2] == ["BTCUSD", "ETHUSD"]
+
+
+def test_missing_candles_and_rate_limits() -> None:
+    client = _client(missing_fraction=0.5, rate_limit_per_minute=2)
+    now_ms = int(NOW.timestamp() * 1000)
+    rows = _hist(client, start=now_ms - 400 * MINUTE_MS, end=now_ms, limit=100, sort=1)
+    assert len(rows) == 100 and rows[-1][0] - rows[0][0] > 100 * MINUTE_MS
+
+    assert client.get("/v2/conf/pub:list:pair:exchange").status_code == 200
+    response = client.get("/v2/conf/pub:list:pair:exchange")
+    assert response.status_code == 429 and response.json()[0] == "error"
+    assert client.get("/sim/stats").json()["rest_rate_limited"] == 1
+
+    gap_start = NOW.replace(second=0) - timedelta(hours=2)
+    client = _client(missing_ranges=[(int(gap_start.timestamp() * 1000), int((gap_start.timestamp() + 600) * 1000))])
+    rows = _hist(client, start=int(gap_start.timestamp() * 1000) - 5 * MINUTE_MS, limit=20, sort=1)
+    assert len(rows) == 20 and rows[5][0] - rows[4][0] == 11 * MINUTE_MS
+
+
+def test_ws_subscribe_snapshot_update_and_limit() -> None:
+    client = _client(update_interval=0.01, max_subscriptions=1)
+    with client.websocket_connect("/ws/2") as ws:
+        assert ws.receive_json()["event"] == "info"
+        ws.send_json({"event": "subscribe", "channel": "candles", "key": "trade:1m:tETHUSD"})
+        subscribed = ws.receive_json()
+        assert subscribed["event"] == "subscribed"
+        chan_id, snapshot = ws.receive_json()
+        assert chan_id == subscribed["chanId"] and len(snapshot) == 240
+
+        ws.send_json({"event": "subscribe", "channel": "candles", "key": "trade:1h:tBTCUSD"})
+        messages = [ws.receive_json() for _ in range(3)]
+        assert any(isinstance(m, dict) and m.get("code") == 10305 for m in messages)
+        update = next(m for m in messages if isinstance(m, list))
+        candle = parse_ws_candle(update[1], "tETHUSD", "1m")
+        assert candle.symbol == "ETHUSD" and candle.open_time.timestamp() * 1000 == snapshot[0][0]
+
+
+def test_adapter_backfills_from_simulator(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_rate_limiter(), "request_delay", 0.0)
+    monkeypatch.setattr("market_data.exchanges.bitfinex.time.sleep", lambda seconds: None)
+    adapter = BitfinexAdapter()
+    adapter._client = _client(rate_limit_fraction=0.2, seed=3)
+    adapter.base_url = "http://testserver/v2"
+    adapter.page_size = 50
+
+    end = NOW.replace(second=0) - timedelta(minutes=1)
+    candles = adapter.fetch_candles("BTCUSD", "1m", end - timedelta(minutes=180), end)
+    open_times = [c.open_time for c in candles]
+    assert open_times == sorted(set(open_times))
+    assert open_times[0] == end - timedelta(minutes=180) and open_times[-1] == end
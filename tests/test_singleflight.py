@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from market_data.api.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution() -> None:
+    group = SingleFlight()
+    calls = 0
+    release = threading.Event()
+
+    def query() -> list[int]:
+        nonlocal calls
+        calls += 1
+        release.wait(timeout=5)
+        return [1, 2, 3]
+
+    results: list[list[int]] = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", query))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while group.get_stats()["requests"] < 8:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    stats = group.get_stats()
+    assert calls == 1
+    assert results == [[1, 2, 3]] * 8
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_errors_propagate_and_do_not_stick() -> None:
+    group = SingleFlight()
+
+    def boom() -> None:
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        group.do("k", boom)
+    assert group.do("k", lambda: 42) == 42
+    assert group.get_stats()["errors"] == 1
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from market_data.services.realtime import CandleHub
+from market_data.services.snapshot import SnapshotTable, snapshot_row
+from tests.helpers import FakeStorage, make_candle
+
+
+def _candle(symbol: str, open_time: datetime, open_: str, close: str):
+    return make_candle(open_time, close, symbol=symbol, open=open_, volume="3")
+
+
+def test_snapshot_is_seeded_once_and_updated_from_hub() -> None:
+    t0 = datetime(2024, 1, 1, tzinfo=UTC)
+    storage = FakeStorage([_candle("ETHUSD", t0, "2000", "2100"), _candle("BTCUSD", t0, "40000", "39000")])
+    hub = CandleHub()
+    table = SnapshotTable(storage, hub, refresh_seconds=3600)
+    table.seed()
+
+    assert [c.symbol for c in table.snapshot("bitfinex", "1h")] == ["BTCUSD", "ETHUSD"]
+
+    hub.publish([_candle("BTCUSD", t0 + timedelta(hours=1), "39000", "39500")])
+    btc = table.snapshot("bitfinex", "1h", ["BTCUSD", "XRPUSD"])
+
+    assert storage.calls["get_latest_candles"] == 1
+    assert [c.close for c in btc] == [Decimal("39500")]
+    assert table.snapshot("bitfinex", "4h") == []
+
+    # A re-seed never replaces newer streamed rows with older stored ones.
+    table.seed()
+    assert table.snapshot("bitfinex", "1h", ["BTCUSD"])[0].close == Decimal("39500")
+
+
+def test_snapshot_reads_never_hit_the_database() -> None:
+    t0 = datetime(2024, 1, 1, tzinfo=UTC)
+    storage = FakeStorage([_candle("BTCUSD", t0, "40000", "39000"), _candle("ETHUSD", t0, "2000", "2100")])
+    table = SnapshotTable(storage, refresh_seconds=0)
+    table.seed()
+
+    for _ in range(3):
+        assert len(table.snapshot("bitfinex", "1h")) == 2
+    assert storage.calls["get_latest_candles"] == 1
+
+    # A backfilled series re-reads only its own newest row.
+    storage.candles.append(_candle("BTCUSD", t0 + timedelta(hours=1), "39000", "38000"))
+    table.invalidate(("bitfinex", "BTCUSD", "1h"))
+    assert table.snapshot("bitfinex", "1h", ["BTCUSD"])[0].close == Decimal("38000")
+    assert storage.calls["get_latest_candles"] == 1
+    assert storage.calls["get_candles_before"] == 1
+
+
+def test_snapshot_refreshes_in_background() -> None:
+    t0 = datetime(2024, 1, 1, tzinfo=UTC)
+    storage = FakeStorage([_candle("BTCUSD", t0, "40000", "39000")])
+    table = SnapshotTable(storage, refresh_seconds=3600)
+    table.start()
+    try:
+        storage.candles.append(_candle("ETHUSD", t0, "2000", "2100"))
+        table.invalidate()
+        deadline = time.monotonic() + 5
+        while table.get_stats()["seeds"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        table.stop()
+
+    assert [c.symbol for c in table.snapshot("bitfinex", "1h")] == ["BTCUSD", "ETHUSD"]
+    assert storage.calls["get_latest_candles"] == 1
+
+
+def test_snapshot_row_change() -> None:
+    row = snapshot_row(_candle("BTCUSD", datetime(2024, 1, 1, tzinfo=UTC), "200", "210"))
+
+    assert row["change"] == "10"
+    assert row["change_pct"] == 5.0
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from market_data.synthetic import (
+    MINUTE_MS,
+    SyntheticConfig,
+    SyntheticSeries,
+    aggregate,
+    copy_text,
+    generate_candles,
+)
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+END = START + timedelta(days=10)
+NO_GAPS = SyntheticConfig(holes_per_year=0, illiquid_share=0, illiquid_periods_per_year=0)
+
+
+def _ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def test_deterministic_continuous_walk() -> None:
+    candles = generate_candles("BTCUSD", "1m", START, END, NO_GAPS)
+    assert len(candles["open_time"]) == 10 * 1440
+    assert np.all(np.diff(candles["open_time"]) == MINUTE_MS)
+    assert np.all(candles["low"] <= np.minimum(candles["open"], candles["close"]))
+    assert np.all(candles["high"] >= np.maximum(candles["open"], candles["close"]))
+    assert np.all(candles["volume"] > 0)
+    # Each candle opens at the previous close, across weekly chunks too.
+    assert np.array_equal(candles["open"][1:], candles["close"][:-1])
+
+    again = generate_candles("BTCUSD", "1m", START, END, NO_GAPS)
+    assert all(np.array_equal(candles[name], again[name]) for name in candles)
+    other = generate_candles("ETHUSD", "1m", START, END, NO_GAPS)
+    assert not np.array_equal(candles["close"], other["close"])
+
+
+def test_holes_and_illiquid_symbols() -> None:
+    hole = (_ms(START + timedelta(days=2)), _ms(START + timedelta(days=2, hours=3)))
+    candles = generate_candles("BTCUSD", "1m", START, END, SyntheticConfig(
+        holes_per_year=0, illiquid_share=0, illiquid_periods_per_year=0, missing_ranges=[hole]
+    ))
+    open_ms = candles["open_time"]
+    assert not np.any((open_ms >= hole[0]) & (open_ms < hole[1]))
+    assert len(open_ms) == 10 * 1440 - 180
+
+    illiquid = SyntheticSeries("BTCUSD", _ms(START), _ms(END), SyntheticConfig(illiquid_share=1.0))
+    assert illiquid.trade_probability < 1
+    rows = sum(len(chunk["open_time"]) for chunk in illiquid.chunks())
+    assert rows < 0.5 * 10 * 1440
+
+    with pytest.raises(ValueError):
+        SyntheticSeries("BTCUSD", _ms(START) + MINUTE_MS, _ms(END))
+
+
+def test_higher_timeframes_aggregate_minutes() -> None:
+    minutes = generate_candles("ETHUSD", "1m", START, END)
+    hours = generate_candles("ETHUSD", "1h", START, END)
+    assert np.array_equal(hours["open_time"], aggregate(minutes, 3_600_000)["open_time"])
+    first = minutes["open_time"] < hours["open_time"][0] + 3_600_000
+    assert hours["open"][0] == minutes["open"][first][0]
+    assert hours["close"][0] == minutes["close"][first][-1]
+    assert hours["high"][0] == minutes["high"][first].max()
+    assert hours["low"][0] == minutes["low"][first].min()
+    assert hours["volume"][0] == pytest.approx(minutes["volume"][first].sum())
+    with pytest.raises(ValueError):
+        generate_candles("ETHUSD", "1w", START, END)
+
+
+def test_copy_text_rows() -> None:
+    candles = generate_candles("BTCUSD", "5m", START, START + timedelta(days=1), NO_GAPS)
+    lines = copy_text("bitfinex", "BTCUSD", "5m", candles).splitlines()
+    assert len(lines) == 288
+    fields = lines[1].split("\t")
+    assert fields[:5] == ["bitfinex", "BTCUSD", "5m", "2024-01-01T00:05:00+00", "2024-01-01T00:10:00+00"]
+    assert [float(value) for value in fields[5:]] == [
+        candles[name][1] for name in ("open", "high", "low", "close", "volume")
+    ]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from market_data.timeframes import choose_base_timeframe, parse_timeframe
+
+
+def test_parse_timeframe() -> None:
+    assert parse_timeframe("90m") == timedelta(minutes=90)
+    assert parse_timeframe("12h") == timedelta(hours=12)
+    assert parse_timeframe("3d") == timedelta(days=3)
+
+    for label in ("", "h", "0h", "2x", "1.5h", "1M", "1D", "1W", "2H"):
+        with pytest.raises(ValueError):
+            parse_timeframe(label)
+
+
+def test_choose_base_timeframe_prefers_coarsest_divisor() -> None:
+    available = ["1m", "5m", "15m", "1h", "4h", "1d", "1w"]
+
+    assert choose_base_timeframe(timedelta(hours=12), available) == "4h"
+    assert choose_base_timeframe(timedelta(hours=2), available) == "1h"
+    assert choose_base_timeframe(timedelta(minutes=45), available) == "15m"
+    assert choose_base_timeframe(timedelta(weeks=2), available) == "1d"
+    assert choose_base_timeframe(timedelta(minutes=7), ["5m", "1h"]) is None